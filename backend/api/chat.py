@@ -0,0 +1,93 @@
+"""
+ARIA Chat API
+Endpoints for conversing with ARIA.
+"""
+import uuid
+from typing import Optional
+
+from fastapi import APIRouter, Header, HTTPException, Query, Request
+from pydantic import BaseModel, Field
+
+from config.settings import settings
+from core.llm import get_ai_client
+from services.admission import AdmissionRejected, get_admission_controller
+from services.conversation_store import get_conversation_store
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+router = APIRouter()
+
+SYSTEM_PROMPT = "You are ARIA, a helpful AI assistant."
+
+
+class ChatRequest(BaseModel):
+    message: str
+    # Stored in a String(32) column; new sessions get a uuid4 hex id
+    session_id: Optional[str] = Field(default=None, max_length=32, pattern=r"^[A-Za-z0-9_-]+$")
+    model: Optional[str] = None
+
+
+class ChatResponse(BaseModel):
+    response: str
+    session_id: str
+    model: str
+
+
+@router.post("", response_model=ChatResponse)
+async def chat(request: ChatRequest, http_request: Request, x_api_key: Optional[str] = Header(default=None)):
+    """
+    Sends a message to ARIA and returns the reply. History is kept per session.
+    Requests over their rate limit get 429, and 503 when the model is saturated.
+    """
+    client = get_ai_client()
+    store = get_conversation_store()
+    session_id = request.session_id or uuid.uuid4().hex
+    client_host = http_request.client.host if http_request.client else "unknown"
+
+    try:
+        async with get_admission_controller().admit(client_host, x_api_key):
+            history = []
+            try:
+                history = await store.get_context(session_id, settings.chat_context_messages)
+            except Exception as e:
+                # Conversation persistence is best-effort; answer without history
+                logger.warning(f"Conversation store unavailable for session {session_id}: {e}")
+
+            messages = [
+                {"role": "system", "content": SYSTEM_PROMPT},
+                *history,
+                {"role": "user", "content": request.message},
+            ]
+            try:
+                reply = await client.chat(messages, model=request.model)
+            except Exception as e:
+                logger.error(f"Chat failed: {e}")
+                raise HTTPException(status_code=502, detail=f"AI provider error: {e}")
+    except AdmissionRejected as e:
+        raise e.http_exception()
+
+    # Stored only once the reply exists, so a failed call leaves no unanswered turn
+    try:
+        await store.append(session_id, "user", request.message)
+        await store.append(session_id, "assistant", reply)
+    except Exception as e:
+        logger.warning(f"Failed to store the exchange for session {session_id}: {e}")
+
+    return ChatResponse(response=reply, session_id=session_id, model=request.model or client.model)
+
+
+@router.get("/sessions")
+async def list_sessions(limit: int = Query(default=20, ge=1, le=200)):
+    """Returns the most recently active chat sessions."""
+    sessions = await get_conversation_store().list_sessions(limit)
+    return {"sessions": sessions, "count": len(sessions)}
+
+
+@router.get("/sessions/{session_id}/messages")
+async def session_messages(
+    session_id: str,
+    before: Optional[int] = Query(default=None, ge=1, description="Cursor from a previous page"),
+    limit: int = Query(default=50, ge=1, le=500),
+):
+    """Returns a page of a session's messages, oldest first, using keyset pagination."""
+    return await get_conversation_store().get_history(session_id, before_seq=before, limit=limit)
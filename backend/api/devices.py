@@ -0,0 +1,174 @@
+"""
+ARIA Devices API
+Endpoints for listing and controlling smart home devices.
+"""
+from typing import Any, Optional
+
+from fastapi import APIRouter, Header, HTTPException, Request, Response
+from pydantic import BaseModel
+
+from core.http_cache import make_etag, not_modified
+from services.admission import AdmissionRejected, get_admission_controller
+from services.device_registry import get_device_registry
+from services.event_bus import get_event_bus
+from services.structured_output import StructuredOutputError, generate_structured
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+router = APIRouter()
+
+ACTIONS = {"turn_on", "turn_off", "toggle"}
+# Applying these twice gives the same state, so they can run before the reply validates
+IDEMPOTENT_ACTIONS = {"turn_on", "turn_off"}
+COMMAND_SYSTEM = (
+    "You control the devices of a smart home. Turn the user's request into device actions, "
+    "and write a short spoken reply confirming what you did."
+)
+COMMAND_PROMPT = "Devices:\n{devices}\n\nRequest: {text}"
+
+
+class Device(BaseModel):
+    entity_id: str
+    name: Optional[str] = None
+    state: str = "unknown"
+    attributes: dict[str, Any] = {}
+
+
+class DeviceAction(BaseModel):
+    entity_id: str
+    action: str
+    value: Any = None
+
+
+class DeviceCommand(BaseModel):
+    text: str
+    model: Optional[str] = None
+
+
+@router.get("/list")
+async def list_devices(request: Request, response: Response):
+    """Returns all registered devices, or 304 if the client's copy is current."""
+    registry = get_device_registry()
+    # Version before data: a change landing in between only costs a cache miss
+    cached = not_modified(request, response, make_etag("devices", await registry.version()))
+    if cached:
+        return cached
+    devices = await registry.list_devices()
+    return {"devices": devices, "count": len(devices)}
+
+
+@router.post("/register")
+async def register_device(device: Device):
+    """Adds or updates a device. Called by integrations when they discover devices."""
+    return await get_device_registry().upsert_device(device.model_dump())
+
+
+@router.delete("/{entity_id}")
+async def remove_device(entity_id: str):
+    """Removes a device from the registry."""
+    if not await get_device_registry().remove_device(entity_id):
+        raise HTTPException(status_code=404, detail="Unknown device.")
+    return {"status": "removed", "entity_id": entity_id}
+
+
+@router.post("/action")
+async def device_action(request: DeviceAction):
+    """
+    Applies an on/off action. No home automation backend is connected yet,
+    so the state change is simulated in the registry.
+    """
+    if request.action not in ACTIONS:
+        raise HTTPException(status_code=400, detail=f"Unsupported action. Expected one of {', '.join(sorted(ACTIONS))}.")
+
+    device = await _apply_action(request.entity_id, request.action)
+    if device is None:
+        raise HTTPException(status_code=404, detail="Unknown device.")
+    return {"status": "simulated", "device": device}
+
+
+@router.post("/command")
+async def device_command(
+    request: DeviceCommand, http_request: Request, x_api_key: Optional[str] = Header(default=None)
+):
+    """
+    Turns a natural-language request into device actions. The model replies
+    with JSON constrained to the registered devices. On/off actions are
+    applied as soon as they have streamed in, before the reply text is
+    written; toggles wait until the whole reply has validated.
+    """
+    devices = await get_device_registry().list_devices()
+    if not devices:
+        raise HTTPException(status_code=404, detail="No devices are registered.")
+
+    applied = []
+    # Keyed by content: a repaired reply may list the same actions in another order
+    done: set[tuple[str, str]] = set()
+
+    async def apply(action: dict):
+        key = (action["entity_id"], action["action"])
+        if key in done:
+            return
+        done.add(key)
+        device = await _apply_action(*key)
+        applied.append({**action, "state": device["state"] if device else None})
+
+    async def dispatch(path: tuple, value: Any):
+        if len(path) == 2 and path[0] == "actions" and value["action"] in IDEMPOTENT_ACTIONS:
+            await apply(value)
+
+    device_lines = "\n".join(
+        f"- {device['entity_id']} ({device.get('name') or 'unnamed'}): {device.get('state', 'unknown')}"
+        for device in devices
+    )
+    client_host = http_request.client.host if http_request.client else "unknown"
+    try:
+        async with get_admission_controller().admit(client_host, x_api_key):
+            result = await generate_structured(
+                COMMAND_PROMPT.format(devices=device_lines, text=request.text),
+                _command_schema(devices),
+                system=COMMAND_SYSTEM,
+                model=request.model,
+                on_field=dispatch,
+            )
+    except AdmissionRejected as e:
+        raise e.http_exception()
+    except StructuredOutputError as e:
+        detail = {"message": "The model did not produce valid actions.", "errors": e.errors, "actions": applied}
+        raise HTTPException(status_code=502, detail=detail)
+    except Exception as e:
+        logger.error(f"Device command failed: {e}")
+        raise HTTPException(status_code=502, detail=f"AI provider error: {e}")
+
+    for action in result["actions"]:
+        await apply(action)
+    return {"status": "simulated", "reply": result["reply"], "actions": applied}
+
+
+def _command_schema(devices: list[dict]) -> dict:
+    action = {
+        "type": "object",
+        "properties": {
+            "entity_id": {"type": "string", "enum": [device["entity_id"] for device in devices]},
+            "action": {"type": "string", "enum": sorted(ACTIONS)},
+        },
+        "required": ["entity_id", "action"],
+    }
+    # Constrained decoding follows property order, so actions stream before the reply
+    return {
+        "type": "object",
+        "properties": {"actions": {"type": "array", "items": action}, "reply": {"type": "string"}},
+        "required": ["actions", "reply"],
+    }
+
+
+async def _apply_action(entity_id: str, action: str) -> Optional[dict]:
+    """Simulates an action in the registry. Returns the device, or None if it is unknown."""
+    registry = get_device_registry()
+    if action == "toggle":
+        device = await registry.toggle(entity_id)
+    else:
+        device = await registry.set_state(entity_id, action.removeprefix("turn_"))
+    if device is None:
+        return None
+    await get_event_bus().publish("device_state_changed", "api", {"entity_id": entity_id, "state": device["state"]})
+    return device
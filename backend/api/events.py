@@ -0,0 +1,52 @@
+"""
+ARIA Events API
+Endpoints for ingesting events and streaming them to the dashboard.
+"""
+from typing import Any, Optional
+
+from fastapi import APIRouter, Query, Request, Response, WebSocket, WebSocketDisconnect
+from pydantic import BaseModel
+
+from core.http_cache import make_etag, not_modified
+from services.event_bus import get_event_bus
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+router = APIRouter()
+
+
+class EventCreate(BaseModel):
+    event_type: str
+    source: Optional[str] = None
+    data: Any = None
+
+
+@router.post("")
+async def log_event(event: EventCreate):
+    """Records an event and pushes it to connected clients."""
+    return await get_event_bus().publish(event.event_type, event.source, event.data)
+
+
+@router.get("/recent")
+async def recent_events(request: Request, response: Response, limit: int = Query(default=20, ge=1, le=500)):
+    """Returns the most recent events, newest first, or 304 if none arrived since the client's copy."""
+    bus = get_event_bus()
+    cached = not_modified(request, response, make_etag("events", await bus.version(), limit))
+    if cached:
+        return cached
+    events = await bus.recent(limit)
+    return {"events": events, "count": len(events)}
+
+
+@router.websocket("/ws")
+async def events_ws(websocket: WebSocket):
+    """Streams events to the client as they are published."""
+    await websocket.accept()
+    try:
+        with get_event_bus().subscribe() as queue:
+            while True:
+                await websocket.send_json(await queue.get())
+    except WebSocketDisconnect:
+        pass
+    except Exception as e:
+        logger.error(f"Event stream failed: {e}")
@@ -0,0 +1,73 @@
+"""
+ARIA Memory API
+Endpoints for searching ARIA's semantic memory.
+"""
+import json
+
+from fastapi import APIRouter, HTTPException, Request, Response
+from pydantic import BaseModel, Field
+
+from core.http_cache import make_etag, not_modified
+from core.redis_client import get_redis
+from services.memory_service import search_memory
+from services.stats_service import get_stats_service
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+router = APIRouter()
+
+
+class MemorySearchRequest(BaseModel):
+    query: str
+    collection: str = "conversations"
+    n_results: int = Field(default=5, ge=1, le=100)
+
+
+@router.post("/search")
+async def search(request: MemorySearchRequest):
+    """Returns the memories most similar to the query."""
+    try:
+        results = await search_memory(request.query, request.collection, request.n_results)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {"results": results, "count": len(results)}
+
+
+@router.post("/consolidate")
+async def consolidate():
+    """Queues a memory consolidation run on the Celery worker."""
+    from core.vector_db import vector_store_shared
+    from services.consolidation import consolidate_memory
+
+    if not vector_store_shared():
+        raise HTTPException(
+            status_code=409,
+            detail="Consolidation needs a Chroma server (CHROMA_HOST) or VECTOR_BACKEND=quantized.",
+        )
+
+    task = consolidate_memory.delay()
+    return {"status": "queued", "task_id": task.id}
+
+
+@router.get("/consolidation")
+async def last_consolidation(request: Request, response: Response):
+    """Returns the report of the last consolidation run."""
+    from services.consolidation import LAST_REPORT_KEY
+
+    report = await get_redis().get(LAST_REPORT_KEY)
+    if report is None:
+        raise HTTPException(status_code=404, detail="Memory has not been consolidated yet.")
+    cached = not_modified(request, response, make_etag("consolidation", report))
+    if cached:
+        return cached
+    return json.loads(report)
+
+
+@router.get("/stats")
+async def stats(request: Request, response: Response):
+    """Returns memory counts per tier, maintained incrementally."""
+    service = get_stats_service()
+    cached = not_modified(request, response, make_etag("memory-stats", await service.version()))
+    if cached:
+        return cached
+    return await service.memory_stats()
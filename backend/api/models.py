@@ -0,0 +1,63 @@
+"""
+ARIA Models API
+Endpoints for listing AI models and profiling their performance.
+"""
+from typing import Optional
+
+from fastapi import APIRouter, HTTPException, Query
+from pydantic import BaseModel, Field
+
+from core.llm import get_ai_client
+from services.model_profiler import (
+    DEFAULT_CONCURRENCY,
+    get_profile_run,
+    list_profiles,
+    start_profile_run,
+)
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+router = APIRouter()
+
+
+class ProfileRequest(BaseModel):
+    models: Optional[list[str]] = None  # Default: every available model
+    concurrency: list[int] = Field(default=list(DEFAULT_CONCURRENCY), min_length=1)
+
+
+@router.get("")
+async def available_models():
+    """Lists the models the configured provider can serve."""
+    client = get_ai_client()
+    return {"provider": client.provider, "default": client.model, "models": await client.get_available_models()}
+
+
+@router.post("/profile", status_code=202)
+async def start_profile(request: ProfileRequest):
+    """Starts a background profiling run over the requested models."""
+    if any(level < 1 for level in request.concurrency):
+        raise HTTPException(status_code=400, detail="Concurrency levels must be positive.")
+    try:
+        run_id = await start_profile_run(request.models, tuple(request.concurrency))
+    except RuntimeError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    return {"run_id": run_id, "status": "running"}
+
+
+@router.get("/profile/{run_id}")
+async def profile_status(run_id: str):
+    """Returns the progress and partial results of a profiling run."""
+    run = await get_profile_run(run_id)
+    if run is None:
+        raise HTTPException(status_code=404, detail="Unknown profiling run.")
+    return run
+
+
+@router.get("/profiles")
+async def stored_profiles(
+    model: Optional[str] = None,
+    limit: int = Query(default=50, ge=1, le=500),
+):
+    """Returns stored profiling results, newest first."""
+    profiles = await list_profiles(model, limit)
+    return {"profiles": profiles, "count": len(profiles)}
@@ -0,0 +1,112 @@
+"""
+ARIA System API
+Endpoints for inspecting the running backend.
+"""
+import asyncio
+import os
+import time
+from typing import Optional
+
+from fastapi import APIRouter, HTTPException, Query, Request, Response, WebSocket, WebSocketDisconnect
+
+from core.http_cache import make_etag, not_modified
+from core.warmup import warmup_state
+from services.admission import get_admission_controller
+from services.health_prober import latest_health, model_status
+from services.log_service import follow_logs, parse_level, query_logs
+from services.stats_service import STARTED_AT, get_stats_service
+from utils.logger import LOG_FILE, get_logger
+
+logger = get_logger(__name__)
+router = APIRouter()
+
+MAX_LOG_LINES = 5000
+
+
+@router.get("/status")
+async def system_status():
+    """
+    Dashboard summary. Connectivity comes from the leader's periodic health
+    probe (falling back to this worker's warm-up results) and aggregates from
+    precomputed counters.
+    """
+    steps = warmup_state.steps
+    status = {
+        "status": "online",
+        "uptime_seconds": int(time.time() - STARTED_AT),
+        "ready": warmup_state.serving,
+        **model_status(steps.get("model") == "ok"),
+        "database_connected": steps.get("database") == "ok",
+    }
+    try:
+        health = await latest_health()
+        if health:
+            status.update(health)
+        status.update(await get_stats_service().dashboard())
+    except Exception as e:
+        logger.warning(f"Dashboard stats unavailable: {e}")
+    return status
+
+
+@router.get("/admission")
+async def admission_metrics():
+    """Chat admission control: slot usage, admitted and rejected requests."""
+    return await get_admission_controller().metrics()
+
+
+@router.get("/logs")
+async def get_logs(
+    request: Request,
+    response: Response,
+    lines: int = Query(default=100, ge=1, le=MAX_LOG_LINES),
+    level: Optional[str] = Query(default=None, description="Minimum level, e.g. WARNING"),
+    logger_name: Optional[str] = Query(default=None, alias="logger"),
+):
+    """
+    Returns the most recent log lines, optionally filtered by level and logger.
+    Answers 304 while the log file is unchanged since the client's copy.
+    """
+    try:
+        stat = os.stat(LOG_FILE)
+    except OSError:
+        stat = None
+    if stat is not None:
+        etag = make_etag("logs", stat.st_ino, stat.st_mtime_ns, stat.st_size, lines, level, logger_name)
+        cached = not_modified(request, response, etag, stat.st_mtime)
+        if cached:
+            return cached
+    try:
+        result = await asyncio.to_thread(query_logs, lines, level, logger_name)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {"lines": result, "count": len(result)}
+
+
+@router.websocket("/logs/ws")
+async def stream_logs(
+    websocket: WebSocket,
+    lines: int = Query(default=0, ge=0, le=MAX_LOG_LINES),
+    level: Optional[str] = None,
+    logger_name: Optional[str] = Query(default=None, alias="logger"),
+):
+    """Streams new log lines to the client as they are written."""
+    try:
+        parse_level(level)
+    except ValueError as e:
+        await websocket.close(code=1008, reason=str(e))
+        return
+
+    await websocket.accept()
+    try:
+        # Optional backlog so the client starts with some context
+        if lines:
+            backlog = await asyncio.to_thread(query_logs, lines, level, logger_name)
+            for line in backlog:
+                await websocket.send_json({"type": "log", "line": line})
+
+        async for line in follow_logs(level=level, logger_name=logger_name):
+            await websocket.send_json({"type": "log", "line": line})
+    except WebSocketDisconnect:
+        pass
+    except Exception as e:
+        logger.error(f"Log stream failed: {e}")
@@ -0,0 +1,90 @@
+"""
+ARIA Voice API
+Endpoints for speech synthesis with Piper.
+"""
+import contextlib
+
+from fastapi import APIRouter, HTTPException, Query, WebSocket, WebSocketDisconnect
+from fastapi.responses import Response
+
+from api.chat import SYSTEM_PROMPT
+from config.settings import settings
+from core.llm import get_ai_client
+from core.tts import get_tts_engine
+from services.admission import AdmissionRejected, get_admission_controller
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+router = APIRouter()
+
+MAX_TEXT_LENGTH = 2000
+
+
+async def _single_chunk(text: str):
+    yield text
+
+
+@router.get("/speak")
+async def speak(text: str = Query(..., min_length=1, max_length=MAX_TEXT_LENGTH)):
+    """Returns WAV audio for the text. Cached phrases are served without synthesis."""
+    if not settings.tts_enabled:
+        raise HTTPException(status_code=503, detail="TTS is disabled.")
+    try:
+        audio = await get_tts_engine().synthesize(text)
+    except RuntimeError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    return Response(content=audio, media_type="audio/wav")
+
+
+@router.websocket("/ws")
+async def speak_stream(websocket: WebSocket):
+    """
+    Streams speech sentence by sentence.
+
+    The client sends {"text": "..."} to speak fixed text or {"prompt": "..."}
+    to speak an LLM reply as it is generated. For every sentence the server
+    sends a JSON frame {"type": "sentence", "text": ...} followed by a binary
+    WAV frame, then {"type": "done"} at the end. Prompts go through the same
+    admission control as /api/chat; a rejected one gets an error frame with
+    its status and retry_after.
+    """
+    await websocket.accept()
+    if not settings.tts_enabled:
+        await websocket.close(code=1013, reason="TTS is disabled.")
+        return
+
+    engine = get_tts_engine()
+    client_host = websocket.client.host if websocket.client else "unknown"
+    api_key = websocket.headers.get("x-api-key")
+    try:
+        while True:
+            request = await websocket.receive_json()
+            if request.get("prompt"):
+                # Held until the reply has been spoken; generation follows playback
+                admission = get_admission_controller().admit(client_host, api_key)
+                chunks = get_ai_client().stream_generate(
+                    request["prompt"], system=request.get("system") or SYSTEM_PROMPT
+                )
+            elif request.get("text"):
+                admission = contextlib.nullcontext()
+                chunks = _single_chunk(request["text"][:MAX_TEXT_LENGTH])
+            else:
+                await websocket.send_json({"type": "error", "detail": "Send 'text' or 'prompt'."})
+                continue
+
+            try:
+                async with admission:
+                    async for sentence, audio in engine.stream(chunks):
+                        await websocket.send_json({"type": "sentence", "text": sentence})
+                        await websocket.send_bytes(audio)
+                await websocket.send_json({"type": "done"})
+            except AdmissionRejected as e:
+                await websocket.send_json(
+                    {"type": "error", "status": e.status_code, "detail": e.detail, "retry_after": e.retry_after}
+                )
+            except RuntimeError as e:
+                await websocket.send_json({"type": "error", "detail": str(e)})
+    except WebSocketDisconnect:
+        pass
+    except Exception as e:
+        logger.error(f"TTS stream failed: {e}")
@@ -0,0 +1,207 @@
+"""
+ARIA Benchmark - Fake Ollama Server
+A stand-in for the Ollama HTTP API with configurable latency.
+
+Implements the endpoints the backend uses (/api/tags, /api/ps, /api/chat,
+/api/generate) including NDJSON streaming, a per-model load delay and a
+limited number of parallel inference slots, so load tests behave like a
+real (saturating) Ollama without needing a GPU.
+
+Standalone usage:
+    python -m benchmarks.fake_ollama --port 11435 --token-latency 0.02
+"""
+import argparse
+import asyncio
+import json
+import threading
+import time
+from dataclasses import dataclass, field
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+WORDS = (
+    "the lights are dimmed now and the front door is locked while the "
+    "thermostat holds twenty one degrees in the living room tonight"
+).split()
+
+
+@dataclass
+class FakeOllamaOptions:
+    """Latency model for the fake server."""
+    token_latency: float = 0.01  # Seconds per generated token
+    prompt_latency: float = 0.02  # Seconds before the first token
+    tokens: int = 32  # Tokens per reply
+    load_time: float = 0.5  # Seconds to load a model that isn't resident
+    parallel: int = 4  # Concurrent inference slots, like OLLAMA_NUM_PARALLEL
+    models: list[str] = field(default_factory=lambda: ["llama3.2:latest", "qwen2.5:0.5b"])
+
+
+def _now() -> str:
+    return time.strftime("%Y-%m-%dT%H:%M:%S.000000Z", time.gmtime())
+
+
+def create_app(options: FakeOllamaOptions) -> FastAPI:
+    """Builds the fake Ollama ASGI app."""
+    app = FastAPI(title="Fake Ollama")
+    slots = asyncio.Semaphore(options.parallel)
+    loaded: set[str] = set()
+
+    def model_entry(name: str) -> dict:
+        return {
+            "name": name,
+            "model": name,
+            "modified_at": _now(),
+            "size": 2_000_000_000,
+            "digest": "0" * 64,
+            "details": {"format": "gguf", "family": "llama", "parameter_size": "3B", "quantization_level": "Q4_K_M"},
+        }
+
+    async def load(model: str, keep_alive) -> int:
+        """Simulates loading a model. Returns the load duration in ns."""
+        if keep_alive in (0, "0", "0s", "0m"):
+            loaded.discard(model)
+            return 0
+        if model in loaded:
+            return 0
+        await asyncio.sleep(options.load_time)
+        loaded.add(model)
+        return int(options.load_time * 1e9)
+
+    def stats(load_ns: int, started: float) -> dict:
+        eval_ns = int(options.tokens * options.token_latency * 1e9)
+        return {
+            "done": True,
+            "done_reason": "stop",
+            "total_duration": int((time.perf_counter() - started) * 1e9),
+            "load_duration": load_ns,
+            "prompt_eval_count": 16,
+            "prompt_eval_duration": int(options.prompt_latency * 1e9),
+            "eval_count": options.tokens,
+            "eval_duration": eval_ns,
+        }
+
+    async def tokens():
+        await asyncio.sleep(options.prompt_latency)
+        for i in range(options.tokens):
+            await asyncio.sleep(options.token_latency)
+            yield WORDS[i % len(WORDS)] + " "
+
+    async def respond(body: dict, wrap):
+        model = body.get("model") or options.models[0]
+        stream = body.get("stream", True)
+        started = time.perf_counter()
+
+        async def run():
+            async with slots:
+                load_ns = await load(model, body.get("keep_alive"))
+                if "prompt" in body and not body.get("prompt"):
+                    # Empty prompt: load only, as the real server does
+                    yield {"model": model, "created_at": _now(), **wrap(""), "done": True, "done_reason": "load"}
+                    return
+                async for token in tokens():
+                    yield {"model": model, "created_at": _now(), **wrap(token), "done": False}
+                yield {"model": model, "created_at": _now(), **wrap(""), **stats(load_ns, started)}
+
+        if stream:
+            async def ndjson():
+                async for chunk in run():
+                    yield json.dumps(chunk) + "\n"
+            return StreamingResponse(ndjson(), media_type="application/x-ndjson")
+
+        text, final = "", {}
+        async for chunk in run():
+            text += (chunk.get("message") or {}).get("content", "") or chunk.get("response", "")
+            final = chunk
+        return JSONResponse({**final, **wrap(text)})
+
+    @app.get("/api/tags")
+    async def tags():
+        return {"models": [model_entry(name) for name in options.models]}
+
+    @app.get("/api/ps")
+    async def ps():
+        return {
+            "models": [
+                {**model_entry(name), "expires_at": _now(), "size_vram": 1_500_000_000}
+                for name in sorted(loaded)
+            ]
+        }
+
+    @app.post("/api/chat")
+    async def chat(request: Request):
+        body = await request.json()
+        return await respond(body, lambda text: {"message": {"role": "assistant", "content": text}})
+
+    @app.post("/api/generate")
+    async def generate(request: Request):
+        body = await request.json()
+        return await respond(body, lambda text: {"response": text})
+
+    return app
+
+
+class FakeOllamaServer:
+    """Runs the fake Ollama app with uvicorn in a background thread."""
+
+    def __init__(self, options: FakeOllamaOptions = None, host: str = "127.0.0.1", port: int = 0):
+        self.options = options or FakeOllamaOptions()
+        self.host = host
+        self.port = port
+        self._server = None
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        return f"http://{self.host}:{self.port}"
+
+    def start(self) -> "FakeOllamaServer":
+        import uvicorn
+
+        config = uvicorn.Config(create_app(self.options), host=self.host, port=self.port, log_level="warning")
+        self._server = uvicorn.Server(config)
+        self._thread = threading.Thread(target=self._server.run, daemon=True)
+        self._thread.start()
+
+        deadline = time.monotonic() + 10
+        while not self._server.started:
+            if time.monotonic() > deadline:
+                raise RuntimeError("Fake Ollama server did not start")
+            time.sleep(0.01)
+        # Resolve the real port when started on port 0
+        self.port = self._server.servers[0].sockets[0].getsockname()[1]
+        return self
+
+    def stop(self):
+        if self._server:
+            self._server.should_exit = True
+            self._thread.join(timeout=5)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run a fake Ollama server.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=11435)
+    parser.add_argument("--token-latency", type=float, default=0.01)
+    parser.add_argument("--tokens", type=int, default=32)
+    parser.add_argument("--load-time", type=float, default=0.5)
+    parser.add_argument("--parallel", type=int, default=4)
+    args = parser.parse_args()
+
+    options = FakeOllamaOptions(
+        token_latency=args.token_latency,
+        tokens=args.tokens,
+        load_time=args.load_time,
+        parallel=args.parallel,
+    )
+    server = FakeOllamaServer(options, host=args.host, port=args.port).start()
+    print(f"Fake Ollama listening on {server.url} (Ctrl+C to stop)")
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
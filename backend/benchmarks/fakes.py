@@ -0,0 +1,315 @@
+"""
+ARIA Benchmark - In-Memory Service Stand-ins
+Replacements for Redis, MinIO and the Chroma embedding model so the
+benchmark suite runs on a dev box without external services or downloads.
+"""
+import fnmatch
+import hashlib
+import io
+import math
+import time
+from collections import defaultdict
+from typing import Any, Optional
+
+
+class FakeRedis:
+    """
+    Asyncio Redis stand-in covering the commands the backend uses.
+    Values are stored as strings, like a client with decode_responses=True.
+    """
+
+    def __init__(self):
+        self._data: dict[str, Any] = {}
+        self._expires: dict[str, float] = {}
+
+    # --- Internals ---
+    def _expired(self, key: str) -> bool:
+        deadline = self._expires.get(key)
+        if deadline is not None and deadline <= time.monotonic():
+            self._data.pop(key, None)
+            self._expires.pop(key, None)
+            return True
+        return False
+
+    def _get(self, key: str, default=None):
+        if self._expired(key):
+            return default
+        return self._data.get(key, default)
+
+    def _set_expiry(self, key: str, ex: Optional[float] = None, px: Optional[int] = None):
+        if ex is not None:
+            self._expires[key] = time.monotonic() + ex
+        elif px is not None:
+            self._expires[key] = time.monotonic() + px / 1000
+        else:
+            self._expires.pop(key, None)
+
+    # --- Connection ---
+    async def ping(self) -> bool:
+        return True
+
+    async def aclose(self):
+        pass
+
+    # --- Strings ---
+    async def get(self, key: str):
+        return self._get(key)
+
+    async def set(self, key: str, value, ex=None, px=None, nx: bool = False, xx: bool = False):
+        exists = self._get(key) is not None
+        if (nx and exists) or (xx and not exists):
+            return None
+        self._data[key] = str(value)
+        self._set_expiry(key, ex, px)
+        return True
+
+    async def incrby(self, key: str, amount: int = 1) -> int:
+        value = int(self._get(key, 0)) + amount
+        self._data[key] = str(value)
+        return value
+
+    async def incr(self, key: str, amount: int = 1) -> int:
+        return await self.incrby(key, amount)
+
+    async def delete(self, *keys: str) -> int:
+        removed = 0
+        for key in keys:
+            if self._get(key) is not None:
+                removed += 1
+            self._data.pop(key, None)
+            self._expires.pop(key, None)
+        return removed
+
+    async def exists(self, *keys: str) -> int:
+        return sum(1 for key in keys if self._get(key) is not None)
+
+    async def expire(self, key: str, seconds: float) -> bool:
+        if self._get(key) is None:
+            return False
+        self._set_expiry(key, ex=seconds)
+        return True
+
+    async def pexpire(self, key: str, milliseconds: int) -> bool:
+        return await self.expire(key, milliseconds / 1000)
+
+    async def keys(self, pattern: str = "*") -> list[str]:
+        return [key for key in list(self._data) if not self._expired(key) and fnmatch.fnmatch(key, pattern)]
+
+    # --- Hashes ---
+    async def hget(self, key: str, field: str):
+        return self._get(key, {}).get(field)
+
+    async def hgetall(self, key: str) -> dict:
+        return dict(self._get(key, {}))
+
+    async def hset(self, key: str, field: str = None, value=None, mapping: dict = None) -> int:
+        self._expired(key)
+        bucket = self._data.setdefault(key, {})
+        items = dict(mapping or {})
+        if field is not None:
+            items[field] = value
+        added = sum(1 for name in items if name not in bucket)
+        bucket.update({name: str(v) for name, v in items.items()})
+        return added
+
+    async def hincrby(self, key: str, field: str, amount: int = 1) -> int:
+        self._expired(key)
+        bucket = self._data.setdefault(key, {})
+        bucket[field] = str(int(bucket.get(field, 0)) + amount)
+        return int(bucket[field])
+
+    async def hdel(self, key: str, *fields: str) -> int:
+        bucket = self._get(key, {})
+        return sum(1 for name in fields if bucket.pop(name, None) is not None)
+
+    async def hlen(self, key: str) -> int:
+        return len(self._get(key, {}))
+
+    # --- Lists ---
+    async def lpush(self, key: str, *values) -> int:
+        self._expired(key)
+        items = self._data.setdefault(key, [])
+        for value in values:
+            items.insert(0, str(value))
+        return len(items)
+
+    async def rpush(self, key: str, *values) -> int:
+        self._expired(key)
+        items = self._data.setdefault(key, [])
+        items.extend(str(value) for value in values)
+        return len(items)
+
+    async def lrange(self, key: str, start: int, end: int) -> list[str]:
+        items = self._get(key, [])
+        end = len(items) - 1 if end == -1 else end
+        return items[start:end + 1]
+
+    async def ltrim(self, key: str, start: int, end: int) -> bool:
+        items = self._get(key, [])
+        end = len(items) - 1 if end == -1 else end
+        self._data[key] = items[start:end + 1]
+        return True
+
+    async def llen(self, key: str) -> int:
+        return len(self._get(key, []))
+
+    # --- Pub/Sub ---
+    async def publish(self, channel: str, message) -> int:
+        return 0
+
+    # --- Pipelines ---
+    def pipeline(self, transaction: bool = True) -> "FakePipeline":
+        return FakePipeline(self)
+
+
+class FakePipeline:
+    """
+    Queues commands and runs them in order on execute(). After watch() commands
+    run immediately until multi(), as in redis-py; watched keys are never
+    reported as changed.
+    """
+
+    def __init__(self, redis: FakeRedis):
+        self._redis = redis
+        self._commands = []
+        self._immediate = False
+
+    def __getattr__(self, name: str):
+        method = getattr(self._redis, name)
+        if self._immediate:
+            return method
+
+        def queue(*args, **kwargs):
+            self._commands.append((method, args, kwargs))
+            return self
+        return queue
+
+    async def watch(self, *keys):
+        self._immediate = True
+
+    async def unwatch(self):
+        self._immediate = False
+
+    def multi(self):
+        self._immediate = False
+
+    async def execute(self) -> list:
+        commands, self._commands = self._commands, []
+        return [await method(*args, **kwargs) for method, args, kwargs in commands]
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        self._commands = []
+
+
+class _FakeObject:
+    """Mimics the urllib3 response returned by Minio.get_object()."""
+
+    def __init__(self, data: bytes):
+        self._stream = io.BytesIO(data)
+        self.data = data
+
+    def read(self, amt: Optional[int] = None) -> bytes:
+        return self._stream.read(amt)
+
+    def stream(self, amt: int = 32 * 1024):
+        while chunk := self._stream.read(amt):
+            yield chunk
+
+    def close(self):
+        pass
+
+    def release_conn(self):
+        pass
+
+
+class FakeMinio:
+    """In-memory stand-in for the MinIO client (thread-safe enough for benchmarks)."""
+
+    def __init__(self):
+        self._buckets: dict[str, dict[str, tuple[bytes, str]]] = defaultdict(dict)
+
+    def bucket_exists(self, bucket_name: str) -> bool:
+        return bucket_name in self._buckets
+
+    def make_bucket(self, bucket_name: str):
+        self._buckets[bucket_name]
+
+    def put_object(self, bucket_name: str, object_name: str, data, length: int, content_type: str = "application/octet-stream", **kwargs):
+        payload = data.read(length) if length >= 0 else data.read()
+        self._buckets[bucket_name][object_name] = (payload, content_type)
+
+    def get_object(self, bucket_name: str, object_name: str, **kwargs) -> _FakeObject:
+        try:
+            return _FakeObject(self._buckets[bucket_name][object_name][0])
+        except KeyError:
+            raise KeyError(f"NoSuchKey: {bucket_name}/{object_name}")
+
+    def stat_object(self, bucket_name: str, object_name: str, **kwargs):
+        payload, content_type = self._buckets[bucket_name][object_name]
+        return type("ObjectStat", (), {"size": len(payload), "content_type": content_type})()
+
+    def remove_object(self, bucket_name: str, object_name: str, **kwargs):
+        self._buckets[bucket_name].pop(object_name, None)
+
+
+class HashingEmbeddingFunction:
+    """
+    Deterministic bag-of-words embedding (feature hashing). Lets Chroma run
+    without downloading the default ONNX model; good enough for load tests.
+    """
+
+    def __init__(self, dimensions: int = 256):
+        self.dimensions = dimensions
+
+    def __call__(self, input):
+        import numpy as np
+
+        embeddings = []
+        for text in input:
+            vector = np.zeros(self.dimensions, dtype=np.float32)
+            for token in text.lower().split():
+                digest = hashlib.blake2b(token.encode("utf-8"), digest_size=8).digest()
+                vector[int.from_bytes(digest, "little") % self.dimensions] += 1.0
+            norm = math.sqrt(float((vector * vector).sum())) or 1.0
+            embeddings.append(vector / norm)
+        return embeddings
+
+
+class _EmbeddingVectorClient:
+    """Wraps a vector client (Chroma or quantized) so every collection uses the given embedding function."""
+
+    def __init__(self, client, embedding_function):
+        self._client = client
+        self._embedding_function = embedding_function
+
+    def get_or_create_collection(self, name: str, **kwargs):
+        kwargs.setdefault("embedding_function", self._embedding_function)
+        return self._client.get_or_create_collection(name, **kwargs)
+
+    def __getattr__(self, name: str):
+        return getattr(self._client, name)
+
+
+def install_fakes() -> dict:
+    """
+    Points the backend's service singletons at the in-memory stand-ins.
+    Must be called after settings are configured and before the app serves requests.
+    """
+    import core.redis_client
+    import core.storage
+    import core.vector_db
+
+    redis = FakeRedis()
+    minio = FakeMinio()
+    core.redis_client._redis_instance = redis
+    core.storage._minio_client_instance = minio
+
+    # Wraps whichever backend VECTOR_BACKEND selects
+    vectors = _EmbeddingVectorClient(core.vector_db.get_vector_client(), HashingEmbeddingFunction())
+    core.vector_db.get_vector_client = lambda: vectors
+    core.vector_db.get_collection.cache_clear()
+
+    return {"redis": redis, "minio": minio, "vectors": vectors}
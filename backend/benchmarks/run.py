@@ -0,0 +1,300 @@
+"""
+ARIA Benchmark Runner
+Drives concurrent chat, memory-search and event-ingest workloads and
+reports throughput and latency percentiles.
+
+By default the backend runs in-process against a fake Ollama server and
+in-memory Redis/MinIO stand-ins, so no external services are needed.
+Pass --url to load-test a running deployment instead.
+
+Usage:
+    python -m benchmarks.run
+    python -m benchmarks.run --concurrency 16 --requests 500 --token-latency 0.02
+    python -m benchmarks.run --mixed --compare data/benchmarks/bench-20260101-120000.json
+    python -m benchmarks.run --url http://localhost:8000 --workloads events
+    python -m benchmarks.run --url http://localhost:8000 --api-key <automation key>
+
+The run exits with status 1 if any chat request fails, since rate-limited
+or shed requests would make the chat latencies meaningless.
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import sys
+import tempfile
+import time
+from collections import Counter
+from pathlib import Path
+from typing import Callable, Optional
+
+BACKEND_DIR = Path(__file__).parents[1]
+sys.path.insert(0, str(BACKEND_DIR))
+
+EVENT_TYPES = ["motion_detected", "door_opened", "temperature_changed", "light_toggled"]
+MEMORY_PHRASES = [
+    "user likes the lights dim at night",
+    "front door was left unlocked yesterday",
+    "thermostat set to twenty one degrees",
+    "kitchen motion sensor battery is low",
+    "user prefers jazz in the morning",
+    "garage door closes automatically at ten",
+]
+
+
+# --- Workloads ---
+def chat_request(i: int) -> tuple[str, str, dict]:
+    return "POST", "/api/chat", {"message": f"Benchmark message {i}: what's the status of the house?"}
+
+
+def memory_request(i: int) -> tuple[str, str, dict]:
+    return "POST", "/api/memory/search", {
+        "query": random.choice(MEMORY_PHRASES),
+        "collection": "conversations",
+        "n_results": 5,
+    }
+
+
+def event_request(i: int) -> tuple[str, str, dict]:
+    return "POST", "/api/events", {
+        "event_type": random.choice(EVENT_TYPES),
+        "source": "benchmark",
+        "data": {"sequence": i},
+    }
+
+
+WORKLOADS: dict[str, Callable[[int], tuple[str, str, dict]]] = {
+    "chat": chat_request,
+    "memory": memory_request,
+    "events": event_request,
+}
+
+
+# --- Statistics ---
+def percentile(sorted_values: list[float], p: float) -> float:
+    """Linear-interpolated percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = (len(sorted_values) - 1) * p / 100
+    low = int(rank)
+    high = min(low + 1, len(sorted_values) - 1)
+    return sorted_values[low] + (sorted_values[high] - sorted_values[low]) * (rank - low)
+
+
+def summarize(latencies: list[float], statuses: Counter, errors: int, duration: float) -> dict:
+    ordered = sorted(latencies)
+    total = len(latencies) + errors
+    return {
+        "requests": total,
+        "errors": errors + sum(count for code, count in statuses.items() if code >= 400),
+        "status_codes": {str(code): count for code, count in sorted(statuses.items())},
+        "duration_s": round(duration, 3),
+        "throughput_rps": round(total / duration, 2) if duration else 0.0,
+        "latency_ms": {
+            "mean": round(sum(ordered) / len(ordered), 2) if ordered else 0.0,
+            "p50": round(percentile(ordered, 50), 2),
+            "p95": round(percentile(ordered, 95), 2),
+            "p99": round(percentile(ordered, 99), 2),
+            "max": round(ordered[-1], 2) if ordered else 0.0,
+        },
+    }
+
+
+async def run_workload(client, name: str, total: int, concurrency: int, api_key: Optional[str] = None) -> dict:
+    """Sends `total` requests for a workload from `concurrency` workers."""
+    make_request = WORKLOADS[name]
+    headers = {"X-API-Key": api_key} if api_key else None
+    latencies: list[float] = []
+    statuses: Counter = Counter()
+    errors = 0
+    counter = iter(range(total))
+
+    async def worker():
+        nonlocal errors
+        for i in counter:
+            method, path, payload = make_request(i)
+            started = time.perf_counter()
+            try:
+                response = await client.request(method, path, json=payload, headers=headers)
+                statuses[response.status_code] += 1
+                latencies.append((time.perf_counter() - started) * 1000)
+            except Exception:
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return summarize(latencies, statuses, errors, time.perf_counter() - started)
+
+
+# --- Setup ---
+def configure_environment(ollama_url: str, data_dir: Path, args):
+    """Points settings at the stand-ins. Must run before any backend import."""
+    os.environ.update({
+        # Every in-process request comes from one client address; admission
+        # control must not throttle the load being measured
+        "CHAT_RATE_PER_CLIENT": "1000000",
+        "CHAT_BURST_PER_CLIENT": str(args.requests + args.concurrency),
+        "CHAT_MAX_CONCURRENCY": str(args.parallel),
+        "CHAT_MAX_QUEUE": str(args.requests + args.concurrency),
+        "CHAT_QUEUE_TIMEOUT": "120",
+        "AI_PROVIDER": "ollama",
+        "OLLAMA_HOST": ollama_url,
+        "CHROMA_PATH": str(data_dir / "chroma"),
+        "QUANTIZED_PATH": str(data_dir / "vectors"),
+        "DATABASE_URL": f"sqlite+aiosqlite:///{(data_dir / 'bench.db').as_posix()}",
+        "WARMUP_ENABLED": "False",
+    })
+
+
+def seed_memory(count: int):
+    """Fills the conversations collection so searches have something to rank."""
+    from core.vector_db import get_collection
+
+    collection = get_collection("conversations")
+    batch = 500
+    for start in range(0, count, batch):
+        ids = [f"bench-{i}" for i in range(start, min(start + batch, count))]
+        documents = [f"{random.choice(MEMORY_PHRASES)} (note {i})" for i in range(start, start + len(ids))]
+        collection.upsert(ids=ids, documents=documents)
+
+
+async def run_suite(args, client) -> dict:
+    workloads = [name.strip() for name in args.workloads.split(",") if name.strip()]
+    results = {}
+    if args.mixed:
+        summaries = await asyncio.gather(
+            *(run_workload(client, name, args.requests, args.concurrency, args.api_key) for name in workloads)
+        )
+        results = dict(zip(workloads, summaries))
+    else:
+        for name in workloads:
+            print(f"Running '{name}' ({args.requests} requests, concurrency {args.concurrency})...")
+            results[name] = await run_workload(client, name, args.requests, args.concurrency, args.api_key)
+    return results
+
+
+# --- Reporting ---
+def print_results(results: dict, baseline: Optional[dict] = None):
+    print(f"\n{'workload':<10}{'reqs':>7}{'errs':>6}{'rps':>10}{'p50':>10}{'p95':>10}{'p99':>10}")
+    for name, result in results.items():
+        latency = result["latency_ms"]
+        print(
+            f"{name:<10}{result['requests']:>7}{result['errors']:>6}{result['throughput_rps']:>10.1f}"
+            f"{latency['p50']:>10.1f}{latency['p95']:>10.1f}{latency['p99']:>10.1f}"
+        )
+        previous = (baseline or {}).get(name)
+        if previous:
+            def delta(new: float, old: float) -> str:
+                return f"{(new - old) / old * 100:+.1f}%" if old else "n/a"
+            old_latency = previous["latency_ms"]
+            print(
+                f"{'  vs base':<10}{'':>13}{delta(result['throughput_rps'], previous['throughput_rps']):>10}"
+                f"{delta(latency['p50'], old_latency['p50']):>10}{delta(latency['p95'], old_latency['p95']):>10}"
+                f"{delta(latency['p99'], old_latency['p99']):>10}"
+            )
+    print("(latencies in ms)")
+
+
+def save_results(output_dir: Path, report: dict) -> Path:
+    output_dir.mkdir(parents=True, exist_ok=True)
+    path = output_dir / f"bench-{time.strftime('%Y%m%d-%H%M%S')}.json"
+    path.write_text(json.dumps(report, indent=2), encoding="utf-8")
+    return path
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="ARIA load-testing and benchmark suite.")
+    parser.add_argument("--workloads", default=",".join(WORKLOADS), help="Comma-separated: chat,memory,events")
+    parser.add_argument("--requests", type=int, default=200, help="Requests per workload")
+    parser.add_argument("--concurrency", type=int, default=8, help="Concurrent clients per workload")
+    parser.add_argument("--mixed", action="store_true", help="Run all workloads at the same time")
+    parser.add_argument("--url", help="Benchmark a running server instead of the in-process app")
+    parser.add_argument("--api-key", help="X-API-Key to send, e.g. an AUTOMATION_API_KEYS key for --url runs")
+    parser.add_argument("--token-latency", type=float, default=0.01, help="Fake Ollama seconds per token")
+    parser.add_argument("--tokens", type=int, default=32, help="Fake Ollama tokens per reply")
+    parser.add_argument("--parallel", type=int, default=4, help="Fake Ollama inference slots")
+    parser.add_argument("--memory-docs", type=int, default=1000, help="Memories to seed before searching")
+    parser.add_argument("--output", default=str(BACKEND_DIR / "data" / "benchmarks"), help="Directory for JSON results")
+    parser.add_argument("--compare", help="Previous results file to compare against")
+    parser.add_argument("--seed", type=int, default=42)
+    return parser.parse_args()
+
+
+async def main_async(args) -> dict:
+    import httpx
+
+    if args.url:
+        async with httpx.AsyncClient(base_url=args.url, timeout=120) as client:
+            return await run_suite(args, client)
+
+    from benchmarks.fake_ollama import FakeOllamaOptions, FakeOllamaServer
+
+    options = FakeOllamaOptions(token_latency=args.token_latency, tokens=args.tokens, parallel=args.parallel)
+    server = FakeOllamaServer(options).start()
+    try:
+        with tempfile.TemporaryDirectory(prefix="aria-bench-") as tmp:
+            configure_environment(server.url, Path(tmp), args)
+
+            from benchmarks.fakes import install_fakes
+            from core.database import get_engine, init_db
+            from main import app
+            from services.conversation_store import get_conversation_store
+
+            install_fakes()
+            await init_db()
+            store = get_conversation_store()
+            store.start()
+            if "memory" in args.workloads:
+                print(f"Seeding {args.memory_docs} memories...")
+                await asyncio.to_thread(seed_memory, args.memory_docs)
+
+            transport = httpx.ASGITransport(app=app)
+            try:
+                async with httpx.AsyncClient(transport=transport, base_url="http://aria.bench", timeout=120) as client:
+                    return await run_suite(args, client)
+            finally:
+                await store.stop()
+                await get_engine().dispose()
+    finally:
+        server.stop()
+
+
+def main():
+    args = parse_args()
+    random.seed(args.seed)
+
+    results = asyncio.run(main_async(args))
+
+    baseline = None
+    if args.compare:
+        baseline = json.loads(Path(args.compare).read_text(encoding="utf-8")).get("workloads")
+
+    report = {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "target": args.url or "in-process",
+        "config": {key: value for key, value in vars(args).items() if key not in ("output", "compare")},
+        "environment": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+        },
+        "workloads": results,
+    }
+    print_results(results, baseline)
+    print(f"\nResults saved to {save_results(Path(args.output), report)}")
+
+    chat = results.get("chat")
+    if chat and chat["errors"]:
+        print(
+            f"\nFAILED: {chat['errors']} of {chat['requests']} chat requests failed "
+            f"(status codes {chat['status_codes']}). Rate limits or admission control may be "
+            "throttling the benchmark; for --url runs pass an automation --api-key.",
+            file=sys.stderr,
+        )
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -15,6 +15,23 @@ class Settings(BaseSettings):
     api_host: str = Field(default="0.0.0.0", alias="API_HOST")
     api_port: int = Field(default=8000, alias="API_PORT")
     debug: bool = Field(default=False, alias="DEBUG")
+    api_workers: int = Field(default=1, alias="API_WORKERS")
+    # Brotli is used when the optional Brotli package is installed, gzip otherwise
+    compression_enabled: bool = Field(default=True, alias="COMPRESSION_ENABLED")
+    compression_minimum_size: int = Field(default=1024, alias="COMPRESSION_MINIMUM_SIZE")
+    compression_gzip_level: int = Field(default=6, alias="COMPRESSION_GZIP_LEVEL")
+    compression_brotli_quality: int = Field(default=4, alias="COMPRESSION_BROTLI_QUALITY")
+
+    # --- Shared State (multi-worker / multi-node) ---
+    # Implied by API_WORKERS > 1; set explicitly when running several single-worker nodes
+    shared_state: bool = Field(default=False, alias="SHARED_STATE")
+    leader_lease_seconds: float = Field(default=15.0, alias="LEADER_LEASE_SECONDS")
+    health_probe_interval: float = Field(default=30.0, alias="HEALTH_PROBE_INTERVAL")
+
+    # --- Logging ---
+    log_index_max_entries: int = Field(default=500_000, alias="LOG_INDEX_MAX_ENTRIES")
+    log_index_window_bytes: int = Field(default=64 * 1024 * 1024, alias="LOG_INDEX_WINDOW_BYTES")
+    log_follow_interval: float = Field(default=0.5, alias="LOG_FOLLOW_INTERVAL")
 
     # --- Database (PostgreSQL) ---
     database_url: str = Field(
@@ -24,16 +41,31 @@ class Settings(BaseSettings):
 
     # --- Redis ---
     redis_url: str = Field(default="redis://localhost:6379/0", alias="REDIS_URL")
+    redis_max_connections: int = Field(default=50, alias="REDIS_MAX_CONNECTIONS")
 
     # --- Vector DB (Chroma) ---
     chroma_path: str = Field(default="./data/chroma_db", alias="CHROMA_PATH")
+    # A Chroma server; needed when several processes (API workers, Celery) share memory
+    chroma_host: str = Field(default="", alias="CHROMA_HOST")
+    chroma_port: int = Field(default=8000, alias="CHROMA_PORT")
+    vector_backend: str = Field(default="chroma", alias="VECTOR_BACKEND")  # chroma | quantized
+
+    # --- Vector DB (Quantized, for low-RAM hosts) ---
+    quantized_path: str = Field(default="./data/vectors", alias="QUANTIZED_PATH")
+    quantized_dtype: str = Field(default="int8", alias="QUANTIZED_DTYPE")  # int8 | float16
+    quantized_search_block: int = Field(default=16384, alias="QUANTIZED_SEARCH_BLOCK")
+    quantized_ivf_min_size: int = Field(default=20000, alias="QUANTIZED_IVF_MIN_SIZE")
+    quantized_nprobe: int = Field(default=8, alias="QUANTIZED_NPROBE")
 
     # --- AI (General) ---
     ai_provider: str = Field(default="ollama", alias="AI_PROVIDER")
+    # Follow-up calls allowed to fix structured output that fails its schema
+    structured_max_repairs: int = Field(default=2, alias="STRUCTURED_MAX_REPAIRS")
 
     # --- AI (Ollama) ---
     ollama_host: str = Field(default="http://localhost:11434", alias="OLLAMA_HOST")
     ollama_model: str = Field(default="llama3.2", alias="OLLAMA_MODEL")
+    ollama_keep_alive: str = Field(default="30m", alias="OLLAMA_KEEP_ALIVE")
 
     # --- AI (Gemini) ---
     gemini_api_key: str = Field(default="", alias="GEMINI_API_KEY")
@@ -45,6 +77,19 @@ class Settings(BaseSettings):
         alias="TESSERACT_PATH"
     )
 
+    # --- Voice (Piper TTS) ---
+    tts_enabled: bool = Field(default=False, alias="TTS_ENABLED")
+    tts_voice: str = Field(default="en_US-lessac-medium", alias="PIPER_VOICE_MODEL")
+    tts_voice_dir: str = Field(default="./data/voices", alias="PIPER_VOICE_DIR")
+    tts_workers: int = Field(default=1, alias="TTS_WORKERS")
+    tts_lookahead: int = Field(default=3, alias="TTS_LOOKAHEAD")
+    tts_memory_cache_size: int = Field(default=64, alias="TTS_MEMORY_CACHE_SIZE")
+    tts_cache_prefix: str = Field(default="tts", alias="TTS_CACHE_PREFIX")
+    tts_announcements: str = Field(
+        default="Door unlocked.|Door locked.|Good morning.|Good night.|Motion detected at the front door.",
+        alias="TTS_ANNOUNCEMENTS"
+    )
+
     # --- Storage (MinIO) ---
     minio_endpoint: str = Field(default="localhost:9000", alias="MINIO_ENDPOINT")
     minio_access_key: str = Field(default="minioadmin", alias="MINIO_ACCESS_KEY")
@@ -52,6 +97,49 @@ class Settings(BaseSettings):
     minio_secure: bool = Field(default=False, alias="MINIO_SECURE")
     minio_bucket_name: str = Field(default="aria-storage", alias="MINIO_BUCKET_NAME")
 
+    # --- Conversations ---
+    conversation_cache_sessions: int = Field(default=256, alias="CONVERSATION_CACHE_SESSIONS")
+    conversation_recent_messages: int = Field(default=50, alias="CONVERSATION_RECENT_MESSAGES")
+    conversation_batch_size: int = Field(default=100, alias="CONVERSATION_BATCH_SIZE")
+    conversation_flush_interval: float = Field(default=0.5, alias="CONVERSATION_FLUSH_INTERVAL")
+    conversation_cache_ttl: int = Field(default=3600, alias="CONVERSATION_CACHE_TTL")
+    # Failed writes of a session's messages before they are dropped (with backoff)
+    conversation_flush_attempts: int = Field(default=10, alias="CONVERSATION_FLUSH_ATTEMPTS")
+    chat_context_messages: int = Field(default=20, alias="CHAT_CONTEXT_MESSAGES")
+
+    # --- Chat Admission Control ---
+    chat_rate_per_client: float = Field(default=0.5, alias="CHAT_RATE_PER_CLIENT")  # tokens/second
+    chat_burst_per_client: int = Field(default=5, alias="CHAT_BURST_PER_CLIENT")
+    chat_rate_per_key: float = Field(default=2.0, alias="CHAT_RATE_PER_KEY")
+    chat_burst_per_key: int = Field(default=20, alias="CHAT_BURST_PER_KEY")
+    chat_max_concurrency: int = Field(default=2, alias="CHAT_MAX_CONCURRENCY")  # per worker
+    chat_max_queue: int = Field(default=8, alias="CHAT_MAX_QUEUE")  # per lane
+    chat_queue_timeout: float = Field(default=30.0, alias="CHAT_QUEUE_TIMEOUT")
+    automation_api_keys: str = Field(default="", alias="AUTOMATION_API_KEYS")  # comma-separated
+
+    # --- Events ---
+    event_history_size: int = Field(default=500, alias="EVENT_HISTORY_SIZE")
+    event_queue_size: int = Field(default=100, alias="EVENT_QUEUE_SIZE")
+
+    # --- Memory Consolidation ---
+    consolidation_interval_hours: float = Field(default=24.0, alias="CONSOLIDATION_INTERVAL_HOURS")
+    consolidation_similarity: float = Field(default=0.95, alias="CONSOLIDATION_SIMILARITY")  # cosine
+    consolidation_block_size: int = Field(default=2048, alias="CONSOLIDATION_BLOCK_SIZE")
+    consolidation_promote_threshold: float = Field(default=0.7, alias="CONSOLIDATION_PROMOTE_THRESHOLD")
+    consolidation_repeat_weight: float = Field(default=0.1, alias="CONSOLIDATION_REPEAT_WEIGHT")
+    consolidation_summarize: bool = Field(default=True, alias="CONSOLIDATION_SUMMARIZE")
+
+    # --- Dashboard Stats ---
+    stats_rate_window_minutes: int = Field(default=5, alias="STATS_RATE_WINDOW_MINUTES")
+    stats_push_interval: float = Field(default=1.0, alias="STATS_PUSH_INTERVAL")
+
+    # --- Warm-Up ---
+    warmup_enabled: bool = Field(default=True, alias="WARMUP_ENABLED")
+    warmup_steps: str = Field(default="model,database,redis,vector,ocr,logs,tts,stats", alias="WARMUP_STEPS")
+    warmup_required_steps: str = Field(default="model,database", alias="WARMUP_REQUIRED_STEPS")
+    warmup_timeout: float = Field(default=120.0, alias="WARMUP_TIMEOUT")
+    warmup_pool_connections: int = Field(default=5, alias="WARMUP_POOL_CONNECTIONS")
+
     class Config:
         env_file = ".env"
         env_file_encoding = "utf-8"
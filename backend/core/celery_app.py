@@ -15,6 +15,7 @@ celery_app = Celery(
     "aria_worker",
     broker=settings.redis_url,
     backend=settings.redis_url,
+    include=["services.consolidation"],
 )
 
 celery_app.conf.update(
@@ -27,5 +28,13 @@ celery_app.conf.update(
     # worker_pool = 'solo'  <-- Set this via command line: celery -A core.celery_app worker --pool=solo
 )
 
+# --- Periodic Tasks (celery -A core.celery_app beat) ---
+celery_app.conf.beat_schedule = {
+    "consolidate-memory": {
+        "task": "memory.consolidate",
+        "schedule": settings.consolidation_interval_hours * 3600,
+    },
+}
+
 # Auto-discover tasks from other modules if needed
 # celery_app.autodiscover_tasks(['services.some_service'])
@@ -0,0 +1,186 @@
+"""
+ARIA Coordination
+Shared-state primitives for running several API workers or nodes.
+
+With a single worker everything stays in process. When `API_WORKERS` > 1 or
+`SHARED_STATE` is set, state that must agree across workers lives in Redis:
+locks are SET NX PX keys released only by their owner, and jobs that must run
+once per deployment are held by a leader elected through a renewed lease.
+"""
+import asyncio
+import contextlib
+import os
+import socket
+import time
+import uuid
+from typing import Awaitable, Callable, Optional
+
+from config.settings import settings
+from core.redis_client import get_redis
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+_leader_elector_instance = None
+
+WORKER_ID = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+# Delete / extend a key only while it still holds our token
+_RELEASE_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+_RENEW_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('PEXPIRE', KEYS[1], ARGV[2])
+end
+return 0
+"""
+
+
+def shared_state_enabled() -> bool:
+    """True when state has to be shared with other worker processes."""
+    return settings.shared_state or settings.api_workers > 1
+
+
+class DistributedLock:
+    """
+    A Redis lock. The TTL bounds how long a crashed holder can block others,
+    so it should comfortably exceed the critical section.
+    """
+
+    def __init__(self, name: str, ttl: float = 60.0, timeout: Optional[float] = None, poll_interval: float = 0.1):
+        self.name = name
+        self.key = f"aria:lock:{name}"
+        self.ttl_ms = int(ttl * 1000)
+        self.timeout = timeout
+        self.poll_interval = poll_interval
+        self.token = uuid.uuid4().hex
+
+    async def acquire(self) -> bool:
+        """Waits for the lock. Returns False if `timeout` passes first."""
+        deadline = None if self.timeout is None else time.monotonic() + self.timeout
+        while True:
+            if await get_redis().set(self.key, self.token, nx=True, px=self.ttl_ms):
+                return True
+            if deadline is not None and time.monotonic() >= deadline:
+                return False
+            await asyncio.sleep(self.poll_interval)
+
+    async def release(self):
+        await get_redis().eval(_RELEASE_SCRIPT, 1, self.key, self.token)
+
+    async def renew(self) -> bool:
+        """Resets the TTL while the lock is still ours. Returns False if it was lost."""
+        return bool(await get_redis().eval(_RENEW_SCRIPT, 1, self.key, self.token, self.ttl_ms))
+
+    async def __aenter__(self) -> "DistributedLock":
+        if not await self.acquire():
+            raise TimeoutError(f"Timed out waiting for lock '{self.name}'")
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.release()
+
+
+def shared_lock(name: str, ttl: float = 60.0, timeout: Optional[float] = None):
+    """Lock across workers in shared mode; a no-op with a single worker."""
+    if shared_state_enabled():
+        return DistributedLock(name, ttl=ttl, timeout=timeout)
+    return contextlib.nullcontext()
+
+
+class LeaderElector:
+    """
+    Runs registered jobs on exactly one worker. The leader renews its lease
+    every third of the lease time; if it dies, another worker takes over once
+    the lease expires. With a single worker it is always the leader.
+    """
+
+    def __init__(self, lease_seconds: float, name: str = "leader"):
+        self.lease_seconds = lease_seconds
+        self.key = f"aria:{name}"
+        self.is_leader = False
+        self._jobs: dict[str, Callable[[], Awaitable[None]]] = {}
+        self._running: dict[str, asyncio.Task] = {}
+        self._task: Optional[asyncio.Task] = None
+
+    def register(self, name: str, job: Callable[[], Awaitable[None]]):
+        """Adds a long-running job to start whenever this worker becomes leader."""
+        self._jobs[name] = job
+
+    # --- Lifecycle ---
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self.is_leader:
+            await self._step_down()
+            if shared_state_enabled():
+                try:
+                    await get_redis().eval(_RELEASE_SCRIPT, 1, self.key, WORKER_ID)
+                except Exception as e:
+                    logger.warning(f"Failed to release leadership: {e}")
+
+    async def _run(self):
+        if not shared_state_enabled():
+            self._take_lead()
+            return
+
+        while True:
+            try:
+                leading = await self._try_lead()
+            except Exception as e:
+                logger.warning(f"Leader election failed: {e}")
+                leading = False
+            if leading and not self.is_leader:
+                self._take_lead()
+            elif not leading and self.is_leader:
+                await self._step_down()
+            await asyncio.sleep(self.lease_seconds / 3)
+
+    async def _try_lead(self) -> bool:
+        lease_ms = int(self.lease_seconds * 1000)
+        if self.is_leader:
+            return bool(await get_redis().eval(_RENEW_SCRIPT, 1, self.key, WORKER_ID, lease_ms))
+        return bool(await get_redis().set(self.key, WORKER_ID, nx=True, px=lease_ms))
+
+    # --- Jobs ---
+    def _take_lead(self):
+        self.is_leader = True
+        logger.info(f"Worker {WORKER_ID} is leader, starting: {', '.join(self._jobs) or 'no jobs'}")
+        for name, job in self._jobs.items():
+            self._running[name] = asyncio.create_task(self._supervise(name, job))
+
+    async def _step_down(self):
+        self.is_leader = False
+        logger.info(f"Worker {WORKER_ID} lost leadership")
+        tasks, self._running = list(self._running.values()), {}
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def _supervise(self, name: str, job: Callable[[], Awaitable[None]]):
+        try:
+            await job()
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"Leader job '{name}' failed: {e}")
+
+
+def get_leader_elector() -> LeaderElector:
+    """Returns a singleton LeaderElector."""
+    global _leader_elector_instance
+    if _leader_elector_instance is None:
+        _leader_elector_instance = LeaderElector(lease_seconds=settings.leader_lease_seconds)
+    return _leader_elector_instance
@@ -1,26 +1,51 @@
 """
 ARIA Database Configuration
 Sets up the asynchronous SQLAlchemy engine and session factory for PostgreSQL.
+
+The engine (and with it the asyncpg driver) is created on first use rather
+than at import time. `engine` and `AsyncSessionLocal` remain importable as
+module attributes for existing callers.
 """
-from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
+from functools import lru_cache
+
+from sqlalchemy.ext.asyncio import AsyncEngine, async_sessionmaker, AsyncSession
 from sqlalchemy.orm import DeclarativeBase
 
 from config.settings import settings
 
+
 # --- Database Engine ---
-engine = create_async_engine(
-    settings.database_url,
-    echo=settings.debug,
-    future=True,
-)
+@lru_cache()
+def get_engine() -> AsyncEngine:
+    """Returns the shared async engine, creating it on first call."""
+    from sqlalchemy.ext.asyncio import create_async_engine
+
+    return create_async_engine(
+        settings.database_url,
+        echo=settings.debug,
+        future=True,
+    )
+
 
 # --- Session Factory ---
-AsyncSessionLocal = async_sessionmaker(
-    bind=engine,
-    class_=AsyncSession,
-    expire_on_commit=False,
-    autoflush=False,
-)
+@lru_cache()
+def get_session_factory() -> async_sessionmaker[AsyncSession]:
+    """Returns the shared session factory bound to the engine."""
+    return async_sessionmaker(
+        bind=get_engine(),
+        class_=AsyncSession,
+        expire_on_commit=False,
+        autoflush=False,
+    )
+
+
+def __getattr__(name: str):
+    # Lazy module attributes (PEP 562) for `from core.database import engine`
+    if name == "engine":
+        return get_engine()
+    if name == "AsyncSessionLocal":
+        return get_session_factory()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 # --- Base Model ---
@@ -29,13 +54,25 @@ class Base(DeclarativeBase):
     pass
 
 
+# --- Schema ---
+async def init_db():
+    """Creates any missing tables for the registered models."""
+    import models  # noqa: F401 - registers the tables on Base.metadata
+    from core.coordination import shared_lock
+
+    # Concurrent CREATE TABLE from several workers can fail on PostgreSQL
+    async with shared_lock("init-db"):
+        async with get_engine().begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+
+
 # --- Dependency ---
 async def get_db() -> AsyncSession:
     """
     Dependency that yields a database session.
     Used in FastAPI routes.
     """
-    async with AsyncSessionLocal() as session:
+    async with get_session_factory()() as session:
         try:
             yield session
         finally:
@@ -0,0 +1,64 @@
+"""
+ARIA Conditional Responses
+ETag and Last-Modified validators for read-heavy endpoints.
+
+Endpoints build validators from something cheap that changes whenever the
+response would (a Redis version counter, a file's mtime and size) and check
+them before doing the real work. A client already holding the current
+response gets 304 with no body. `Cache-Control: no-cache` lets browsers keep
+responses but revalidate them on every poll.
+"""
+import hashlib
+from email.utils import formatdate, parsedate_to_datetime
+from typing import Optional
+
+from fastapi import Request, Response
+
+
+def make_etag(*parts) -> str:
+    """A weak ETag identifying the given version parts."""
+    digest = hashlib.sha1("\0".join(map(str, parts)).encode()).hexdigest()[:20]
+    return f'W/"{digest}"'
+
+
+def not_modified(
+    request: Request, response: Response, etag: Optional[str] = None, last_modified: Optional[float] = None
+) -> Optional[Response]:
+    """
+    Sets the validators on `response` and returns a 304 response if the
+    request's conditional headers show the client is up to date, else None.
+    `last_modified` is a Unix timestamp.
+    """
+    headers = {"Cache-Control": "no-cache"}
+    if etag:
+        headers["ETag"] = etag
+    if last_modified is not None:
+        headers["Last-Modified"] = formatdate(last_modified, usegmt=True)
+    response.headers.update(headers)
+
+    if _is_fresh(request, etag, last_modified):
+        return Response(status_code=304, headers=headers)
+    return None
+
+
+def _is_fresh(request: Request, etag: Optional[str], last_modified: Optional[float]) -> bool:
+    # If-None-Match takes precedence over If-Modified-Since (RFC 9110 13.2.2)
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        if etag is None:
+            return False
+        if if_none_match.strip() == "*":
+            return True
+        # Weak comparison; compression may have weakened the client's copy
+        tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+        return etag.removeprefix("W/") in tags
+
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since and last_modified is not None:
+        try:
+            since = parsedate_to_datetime(if_modified_since).timestamp()
+        except (TypeError, ValueError):
+            return False
+        # HTTP dates have one-second resolution
+        return int(last_modified) <= since
+    return False
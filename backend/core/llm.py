@@ -1,22 +1,49 @@
 """
 ARIA AI Engine Configuration
 Sets up the AI client (Ollama or Gemini) for LLM inference.
+
+Provider SDKs are imported when their client is constructed, so only the
+configured provider's SDK is ever loaded.
 """
-from ollama import AsyncClient as OllamaAsyncClient
-from google import genai
+from typing import AsyncIterator, Optional
+
 from config.settings import settings
 from utils.logger import get_logger
 
 logger = get_logger(__name__)
 _ai_client_instance = None
 
+# JSON Schema keywords Gemini's response schema understands
+GEMINI_SCHEMA_KEYS = {
+    'type', 'description', 'enum', 'properties', 'required', 'items', 'anyOf',
+    'minimum', 'maximum', 'minItems', 'maxItems', 'minLength', 'maxLength', 'pattern', 'nullable',
+}
+
+
+def _gemini_schema(schema):
+    """Drops keywords Gemini rejects; they are still checked when the output is validated."""
+    if isinstance(schema, list):
+        return [_gemini_schema(item) for item in schema]
+    if not isinstance(schema, dict):
+        return schema
+    cleaned = {key: value for key, value in schema.items() if key in GEMINI_SCHEMA_KEYS}
+    if 'properties' in cleaned:
+        cleaned['properties'] = {name: _gemini_schema(item) for name, item in cleaned['properties'].items()}
+    for key in ('items', 'anyOf'):
+        if key in cleaned:
+            cleaned[key] = _gemini_schema(cleaned[key])
+    return cleaned
+
+
 class GeminiClient:
     """Wrapper for Google Gemini API (google-genai SDK)."""
     def __init__(self):
         if not settings.gemini_api_key:
             logger.error("GEMINI_API_KEY is not set.")
             raise ValueError("GEMINI_API_KEY is required for Gemini provider.")
-            
+
+        from google import genai
+
         self.client = genai.Client(api_key=settings.gemini_api_key)
         self.model_name = settings.gemini_model
 
@@ -77,21 +104,68 @@ class GeminiClient:
             logger.error(f"Gemini chat failed: {e}")
             raise
 
+    async def stream_generate(
+        self,
+        prompt: str,
+        system: str = None,
+        model: str = None,
+        stats: Optional[dict] = None,
+        schema: Optional[dict] = None,
+    ) -> AsyncIterator[str]:
+        try:
+            target_model = model if model else self.model_name
+            config = {}
+            if system:
+                config['system_instruction'] = system
+            if schema:
+                config['response_mime_type'] = 'application/json'
+                config['response_schema'] = _gemini_schema(schema)
+
+            stream = await self.client.aio.models.generate_content_stream(
+                model=target_model,
+                contents=prompt,
+                config=config or None
+            )
+            async for chunk in stream:
+                if stats is not None and chunk.usage_metadata:
+                    stats['eval_count'] = chunk.usage_metadata.candidates_token_count
+                    stats['prompt_eval_count'] = chunk.usage_metadata.prompt_token_count
+                if chunk.text:
+                    yield chunk.text
+        except Exception as e:
+            logger.error(f"Gemini streaming failed: {e}")
+            raise
+
+    async def warm_up(self, model: str = None) -> None:
+        # Hosted models have nothing to preload; the SDK client is already built
+        return None
+
+    async def unload(self, model: str = None) -> None:
+        return None
+
+    async def loaded_models(self) -> list[dict]:
+        # Memory use of hosted models is not observable
+        return []
+
     async def get_available_models(self) -> list[str]:
         # Hardcoded list based on available models for the key
         return ["gemini-2.0-flash", "gemini-2.5-flash", "gemini-2.5-pro"]
         
     async def check_connection(self) -> bool:
+        """Fetches the model's metadata; unlike a generation this is not billed."""
         try:
-            await self.generate("test")
+            await self.client.aio.models.get(model=self.model_name)
             return True
-        except Exception:
+        except Exception as e:
+            logger.error(f"Gemini connection check failed: {e}")
             return False
 
 
 class OllamaClient:
     """Wrapper for Ollama AsyncClient."""
     def __init__(self):
+        from ollama import AsyncClient as OllamaAsyncClient
+
         self.host = settings.ollama_host
         self.model = settings.ollama_model
         self.client = OllamaAsyncClient(host=self.host)
@@ -110,7 +184,12 @@ class OllamaClient:
     async def chat(self, messages: list[dict], model: str = None) -> str:
         try:
             target_model = model if model else self.model
-            response = await self.client.chat(model=target_model, messages=messages, stream=False)
+            response = await self.client.chat(
+                model=target_model,
+                messages=messages,
+                stream=False,
+                keep_alive=settings.ollama_keep_alive,
+            )
             return response['message']['content']
         except Exception as e:
             logger.error(f"Ollama chat failed: {e}")
@@ -119,12 +198,73 @@ class OllamaClient:
     async def generate(self, prompt: str, system: str = None, model: str = None) -> str:
         try:
             target_model = model if model else self.model
-            response = await self.client.generate(model=target_model, prompt=prompt, system=system, stream=False)
+            response = await self.client.generate(
+                model=target_model,
+                prompt=prompt,
+                system=system,
+                stream=False,
+                keep_alive=settings.ollama_keep_alive,
+            )
             return response['response']
         except Exception as e:
             logger.error(f"Ollama generation failed: {e}")
             raise
 
+    async def stream_generate(
+        self,
+        prompt: str,
+        system: str = None,
+        model: str = None,
+        stats: Optional[dict] = None,
+        schema: Optional[dict] = None,
+    ) -> AsyncIterator[str]:
+        """
+        Yields response text as it is generated. If `stats` is given, it is
+        filled with Ollama's timing counters from the final chunk. A JSON
+        `schema` constrains the output to documents matching it.
+        """
+        try:
+            target_model = model if model else self.model
+            stream = await self.client.generate(
+                model=target_model,
+                prompt=prompt,
+                system=system,
+                stream=True,
+                format=schema or '',
+                keep_alive=settings.ollama_keep_alive,
+            )
+            async for chunk in stream:
+                if chunk['response']:
+                    yield chunk['response']
+                if chunk.get('done') and stats is not None:
+                    for key in ('eval_count', 'eval_duration', 'load_duration', 'prompt_eval_count', 'total_duration'):
+                        stats[key] = chunk.get(key)
+        except Exception as e:
+            logger.error(f"Ollama streaming failed: {e}")
+            raise
+
+    async def warm_up(self, model: str = None) -> None:
+        """Loads the model into memory. An empty prompt makes Ollama load without generating."""
+        target_model = model if model else self.model
+        await self.client.generate(model=target_model, prompt="", keep_alive=settings.ollama_keep_alive)
+
+    async def unload(self, model: str = None) -> None:
+        """Evicts the model from memory."""
+        target_model = model if model else self.model
+        await self.client.generate(model=target_model, prompt="", keep_alive=0)
+
+    async def loaded_models(self) -> list[dict]:
+        """Returns the resident models with their memory footprint in bytes."""
+        try:
+            response = await self.client.ps()
+            return [
+                {'model': m['model'], 'size': m.get('size'), 'size_vram': m.get('size_vram')}
+                for m in response['models']
+            ]
+        except Exception as e:
+            logger.error(f"Ollama ps failed: {e}")
+            return []
+
     async def check_connection(self) -> bool:
         try:
             await self.client.list()
@@ -159,6 +299,25 @@ class AIClient:
     async def check_connection(self) -> bool:
         return await self.client.check_connection()
 
+    async def warm_up(self, model: str = None) -> None:
+        return await self.client.warm_up(model)
+
+    def stream_generate(
+        self,
+        prompt: str,
+        system: str = None,
+        model: str = None,
+        stats: Optional[dict] = None,
+        schema: Optional[dict] = None,
+    ) -> AsyncIterator[str]:
+        return self.client.stream_generate(prompt, system, model, stats, schema)
+
+    async def unload(self, model: str = None) -> None:
+        return await self.client.unload(model)
+
+    async def loaded_models(self) -> list[dict]:
+        return await self.client.loaded_models()
+
 
 def get_ai_client() -> AIClient:
     """Returns a singleton AIClient."""
@@ -0,0 +1,569 @@
+"""
+ARIA Quantized Vector Store
+A compact alternative to ChromaDB for low-RAM hosts.
+
+Vectors are normalized and stored as int8 (with a per-vector scale) or
+float16 in memory-mapped NumPy files, so they take a quarter (int8) or half
+(float16) of the space of float32 and the OS only pages in what searches
+touch. Ids, documents and metadata live in a SQLite file next to them.
+
+Search is exact, in batched matrix products over blocks of the memmap, until
+a collection reaches `ivf_min_size` entries. Then an IVF index is trained:
+vectors are bucketed by their nearest k-means centroid and a query scans
+only its `nprobe` closest buckets. Distances are cosine distances.
+
+Collections implement the part of the Chroma Collection API that ARIA uses
+(add, upsert, update, get, query, delete, count), so `core.vector_db` can
+hand out either.
+
+Several processes (API workers, the Celery worker) may open the same files.
+Writers take SQLite's write lock (BEGIN IMMEDIATE) and reload their view of
+the slots, capacity and index if another process committed in between;
+every commit bumps a generation counter so readers can tell too.
+"""
+import json
+import math
+import os
+import sqlite3
+import threading
+from collections import Counter
+from contextlib import contextmanager
+from functools import lru_cache
+from pathlib import Path
+from typing import Optional, Sequence
+
+import numpy as np
+
+from config.settings import settings
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+DTYPES = {"int8": np.int8, "float16": np.float16}
+MIN_CAPACITY = 1024
+SQLITE_MAX_PARAMS = 900
+IVF_TRAINING_ITERATIONS = 10
+IVF_SAMPLES_PER_LIST = 256
+# Seconds a writer waits for another process holding the write lock
+WRITE_LOCK_TIMEOUT = 60.0
+
+
+def _unit(vectors) -> np.ndarray:
+    vectors = np.atleast_2d(np.asarray(vectors, dtype=np.float32))
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors / np.maximum(norms, 1e-12)
+
+
+def _unique_ids(ids) -> list[str]:
+    """The ids as a list. Raises ValueError on duplicates, as Chroma does."""
+    ids = list(ids)
+    if len(set(ids)) < len(ids):
+        duplicates = sorted({id_ for id_, count in Counter(ids).items() if count > 1})
+        raise ValueError(f"Expected IDs to be unique, found duplicates of: {', '.join(duplicates[:10])}")
+    return ids
+
+
+def _chunks(items: Sequence, size: int = SQLITE_MAX_PARAMS):
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def _top_k(scores: np.ndarray, slots: np.ndarray, k: int) -> tuple[np.ndarray, np.ndarray]:
+    """Best `k` columns per row, highest score first. `slots` is per-row or shared."""
+    if scores.shape[1] > k:
+        best = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+    else:
+        best = np.broadcast_to(np.arange(scores.shape[1]), scores.shape)
+    best_scores = np.take_along_axis(scores, best, axis=1)
+    order = np.argsort(-best_scores, axis=1)
+    best = np.take_along_axis(best, order, axis=1)
+    slots = np.broadcast_to(slots, scores.shape) if slots.ndim == 1 else slots
+    return np.take_along_axis(best_scores, order, axis=1), np.take_along_axis(slots, best, axis=1)
+
+
+class QuantizedCollection:
+    """One collection: a vector memmap, its scales and IVF assignments, and a SQLite table."""
+
+    def __init__(
+        self,
+        name: str,
+        path: Path,
+        dtype: str,
+        embedding_function=None,
+        search_block: int = 16384,
+        ivf_min_size: int = 20000,
+        nprobe: int = 8,
+    ):
+        self.name = name
+        self._dir = Path(path)
+        self._dir.mkdir(parents=True, exist_ok=True)
+        self._embedding_function = embedding_function
+        self.search_block = search_block
+        self.ivf_min_size = ivf_min_size
+        self.nprobe = nprobe
+        self._lock = threading.RLock()
+
+        # Autocommit; writes open their own BEGIN IMMEDIATE transactions
+        self._db = sqlite3.connect(
+            self._dir / "meta.db", timeout=WRITE_LOCK_TIMEOUT, isolation_level=None, check_same_thread=False
+        )
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS entries ("
+            "slot INTEGER PRIMARY KEY, id TEXT NOT NULL UNIQUE, document TEXT, metadata TEXT)"
+        )
+        self._db.execute("CREATE TABLE IF NOT EXISTS state (key TEXT PRIMARY KEY, value TEXT)")
+
+        # An existing collection keeps the dtype it was created with
+        stored = self._db.execute("SELECT value FROM state WHERE key = 'dtype'").fetchone()
+        self.dtype = np.dtype(DTYPES[stored[0] if stored else dtype])
+        self._reload()
+
+    # --- Consistency across processes ---
+    def _generation_in_db(self) -> int:
+        row = self._db.execute("SELECT value FROM state WHERE key = 'generation'").fetchone()
+        return int(row[0]) if row else 0
+
+    def _reload(self):
+        """Rebuilds this process's view (slots, maps, index) from the files."""
+        state = dict(self._db.execute("SELECT key, value FROM state"))
+        self.dim: Optional[int] = int(state["dim"]) if "dim" in state else None
+        self._trained_size = int(state.get("ivf_trained_size", 0))
+        self._generation = int(state.get("generation", 0))
+
+        # Reopening also picks up files another process grew and replaced
+        self._vectors = self._scales = self._assignments = self._centroids = None
+        self._lists: Optional[tuple[np.ndarray, np.ndarray]] = None
+        self._capacity = 0
+        if self.dim is not None:
+            self._open()
+        slots = [slot for (slot,) in self._db.execute("SELECT slot FROM entries")]
+        self._size = max(slots) + 1 if slots else 0
+        self._live = np.zeros(max(self._capacity, self._size), dtype=bool)
+        self._live[slots] = True
+        self._count = len(slots)
+        self._free = np.flatnonzero(~self._live[:self._size]).tolist()
+
+    def _sync(self):
+        if self._generation_in_db() != self._generation:
+            self._reload()
+
+    @contextmanager
+    def _write(self):
+        """
+        Runs a write holding SQLite's write lock, which serializes writers in
+        every process, on a view that includes all earlier commits.
+        """
+        with self._lock:
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                self._sync()
+                yield
+                self._set_state(generation=self._generation + 1)
+                self._db.execute("COMMIT")
+                self._generation += 1
+            except BaseException:
+                self._db.execute("ROLLBACK")
+                # Slots and vectors touched in memory are not committed
+                self._reload()
+                raise
+
+    @contextmanager
+    def _read(self):
+        with self._lock:
+            self._sync()
+            yield
+
+    # --- Files ---
+    def _file(self, name: str) -> Path:
+        return self._dir / f"{name}.npy"
+
+    def _open(self):
+        self._vectors = np.load(self._file("vectors"), mmap_mode="r+")
+        self._capacity = len(self._vectors)
+        if self.dtype == np.int8:
+            self._scales = np.load(self._file("scales"), mmap_mode="r+")
+        self._assignments = np.load(self._file("ivf_assignments"), mmap_mode="r+")
+        if self._file("ivf_centroids").exists():
+            self._centroids = np.load(self._file("ivf_centroids"))
+
+    def _arrays(self) -> dict[str, tuple]:
+        """File name -> (dtype, row shape) of each per-slot array."""
+        arrays = {"vectors": (self.dtype, (self.dim,)), "ivf_assignments": (np.int32, ())}
+        if self.dtype == np.int8:
+            arrays["scales"] = (np.float32, ())
+        return arrays
+
+    def _ensure_capacity(self, needed: int):
+        if needed <= self._capacity:
+            return
+        capacity = max(needed, self._capacity * 2, MIN_CAPACITY)
+        current = {"vectors": self._vectors, "scales": self._scales, "ivf_assignments": self._assignments}
+        for name, (dtype, row_shape) in self._arrays().items():
+            tmp = self._dir / f"{name}.tmp.npy"
+            grown = np.lib.format.open_memmap(tmp, mode="w+", dtype=dtype, shape=(capacity, *row_shape))
+            if name == "ivf_assignments":
+                grown[:] = -1
+            if current[name] is not None:
+                grown[:self._capacity] = current[name]
+            grown.flush()
+            del grown
+            current[name] = None
+        # Release the old maps before replacing their files (required on Windows).
+        # Other processes keep the old files mapped until their next sync.
+        self._vectors = self._scales = self._assignments = None
+        for name in self._arrays():
+            os.replace(self._dir / f"{name}.tmp.npy", self._file(name))
+        self._open()
+        live = np.zeros(capacity, dtype=bool)
+        live[:len(self._live)] = self._live
+        self._live = live
+
+    def _set_state(self, **values):
+        self._db.executemany(
+            "INSERT INTO state (key, value) VALUES (?, ?) ON CONFLICT(key) DO UPDATE SET value = excluded.value",
+            [(key, str(value)) for key, value in values.items()],
+        )
+
+    # --- Vectors ---
+    def _embed(self, documents: list) -> np.ndarray:
+        if self._embedding_function is None:
+            from chromadb.utils.embedding_functions import DefaultEmbeddingFunction
+
+            self._embedding_function = DefaultEmbeddingFunction()
+        return _unit(self._embedding_function(list(documents)))
+
+    def _quantize(self, unit: np.ndarray) -> tuple[np.ndarray, Optional[np.ndarray]]:
+        if self.dtype == np.int8:
+            scales = np.maximum(np.abs(unit).max(axis=1), 1e-12) / 127.0
+            return np.rint(unit / scales[:, None]).astype(np.int8), scales.astype(np.float32)
+        return unit.astype(self.dtype), None
+
+    def _dequantize(self, slots) -> np.ndarray:
+        vectors = self._vectors[slots].astype(np.float32)
+        if self._scales is not None:
+            vectors *= self._scales[slots][:, None]
+        return vectors
+
+    def _store(self, slots: list[int], unit: np.ndarray):
+        if self.dim is None:
+            self.dim = unit.shape[1]
+            self._set_state(dim=self.dim, dtype=self.dtype.name)
+        elif unit.shape[1] != self.dim:
+            raise ValueError(f"Embedding dimension {unit.shape[1]} does not match collection dimensionality {self.dim}")
+
+        self._ensure_capacity(max(slots) + 1)
+        quantized, scales = self._quantize(unit)
+        self._vectors[slots] = quantized
+        if scales is not None:
+            self._scales[slots] = scales
+        if self._centroids is not None:
+            self._assignments[slots] = np.argmax(unit @ self._centroids.T, axis=1)
+            self._lists = None
+        self._vectors.flush()
+
+    def _allocate(self) -> int:
+        if self._free:
+            return self._free.pop()
+        self._size += 1
+        return self._size - 1
+
+    def _rows(self, ids: Sequence[str]) -> dict[str, tuple]:
+        """id -> (slot, document, metadata JSON) for the ids that exist."""
+        rows = {}
+        for chunk in _chunks(list(ids)):
+            placeholders = ",".join("?" * len(chunk))
+            for slot, id_, document, metadata in self._db.execute(
+                f"SELECT slot, id, document, metadata FROM entries WHERE id IN ({placeholders})", chunk
+            ):
+                rows[id_] = (slot, document, metadata)
+        return rows
+
+    # --- Writes ---
+    def _put(self, ids, embeddings, documents, metadatas, replace: bool):
+        # A repeated id would get two slots but one row, leaving an orphan vector live
+        ids = _unique_ids(ids)
+        documents = list(documents) if documents is not None else [None] * len(ids)
+        metadatas = list(metadatas) if metadatas is not None else [None] * len(ids)
+        unit = _unit(embeddings) if embeddings is not None else self._embed(documents)
+
+        with self._write():
+            existing = self._rows(ids)
+            keep = [i for i, id_ in enumerate(ids) if replace or id_ not in existing]
+            if len(keep) < len(ids):
+                logger.warning(f"Skipping {len(ids) - len(keep)} ids already in collection '{self.name}'")
+            if not keep:
+                return
+            slots = [existing[ids[i]][0] if ids[i] in existing else self._allocate() for i in keep]
+            self._store(slots, unit[keep])
+            self._db.executemany(
+                "INSERT INTO entries (slot, id, document, metadata) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT(id) DO UPDATE SET document = excluded.document, metadata = excluded.metadata",
+                [
+                    (slot, ids[i], documents[i], json.dumps(metadatas[i]) if metadatas[i] is not None else None)
+                    for slot, i in zip(slots, keep)
+                ],
+            )
+            self._count += int((~self._live[slots]).sum())
+            self._live[slots] = True
+
+    def add(self, ids, embeddings=None, documents=None, metadatas=None):
+        """Adds new entries; ids that already exist are skipped, as Chroma does."""
+        self._put(ids, embeddings, documents, metadatas, replace=False)
+
+    def upsert(self, ids, embeddings=None, documents=None, metadatas=None):
+        self._put(ids, embeddings, documents, metadatas, replace=True)
+
+    def update(self, ids, embeddings=None, documents=None, metadatas=None):
+        """Updates existing entries. New documents are re-embedded; metadata is merged."""
+        ids = _unique_ids(ids)
+        unit = None
+        if embeddings is not None:
+            unit = _unit(embeddings)
+        elif documents is not None:
+            unit = self._embed(documents)
+
+        with self._write():
+            existing = self._rows(ids)
+            keep = [i for i, id_ in enumerate(ids) if id_ in existing]
+            if len(keep) < len(ids):
+                logger.warning(f"Ignoring update of {len(ids) - len(keep)} missing ids in '{self.name}'")
+            if not keep:
+                return
+            if unit is not None:
+                self._store([existing[ids[i]][0] for i in keep], unit[keep])
+
+            rows = []
+            for i in keep:
+                slot, document, metadata = existing[ids[i]]
+                if documents is not None:
+                    document = documents[i]
+                if metadatas is not None and metadatas[i] is not None:
+                    merged = {**json.loads(metadata or "{}"), **metadatas[i]}
+                    metadata = json.dumps({key: value for key, value in merged.items() if value is not None})
+                rows.append((document, metadata, ids[i]))
+            self._db.executemany("UPDATE entries SET document = ?, metadata = ? WHERE id = ?", rows)
+
+    def delete(self, ids):
+        ids = list(ids)
+        with self._write():
+            slots = [row[0] for row in self._rows(ids).values()]
+            for chunk in _chunks(ids):
+                self._db.execute(f"DELETE FROM entries WHERE id IN ({','.join('?' * len(chunk))})", chunk)
+            if slots:
+                self._live[slots] = False
+                self._assignments[slots] = -1
+                self._lists = None
+                self._free.extend(slots)
+                self._count -= len(slots)
+
+    # --- Reads ---
+    def count(self) -> int:
+        with self._read():
+            return self._count
+
+    def get(self, ids=None, limit: Optional[int] = None, offset: Optional[int] = None, include=("metadatas", "documents")):
+        with self._read():
+            if ids is not None:
+                rows = sorted((slot, id_, document, metadata) for id_, (slot, document, metadata) in self._rows(ids).items())
+                rows = rows[offset or 0:]
+                if limit is not None:
+                    rows = rows[:limit]
+            else:
+                rows = self._db.execute(
+                    "SELECT slot, id, document, metadata FROM entries ORDER BY slot LIMIT ? OFFSET ?",
+                    (-1 if limit is None else limit, offset or 0),
+                ).fetchall()
+            slots = [row[0] for row in rows]
+            embeddings = None
+            if "embeddings" in include:
+                embeddings = self._dequantize(slots) if slots else np.empty((0, self.dim or 0), dtype=np.float32)
+
+        return {
+            "ids": [row[1] for row in rows],
+            "documents": [row[2] for row in rows] if "documents" in include else None,
+            "metadatas": [json.loads(row[3]) if row[3] else None for row in rows] if "metadatas" in include else None,
+            "embeddings": embeddings,
+            "include": list(include),
+        }
+
+    def query(
+        self,
+        query_embeddings=None,
+        query_texts=None,
+        n_results: int = 10,
+        include=("metadatas", "documents", "distances"),
+    ):
+        """Returns the `n_results` nearest entries for each query, nearest first."""
+        if query_embeddings is not None:
+            queries = _unit(query_embeddings)
+        elif query_texts is not None:
+            queries = self._embed(query_texts)
+        else:
+            raise ValueError("Provide query_embeddings or query_texts")
+
+        with self._read():
+            if self._count >= self.ivf_min_size and (self._centroids is None or self._count > 2 * self._trained_size):
+                self.build_index()
+            k = min(n_results, self._count)
+            if not k:
+                results = [(np.empty(0), np.empty(0, dtype=np.int64))] * len(queries)
+            elif self._centroids is not None:
+                results = [self._search_ivf(query, k) for query in queries]
+            else:
+                results = list(zip(*self._search_exact(queries, k)))
+
+            by_slot = {}
+            all_slots = sorted({int(slot) for _, slots in results for slot in slots if slot >= 0})
+            for chunk in _chunks(all_slots):
+                placeholders = ",".join("?" * len(chunk))
+                for slot, id_, document, metadata in self._db.execute(
+                    f"SELECT slot, id, document, metadata FROM entries WHERE slot IN ({placeholders})", chunk
+                ):
+                    by_slot[slot] = (id_, document, json.loads(metadata) if metadata else None)
+
+        response = {"ids": [], "documents": [], "metadatas": [], "distances": [], "embeddings": None}
+        for scores, slots in results:
+            hits = [(by_slot[int(slot)], float(score)) for score, slot in zip(scores, slots) if int(slot) in by_slot]
+            response["ids"].append([hit[0][0] for hit in hits])
+            response["documents"].append([hit[0][1] for hit in hits])
+            response["metadatas"].append([hit[0][2] for hit in hits])
+            response["distances"].append([1.0 - score for _, score in hits])
+        for field in ("documents", "metadatas", "distances"):
+            if field not in include:
+                response[field] = None
+        return response
+
+    # --- Search ---
+    def _search_exact(self, queries: np.ndarray, k: int) -> tuple[np.ndarray, np.ndarray]:
+        """Brute force over the memmap, one block of rows at a time."""
+        best_scores = np.full((len(queries), 0), -np.inf, dtype=np.float32)
+        best_slots = np.empty((len(queries), 0), dtype=np.int64)
+        for start in range(0, self._size, self.search_block):
+            stop = min(start + self.search_block, self._size)
+            scores = queries @ self._vectors[start:stop].astype(np.float32).T
+            if self._scales is not None:
+                scores *= self._scales[start:stop]
+            scores[:, ~self._live[start:stop]] = -np.inf
+            block_scores, block_slots = _top_k(scores, np.arange(start, stop), k)
+            best_scores, best_slots = _top_k(
+                np.hstack([best_scores, block_scores]), np.hstack([best_slots, block_slots]), k
+            )
+        return best_scores, best_slots
+
+    def _inverted_lists(self) -> tuple[np.ndarray, np.ndarray]:
+        """(slots grouped by list, start offset of each list). Rebuilt after writes."""
+        if self._lists is None:
+            assignments = self._assignments[:self._size]
+            order = np.argsort(assignments, kind="stable")
+            # Deleted slots are -1 and sort first
+            order = order[int((assignments < 0).sum()):]
+            counts = np.bincount(assignments[order], minlength=len(self._centroids))
+            self._lists = (order, np.concatenate([[0], np.cumsum(counts)]))
+        return self._lists
+
+    def _search_ivf(self, query: np.ndarray, k: int) -> tuple[np.ndarray, np.ndarray]:
+        """Scans only the `nprobe` buckets whose centroids are closest to the query."""
+        order, offsets = self._inverted_lists()
+        probes = np.argsort(-(self._centroids @ query))[:self.nprobe]
+        candidates = np.sort(np.concatenate([order[offsets[p]:offsets[p + 1]] for p in probes]))
+        if not len(candidates):
+            return np.empty(0), np.empty(0, dtype=int)
+        scores = (self._dequantize(candidates) @ query)[None, :]
+        best_scores, best_slots = _top_k(scores, candidates, min(k, len(candidates)))
+        return best_scores[0], best_slots[0]
+
+    def build_index(self, nlist: Optional[int] = None, seed: int = 0):
+        """Trains IVF centroids (spherical k-means) on a sample and assigns every entry."""
+        with self._write():
+            live = np.flatnonzero(self._live[:self._size])
+            if not len(live):
+                return
+            nlist = nlist or max(1, int(math.sqrt(len(live))))
+            rng = np.random.default_rng(seed)
+            sample = np.sort(rng.choice(live, min(len(live), nlist * IVF_SAMPLES_PER_LIST), replace=False))
+            data = self._dequantize(sample)
+            centroids = data[rng.choice(len(data), nlist, replace=False)]
+            for _ in range(IVF_TRAINING_ITERATIONS):
+                labels = np.argmax(data @ centroids.T, axis=1)
+                sums = np.zeros_like(centroids)
+                np.add.at(sums, labels, data)
+                counts = np.bincount(labels, minlength=nlist)
+                filled = counts > 0  # Empty lists keep their previous centroid
+                centroids[filled] = _unit(sums[filled])
+
+            for start in range(0, self._size, self.search_block):
+                stop = min(start + self.search_block, self._size)
+                block = self._dequantize(np.arange(start, stop))
+                labels = np.argmax(block @ centroids.T, axis=1).astype(np.int32)
+                labels[~self._live[start:stop]] = -1
+                self._assignments[start:stop] = labels
+            self._assignments.flush()
+            # Written whole then swapped in, so other processes never load a partial file
+            tmp = self._dir / "ivf_centroids.tmp.npy"
+            np.save(tmp, centroids)
+            os.replace(tmp, self._file("ivf_centroids"))
+            self._centroids = centroids
+            self._lists = None
+            self._trained_size = len(live)
+            self._set_state(ivf_trained_size=self._trained_size)
+            logger.info(f"Built IVF index for '{self.name}': {nlist} lists over {len(live)} vectors")
+
+    def memory_bytes(self) -> int:
+        """Bytes used by the stored vectors (and scales) for live capacity."""
+        if self.dim is None:
+            return 0
+        per_row = self.dim * self.dtype.itemsize + (4 if self._scales is not None else 0)
+        return self._size * per_row
+
+
+class QuantizedVectorClient:
+    """Chroma-client-like factory for quantized collections under one directory."""
+
+    def __init__(
+        self,
+        path: str,
+        dtype: str = "int8",
+        search_block: int = 16384,
+        ivf_min_size: int = 20000,
+        nprobe: int = 8,
+    ):
+        if dtype not in DTYPES:
+            raise ValueError(f"Unsupported dtype '{dtype}'. Expected one of {', '.join(DTYPES)}.")
+        self.path = Path(path)
+        self.dtype = dtype
+        self.search_block = search_block
+        self.ivf_min_size = ivf_min_size
+        self.nprobe = nprobe
+        self._collections: dict[str, QuantizedCollection] = {}
+        self._lock = threading.Lock()
+
+    def get_or_create_collection(self, name: str, embedding_function=None, **kwargs) -> QuantizedCollection:
+        with self._lock:
+            if name not in self._collections:
+                self._collections[name] = QuantizedCollection(
+                    name,
+                    self.path / name,
+                    self.dtype,
+                    embedding_function=embedding_function,
+                    search_block=self.search_block,
+                    ivf_min_size=self.ivf_min_size,
+                    nprobe=self.nprobe,
+                )
+            return self._collections[name]
+
+    def list_collections(self) -> list[str]:
+        return sorted(entry.name for entry in self.path.iterdir() if entry.is_dir()) if self.path.exists() else []
+
+
+@lru_cache()
+def get_quantized_client() -> QuantizedVectorClient:
+    """Returns a QuantizedVectorClient configured from settings."""
+    logger.info(f"Initializing quantized vector store at {settings.quantized_path} ({settings.quantized_dtype})")
+    return QuantizedVectorClient(
+        settings.quantized_path,
+        dtype=settings.quantized_dtype,
+        search_block=settings.quantized_search_block,
+        ivf_min_size=settings.quantized_ivf_min_size,
+        nprobe=settings.quantized_nprobe,
+    )
@@ -0,0 +1,34 @@
+"""
+ARIA Redis Configuration
+Sets up a shared asyncio Redis client backed by a single connection pool.
+"""
+from typing import TYPE_CHECKING
+
+from config.settings import settings
+
+if TYPE_CHECKING:
+    from redis.asyncio import Redis
+
+_redis_instance = None
+
+
+def get_redis() -> "Redis":
+    """Returns a singleton Redis client. Connections are opened on demand."""
+    global _redis_instance
+    if _redis_instance is None:
+        from redis import asyncio as aioredis
+
+        _redis_instance = aioredis.from_url(
+            settings.redis_url,
+            max_connections=settings.redis_max_connections,
+            decode_responses=True,
+        )
+    return _redis_instance
+
+
+async def close_redis():
+    """Closes the shared client and its connection pool."""
+    global _redis_instance
+    if _redis_instance is not None:
+        await _redis_instance.aclose()
+        _redis_instance = None
@@ -2,33 +2,62 @@
 ARIA Object Storage Configuration
 Sets up the MinIO client for file storage.
 """
-from minio import Minio
+from typing import TYPE_CHECKING
+
 from config.settings import settings
 
-def get_minio_client() -> Minio:
+if TYPE_CHECKING:
+    from minio import Minio
+
+_minio_client_instance = None
+_bucket_ready = False
+
+def get_minio_client() -> "Minio":
+    """
+    Returns a configured MinIO client (a thread-safe singleton).
+    """
+    global _minio_client_instance
+    if _minio_client_instance is None:
+        from minio import Minio
+
+        _minio_client_instance = Minio(
+            settings.minio_endpoint,
+            access_key=settings.minio_access_key,
+            secret_key=settings.minio_secret_key,
+            secure=settings.minio_secure
+        )
+    return _minio_client_instance
+
+def ensure_bucket():
     """
-    Returns a configured MinIO client.
+    Creates the configured bucket if it doesn't exist. Checked once per
+    process; raises if MinIO is unreachable, so a later call tries again.
     """
-    client = Minio(
-        settings.minio_endpoint,
-        access_key=settings.minio_access_key,
-        secret_key=settings.minio_secret_key,
-        secure=settings.minio_secure
-    )
-    return client
+    global _bucket_ready
+    if _bucket_ready:
+        return
+    from minio.error import S3Error
+
+    client = get_minio_client()
+    bucket_name = settings.minio_bucket_name
+    if not client.bucket_exists(bucket_name):
+        try:
+            client.make_bucket(bucket_name)
+            print(f"Created MinIO bucket: {bucket_name}")
+        except S3Error as e:
+            # Another worker created it first
+            if e.code not in ("BucketAlreadyOwnedByYou", "BucketAlreadyExists"):
+                raise
+    _bucket_ready = True
 
 def check_minio_connection() -> bool:
     """
     Verifies connection to MinIO and ensures the configured bucket exists.
     """
     try:
-        client = get_minio_client()
-        bucket_name = settings.minio_bucket_name
-        
-        if not client.bucket_exists(bucket_name):
-            client.make_bucket(bucket_name)
-            print(f"Created MinIO bucket: {bucket_name}")
-            
+        ensure_bucket()
+        # ensure_bucket only checks once; still probe the connection on every call
+        get_minio_client().bucket_exists(settings.minio_bucket_name)
         return True
     except Exception as e:
         print(f"MinIO connection failed: {e}")
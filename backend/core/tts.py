@@ -0,0 +1,279 @@
+"""
+ARIA Text-to-Speech Engine
+Pipelined Piper synthesis with an audio cache in MinIO.
+
+Streaming LLM output is split into sentences as it arrives. Each sentence is
+synthesized in a worker process while the model is still generating the next
+one, and rendered audio is cached by (voice, text) hash so fixed
+announcements play without any synthesis delay.
+"""
+import asyncio
+import hashlib
+import importlib.util
+import io
+import re
+import wave
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+from typing import AsyncIterator, Iterable, Optional
+
+from config.settings import settings
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+_tts_engine_instance = None
+
+# A sentence ends at . ! ? (optionally followed by a closing quote/bracket) plus whitespace, or at a newline
+_SENTENCE_BOUNDARY = re.compile(r"(?<=[.!?])[\"')\]]*\s+|\n+")
+_WHITESPACE = re.compile(r"\s+")
+
+
+class SentenceSplitter:
+    """
+    Incrementally splits streamed text into sentences.
+    Very short fragments ("Sure.") are merged into the next sentence so the
+    audio isn't choppy.
+    """
+
+    def __init__(self, min_chars: int = 20):
+        self.min_chars = min_chars
+        self._buffer = ""
+        self._carry = ""
+
+    def _emit(self, fragment: str) -> Optional[str]:
+        sentence = f"{self._carry} {fragment}".strip() if self._carry else fragment.strip()
+        if not sentence:
+            return None
+        if len(sentence) < self.min_chars:
+            self._carry = sentence
+            return None
+        self._carry = ""
+        return sentence
+
+    def feed(self, text: str) -> list[str]:
+        """Adds streamed text and returns any sentences it completed."""
+        self._buffer += text
+        sentences = []
+        start = 0
+        for match in _SENTENCE_BOUNDARY.finditer(self._buffer):
+            sentence = self._emit(self._buffer[start:match.start()] + self._buffer[match.start():match.end()].strip())
+            if sentence:
+                sentences.append(sentence)
+            start = match.end()
+        self._buffer = self._buffer[start:]
+        return sentences
+
+    def flush(self) -> list[str]:
+        """Returns whatever is left once the stream has ended."""
+        rest = f"{self._carry} {self._buffer}".strip()
+        self._buffer = self._carry = ""
+        return [rest] if rest else []
+
+
+def split_sentences(text: str) -> list[str]:
+    """Splits complete text into sentences."""
+    splitter = SentenceSplitter()
+    return splitter.feed(text) + splitter.flush()
+
+
+def normalize_text(text: str) -> str:
+    return _WHITESPACE.sub(" ", text).strip()
+
+
+# --- Worker Process ---
+_worker_voice = None
+
+
+def _init_worker(model_path: str):
+    """
+    Loads the Piper voice once per worker process. Anything raised here
+    breaks the whole pool, so `_get_executor` checks what it can up front.
+    """
+    global _worker_voice
+    from piper.voice import PiperVoice
+
+    _worker_voice = PiperVoice.load(model_path)
+
+
+def _synthesize_wav(text: str) -> bytes:
+    """Renders `text` to WAV bytes inside a worker process."""
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as wav_file:
+        # piper-tts >= 1.3 renamed synthesize() to synthesize_wav()
+        synthesize = getattr(_worker_voice, "synthesize_wav", None) or _worker_voice.synthesize
+        synthesize(text, wav_file)
+    return buffer.getvalue()
+
+
+class TTSEngine:
+    """Piper TTS with a process pool, an in-memory LRU and a MinIO cache."""
+
+    def __init__(self, voice: Optional[str] = None, workers: Optional[int] = None):
+        self.voice = voice or settings.tts_voice
+        self.workers = workers or settings.tts_workers
+        self.model_path = str(Path(settings.tts_voice_dir) / f"{self.voice}.onnx")
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._memory: OrderedDict[str, bytes] = OrderedDict()
+
+    # --- Cache ---
+    def cache_key(self, text: str) -> str:
+        return hashlib.sha256(f"{self.voice}\0{normalize_text(text)}".encode("utf-8")).hexdigest()
+
+    def _object_name(self, key: str) -> str:
+        return f"{settings.tts_cache_prefix}/{self.voice}/{key}.wav"
+
+    def _remember(self, key: str, audio: bytes):
+        self._memory[key] = audio
+        self._memory.move_to_end(key)
+        while len(self._memory) > settings.tts_memory_cache_size:
+            self._memory.popitem(last=False)
+
+    def _read_object(self, key: str) -> Optional[bytes]:
+        from core.storage import get_minio_client
+
+        try:
+            response = get_minio_client().get_object(settings.minio_bucket_name, self._object_name(key))
+        except Exception:
+            return None  # Missing object or storage unavailable: fall back to synthesis
+        try:
+            return response.read()
+        finally:
+            response.close()
+            response.release_conn()
+
+    def _write_object(self, key: str, audio: bytes):
+        from core.storage import ensure_bucket, get_minio_client
+
+        try:
+            ensure_bucket()
+            get_minio_client().put_object(
+                settings.minio_bucket_name,
+                self._object_name(key),
+                io.BytesIO(audio),
+                length=len(audio),
+                content_type="audio/wav",
+            )
+        except Exception as e:
+            logger.warning(f"Failed to cache TTS audio: {e}")
+
+    async def cached(self, text: str) -> Optional[bytes]:
+        """Returns cached audio for `text`, checking memory then MinIO."""
+        key = self.cache_key(text)
+        audio = self._memory.get(key)
+        if audio is None:
+            audio = await asyncio.to_thread(self._read_object, key)
+        if audio is not None:
+            self._remember(key, audio)
+        return audio
+
+    # --- Synthesis ---
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            if importlib.util.find_spec("piper") is None:
+                raise RuntimeError("piper-tts is not installed. Install requirements-voice.txt to enable voice synthesis.")
+            if not Path(self.model_path).exists():
+                raise RuntimeError(f"Piper voice model not found at {self.model_path}")
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                initializer=_init_worker,
+                initargs=(self.model_path,),
+            )
+        return self._executor
+
+    async def synthesize(self, text: str) -> bytes:
+        """Returns WAV audio for `text`, from cache when possible."""
+        text = normalize_text(text)
+        audio = await self.cached(text)
+        if audio is not None:
+            return audio
+
+        loop = asyncio.get_running_loop()
+        executor = self._get_executor()
+        try:
+            audio = await loop.run_in_executor(executor, _synthesize_wav, text)
+        except BrokenProcessPool:
+            # A broken pool never recovers; the next request starts a fresh one
+            if self._executor is executor:
+                self._executor = None
+                executor.shutdown(wait=False, cancel_futures=True)
+            raise RuntimeError("A TTS worker process exited unexpectedly (see the server log); try again.")
+        key = self.cache_key(text)
+        self._remember(key, audio)
+        # Uploading doesn't hold up playback
+        loop.run_in_executor(None, self._write_object, key, audio)
+        return audio
+
+    async def stream(self, chunks: AsyncIterator[str]) -> AsyncIterator[tuple[str, bytes]]:
+        """
+        Yields (sentence, wav_bytes) in order while `chunks` is still streaming.
+        Synthesis of each sentence starts as soon as it is complete; at most
+        `tts_lookahead` sentences are rendered ahead of the consumer.
+        """
+        pending: asyncio.Queue = asyncio.Queue(maxsize=settings.tts_lookahead)
+        done = object()
+
+        async def produce():
+            splitter = SentenceSplitter()
+            try:
+                async for chunk in chunks:
+                    for sentence in splitter.feed(chunk):
+                        await pending.put((sentence, asyncio.ensure_future(self.synthesize(sentence))))
+                for sentence in splitter.flush():
+                    await pending.put((sentence, asyncio.ensure_future(self.synthesize(sentence))))
+            finally:
+                await pending.put(done)
+
+        producer = asyncio.create_task(produce())
+        try:
+            while True:
+                item = await pending.get()
+                if item is done:
+                    break
+                sentence, future = item
+                yield sentence, await future
+            await producer  # Surface errors from the text stream
+        finally:
+            if not producer.done():
+                producer.cancel()
+            # Drop audio that was rendered ahead but never consumed
+            while not pending.empty():
+                item = pending.get_nowait()
+                if item is not done:
+                    item[1].cancel()
+
+    async def prerender(self, texts: Iterable[str]) -> int:
+        """Renders and caches fixed phrases. Returns how many were synthesized."""
+        rendered = 0
+        for text in texts:
+            if await self.cached(normalize_text(text)) is None:
+                await self.synthesize(text)
+                rendered += 1
+        return rendered
+
+    def close(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+def announcement_texts() -> list[str]:
+    """Fixed announcements from settings, pre-rendered at warm-up."""
+    return [text.strip() for text in settings.tts_announcements.split("|") if text.strip()]
+
+
+def get_tts_engine() -> TTSEngine:
+    """Returns a singleton TTSEngine for the configured voice."""
+    global _tts_engine_instance
+    if _tts_engine_instance is None:
+        _tts_engine_instance = TTSEngine()
+    return _tts_engine_instance
+
+
+def close_tts_engine():
+    """Shuts down the worker processes, if any were started."""
+    global _tts_engine_instance
+    if _tts_engine_instance is not None:
+        _tts_engine_instance.close()
+        _tts_engine_instance = None
@@ -1,22 +1,69 @@
 """
 ARIA Vector Database Configuration
-Sets up the ChromaDB client for vector embeddings.
+Sets up the vector store for embeddings: ChromaDB, or the quantized store
+(`VECTOR_BACKEND=quantized`) on hosts short on RAM.
+
+Embedded Chroma keeps its index in the memory of the process that opened
+it, so other processes never see its writes. Several API workers, or the
+Celery worker running consolidation, need a Chroma server (`CHROMA_HOST`)
+or the quantized store, which re-reads changes made by other processes.
 """
-import chromadb
-from chromadb.config import Settings
+from functools import lru_cache
+
 from config.settings import settings
 from utils.logger import get_logger
 
 logger = get_logger(__name__)
 
+# Collections backing the memory tiers (working memory lives in-process)
+MEMORY_COLLECTIONS = ("conversations", "short_term", "long_term")
 
+
+@lru_cache()
 def get_chroma_client():
     """
-    Returns a persistent ChromaDB client.
+    Returns a ChromaDB client: an HTTP client when `CHROMA_HOST` is set,
+    otherwise a persistent client embedded in this process.
     """
+    import chromadb
+    from chromadb.config import Settings
+
+    if settings.chroma_host:
+        logger.info(f"Connecting to ChromaDB at {settings.chroma_host}:{settings.chroma_port}")
+        return chromadb.HttpClient(
+            host=settings.chroma_host,
+            port=settings.chroma_port,
+            settings=Settings(anonymized_telemetry=False),
+        )
+
     logger.info(f"Initializing ChromaDB at {settings.chroma_path}")
     client = chromadb.PersistentClient(
         path=settings.chroma_path,
         settings=Settings(allow_reset=True, anonymized_telemetry=False)
     )
     return client
+
+
+def vector_store_shared() -> bool:
+    """True when writes from this process are visible to other processes."""
+    return settings.vector_backend == "quantized" or bool(settings.chroma_host)
+
+
+def get_vector_client():
+    """
+    Returns the client for the configured backend. Both expose
+    `get_or_create_collection` and collections with the same API.
+    """
+    if settings.vector_backend == "quantized":
+        from core.quantized_store import get_quantized_client
+
+        return get_quantized_client()
+    return get_chroma_client()
+
+
+@lru_cache()
+def get_collection(name: str):
+    """
+    Returns a collection, creating it if it does not exist.
+    """
+    return get_vector_client().get_or_create_collection(name)
@@ -0,0 +1,206 @@
+"""
+ARIA Warm-Up
+Preloads models, connections and caches so the first request doesn't pay for them.
+
+Steps run in parallel in the background after startup. Until they finish the
+worker is alive but not ready, which `/health/ready` reports to load balancers.
+It stays unready while a required step (`WARMUP_REQUIRED_STEPS`) has not
+succeeded; those steps are retried with backoff until they do, so a worker
+that booted before Ollama or the database rejoins rotation by itself. Other
+failed steps only mark it degraded.
+"""
+import asyncio
+import time
+from typing import Awaitable, Callable, Optional
+
+from config.settings import settings
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+RETRY_INITIAL_DELAY = 5.0
+RETRY_MAX_DELAY = 60.0
+
+
+class WarmupState:
+    """Tracks warm-up progress for the readiness probe."""
+
+    def __init__(self):
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.steps: dict[str, str] = {}
+
+    @property
+    def ready(self) -> bool:
+        return self.finished_at is not None
+
+    @property
+    def degraded(self) -> bool:
+        return any(status != "ok" for status in self.steps.values())
+
+    @property
+    def failed_required(self) -> list[str]:
+        """Required steps that ran and did not succeed."""
+        return [name for name in required_steps() if self.steps.get(name, "ok") != "ok"]
+
+    @property
+    def serving(self) -> bool:
+        """Whether the worker should receive traffic."""
+        return self.ready and not self.failed_required
+
+    def mark_ready(self):
+        now = time.monotonic()
+        self.started_at = self.started_at or now
+        self.finished_at = now
+
+    def to_dict(self) -> dict:
+        if not self.ready:
+            status = "warming"
+        elif self.failed_required:
+            status = "failed"
+        else:
+            status = "degraded" if self.degraded else "ready"
+        duration = None
+        if self.started_at is not None and self.finished_at is not None:
+            duration = round(self.finished_at - self.started_at, 3)
+        return {"status": status, "duration_seconds": duration, "steps": dict(self.steps)}
+
+
+warmup_state = WarmupState()
+
+
+# --- Steps ---
+async def _warm_model():
+    from core.llm import get_ai_client
+
+    await get_ai_client().warm_up()
+
+
+async def _warm_database():
+    from sqlalchemy import text
+    from core.database import get_engine
+
+    engine = get_engine()
+
+    async def ping():
+        async with engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+
+    # Concurrent checkouts make the pool open several connections up front
+    await asyncio.gather(*(ping() for _ in range(settings.warmup_pool_connections)))
+
+
+async def _warm_redis():
+    from core.redis_client import get_redis
+
+    redis = get_redis()
+    await asyncio.gather(*(redis.ping() for _ in range(settings.warmup_pool_connections)))
+
+
+async def _warm_vector():
+    from core.vector_db import MEMORY_COLLECTIONS, get_collection
+
+    def load():
+        for name in MEMORY_COLLECTIONS:
+            get_collection(name).count()
+
+    await asyncio.to_thread(load)
+
+
+async def _warm_ocr():
+    from utils.ocr import check_tesseract_available, get_tesseract
+
+    if check_tesseract_available():
+        await asyncio.to_thread(get_tesseract)
+
+
+async def _warm_logs():
+    from services.log_service import get_log_index
+
+    await asyncio.to_thread(get_log_index().refresh)
+
+
+async def _warm_tts():
+    if not settings.tts_enabled:
+        return
+    from core.tts import announcement_texts, get_tts_engine
+
+    # Starts the worker process, loads the voice and caches fixed announcements
+    rendered = await get_tts_engine().prerender(announcement_texts())
+    logger.info(f"Pre-rendered {rendered} TTS announcements")
+
+
+async def _warm_stats():
+    from services.stats_service import get_stats_service
+
+    await get_stats_service().ensure_seeded()
+
+
+WARMUP_STEPS: dict[str, Callable[[], Awaitable[None]]] = {
+    "model": _warm_model,
+    "database": _warm_database,
+    "redis": _warm_redis,
+    "vector": _warm_vector,
+    "ocr": _warm_ocr,
+    "logs": _warm_logs,
+    "tts": _warm_tts,
+    "stats": _warm_stats,
+}
+
+
+def configured_steps() -> list[str]:
+    """Returns the warm-up steps enabled in settings, in declaration order."""
+    names = [name.strip() for name in settings.warmup_steps.split(",") if name.strip()]
+    unknown = [name for name in names if name not in WARMUP_STEPS]
+    if unknown:
+        logger.warning(f"Ignoring unknown warm-up steps: {', '.join(unknown)}")
+    return [name for name in names if name in WARMUP_STEPS]
+
+
+def required_steps() -> list[str]:
+    """Returns the steps that must succeed for the worker to be ready."""
+    return [name.strip() for name in settings.warmup_required_steps.split(",") if name.strip()]
+
+
+async def _run_step(name: str):
+    started = time.monotonic()
+    try:
+        await asyncio.wait_for(WARMUP_STEPS[name](), timeout=settings.warmup_timeout)
+        warmup_state.steps[name] = "ok"
+        logger.info(f"Warm-up '{name}' done in {time.monotonic() - started:.2f}s")
+    except asyncio.TimeoutError:
+        warmup_state.steps[name] = "timeout"
+        logger.warning(f"Warm-up '{name}' timed out after {settings.warmup_timeout}s")
+    except Exception as e:
+        warmup_state.steps[name] = f"error: {e}"
+        logger.warning(f"Warm-up '{name}' failed: {e}")
+
+
+async def run_warmup():
+    """
+    Runs all configured warm-up steps in parallel, then marks the worker
+    ready, then keeps retrying failed required steps until they succeed.
+    """
+    steps = configured_steps()
+    warmup_state.started_at = time.monotonic()
+    warmup_state.steps = {name: "pending" for name in steps}
+
+    logger.info(f"Warming up: {', '.join(steps) or 'nothing to do'}")
+    await asyncio.gather(*(_run_step(name) for name in steps))
+
+    warmup_state.mark_ready()
+    summary = warmup_state.to_dict()
+    logger.info(f"Warm-up finished in {summary['duration_seconds']}s ({summary['status']})")
+    await _retry_required()
+
+
+async def _retry_required():
+    delay = RETRY_INITIAL_DELAY
+    while failed := warmup_state.failed_required:
+        logger.warning(f"Required warm-up steps failed ({', '.join(failed)}); retrying in {delay:g}s")
+        await asyncio.sleep(delay)
+        # The failed status stays until a retry succeeds, so readiness keeps reporting 503
+        await asyncio.gather(*(_run_step(name) for name in failed))
+        delay = min(delay * 2, RETRY_MAX_DELAY)
+    if delay > RETRY_INITIAL_DELAY:
+        logger.info("Required warm-up steps recovered; worker is ready")
@@ -3,18 +3,21 @@ ARIA Backend - Main Application Entry Point
 
 This is the main FastAPI application for ARIA.
 """
+import asyncio
 import sys
 from pathlib import Path
 from contextlib import asynccontextmanager
 
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
 
 # Ensure the backend directory is in the path
 sys.path.insert(0, str(Path(__file__).parent))
 
 from config.settings import settings
 from utils.logger import setup_logging, get_logger
+from core.warmup import run_warmup, warmup_state
 
 # --- Initialize Logging ---
 setup_logging()
@@ -31,13 +34,62 @@ async def lifespan(app: FastAPI):
     logger.info("ARIA Backend Starting...")
     logger.info("=" * 50)
 
-    logger.info("ARIA Backend Ready!")
+    # --- Shared Vector Store ---
+    from core.coordination import shared_state_enabled
+    from core.vector_db import vector_store_shared
+    if shared_state_enabled() and not vector_store_shared():
+        raise RuntimeError(
+            "Embedded ChromaDB can't be shared between workers. "
+            "Set CHROMA_HOST to a Chroma server, or VECTOR_BACKEND=quantized."
+        )
+
+    # --- Database ---
+    # Create tables before anything writes to them; warm-up is optional
+    from core.database import init_db
+    await init_db()
+
+    # --- Background Writers ---
+    from services.conversation_store import get_conversation_store
+    from services.event_bus import get_event_bus
+    from services.stats_service import get_stats_service
+    get_conversation_store().start()
+    get_event_bus().start()
+    get_stats_service().start()
+
+    # --- Leader-Only Jobs ---
+    # Run on one worker per deployment (always this one with a single worker)
+    from core.coordination import get_leader_elector
+    from services.health_prober import run_health_prober
+    leader = get_leader_elector()
+    leader.register("health_prober", run_health_prober)
+    leader.start()
+
+    # --- Warm-Up ---
+    # Runs in the background so liveness answers while the worker warms up
+    warmup_task = None
+    if settings.warmup_enabled:
+        warmup_task = asyncio.create_task(run_warmup())
+    else:
+        warmup_state.mark_ready()
+
+    logger.info("ARIA Backend Started! (readiness: /health/ready)")
     logger.info(f"API running at http://{settings.api_host}:{settings.api_port}")
 
     yield  # Application is running
 
     # --- Shutdown ---
     logger.info("ARIA Backend Shutting Down...")
+    if warmup_task and not warmup_task.done():
+        warmup_task.cancel()
+    await leader.stop()
+    await get_conversation_store().stop()
+    await get_stats_service().stop()
+    await get_event_bus().stop()
+
+    from core.redis_client import close_redis
+    from core.tts import close_tts_engine
+    await close_redis()
+    close_tts_engine()
     logger.info("Goodbye!")
 
 
@@ -58,11 +110,44 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-from core.database import engine
+# --- Compression Middleware ---
+if settings.compression_enabled:
+    from core.compression import CompressionMiddleware
+
+    app.add_middleware(
+        CompressionMiddleware,
+        minimum_size=settings.compression_minimum_size,
+        gzip_level=settings.compression_gzip_level,
+        brotli_quality=settings.compression_brotli_quality,
+    )
+
 from core.storage import check_minio_connection
 from utils.ocr import check_tesseract_available
-from sqlalchemy import text
-from config.settings import settings
+
+from api import chat, devices, events, memory, models, system, tts
+
+# --- API Routers ---
+app.include_router(chat.router, prefix="/api/chat", tags=["chat"])
+app.include_router(memory.router, prefix="/api/memory", tags=["memory"])
+app.include_router(devices.router, prefix="/api/devices", tags=["devices"])
+app.include_router(events.router, prefix="/api/events", tags=["events"])
+app.include_router(models.router, prefix="/api/models", tags=["models"])
+app.include_router(system.router, prefix="/api/system", tags=["system"])
+app.include_router(tts.router, prefix="/api/tts", tags=["tts"])
+
+# --- Liveness / Readiness ---
+@app.get("/health/live")
+async def liveness():
+    """Liveness probe: the process is up and serving requests."""
+    return {"status": "alive"}
+
+
+@app.get("/health/ready")
+async def readiness():
+    """Readiness probe: 503 until warm-up has finished, or if a required step failed."""
+    state = warmup_state.to_dict()
+    return JSONResponse(state, status_code=200 if warmup_state.serving else 503)
+
 
 # --- Health Check ---
 @app.get("/health")
@@ -78,7 +163,10 @@ async def health_check():
 
     # 1. Database Check
     try:
-        async with engine.connect() as conn:
+        from sqlalchemy import text
+        from core.database import get_engine
+
+        async with get_engine().connect() as conn:
             await conn.execute(text("SELECT 1"))
             status["database"] = "connected"
     except Exception as e:
@@ -86,10 +174,8 @@ async def health_check():
 
     # 2. Redis Check (via Celery Broker URL)
     try:
-        from redis import asyncio as aioredis
-        redis = aioredis.from_url(settings.redis_url)
-        await redis.ping()
-        await redis.close()
+        from core.redis_client import get_redis
+        await get_redis().ping()
         status["redis"] = "connected"
     except Exception as e:
         status["redis"] = f"error: {str(e)}"
@@ -134,10 +220,12 @@ async def root():
 if __name__ == "__main__":
     import uvicorn
 
+    # Several workers need SHARED_STATE semantics (implied); reload only works with one
     uvicorn.run(
         "main:app",
         host=settings.api_host,
         port=settings.api_port,
-        reload=True,
+        reload=settings.api_workers == 1,
+        workers=settings.api_workers,
         # reload_excludes=["./data/logs"],
     )
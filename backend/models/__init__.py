@@ -0,0 +1,5 @@
+# Database Models
+from models.conversation import ChatMessage, ChatSession
+from models.model_profile import ModelProfile
+
+__all__ = ["ChatMessage", "ChatSession", "ModelProfile"]
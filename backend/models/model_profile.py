@@ -0,0 +1,57 @@
+"""
+ARIA Model Profile Model
+Stores per-model throughput measurements from the profiler.
+"""
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import DateTime, Index, String
+from sqlalchemy.orm import Mapped, mapped_column
+
+from core.database import Base
+from utils.helpers import utc_now
+
+
+class ModelProfile(Base):
+    """One profiling result: a model measured at one concurrency level."""
+    __tablename__ = "model_profiles"
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    run_id: Mapped[str] = mapped_column(String(32), index=True)
+    provider: Mapped[str] = mapped_column(String(32))
+    model: Mapped[str] = mapped_column(String(255))
+    concurrency: Mapped[int]
+    requests: Mapped[int]
+    errors: Mapped[int] = mapped_column(default=0)
+
+    load_time_ms: Mapped[Optional[float]]
+    ttft_ms_p50: Mapped[Optional[float]]
+    ttft_ms_p95: Mapped[Optional[float]]
+    tokens_per_second: Mapped[Optional[float]]  # Mean decode speed of a single stream
+    aggregate_tokens_per_second: Mapped[Optional[float]]  # Total across concurrent streams
+    memory_bytes: Mapped[Optional[int]]
+    vram_bytes: Mapped[Optional[int]]
+
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), default=utc_now)
+
+    __table_args__ = (
+        Index("ix_model_profiles_model_created_at", "model", "created_at"),
+    )
+
+    def to_dict(self) -> dict:
+        return {
+            "run_id": self.run_id,
+            "provider": self.provider,
+            "model": self.model,
+            "concurrency": self.concurrency,
+            "requests": self.requests,
+            "errors": self.errors,
+            "load_time_ms": self.load_time_ms,
+            "ttft_ms_p50": self.ttft_ms_p50,
+            "ttft_ms_p95": self.ttft_ms_p95,
+            "tokens_per_second": self.tokens_per_second,
+            "aggregate_tokens_per_second": self.aggregate_tokens_per_second,
+            "memory_bytes": self.memory_bytes,
+            "vram_bytes": self.vram_bytes,
+            "created_at": self.created_at.isoformat() if self.created_at else None,
+        }
@@ -0,0 +1,108 @@
+"""
+ARIA Import-Time Benchmark
+Reports the cold-start import cost of each backend module.
+
+Every module is imported in a fresh interpreter with `python -X importtime`,
+so each measurement includes everything that module pulls in transitively.
+
+Usage:
+    python scripts/benchmark_imports.py
+    python scripts/benchmark_imports.py --repeat 5 --top 20
+    python scripts/benchmark_imports.py core.llm ollama google.genai
+"""
+import argparse
+import subprocess
+import sys
+from collections import defaultdict
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).parents[1]
+
+DEFAULT_MODULES = [
+    "config.settings",
+    "utils.logger",
+    "utils.ocr",
+    "core.database",
+    "core.storage",
+    "core.vector_db",
+    "core.llm",
+    "services.log_service",
+    "api.system",
+    "main",
+]
+
+
+def run_importtime(module: str) -> list[tuple[int, int, str]]:
+    """
+    Imports `module` in a fresh interpreter and returns the parsed
+    `-X importtime` rows as (self_us, cumulative_us, name) tuples.
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=BACKEND_DIR,
+        capture_output=True,
+        text=True,
+    )
+    if result.returncode != 0:
+        error = result.stderr.strip().splitlines()[-1] if result.stderr.strip() else "unknown error"
+        raise RuntimeError(error)
+
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        _, self_us, cumulative_us, name = [part.strip() for part in line.replace("import time:", "|", 1).split("|")]
+        rows.append((int(self_us), int(cumulative_us), name))
+    return rows
+
+
+def measure(module: str, repeat: int) -> tuple[float, list[tuple[int, int, str]]]:
+    """Returns the best cumulative import time in ms and the rows of that run."""
+    best_ms, best_rows = None, []
+    for _ in range(repeat):
+        rows = run_importtime(module)
+        cumulative = next((cum for _, cum, name in reversed(rows) if name == module), 0)
+        if best_ms is None or cumulative / 1000 < best_ms:
+            best_ms, best_rows = cumulative / 1000, rows
+    return best_ms, best_rows
+
+
+def heaviest_packages(rows: list[tuple[int, int, str]], top: int) -> list[tuple[str, float]]:
+    """Sums self time by top-level package name."""
+    totals = defaultdict(int)
+    for self_us, _, name in rows:
+        totals[name.split(".")[0]] += self_us
+    ranked = sorted(totals.items(), key=lambda item: item[1], reverse=True)
+    return [(name, us / 1000) for name, us in ranked[:top]]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure ARIA module import times.")
+    parser.add_argument("modules", nargs="*", default=DEFAULT_MODULES, help="Modules to measure")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per module; the fastest is kept")
+    parser.add_argument("--top", type=int, default=15, help="Packages to list for the last measured module")
+    args = parser.parse_args()
+
+    print("=" * 50)
+    print(f"ARIA Import-Time Benchmark ({sys.executable})")
+    print("=" * 50)
+    print(f"\n{'module':<28}{'cumulative':>14}")
+
+    last_module, last_rows = None, []
+    for module in args.modules:
+        try:
+            ms, rows = measure(module, args.repeat)
+        except RuntimeError as e:
+            print(f"{module:<28}{'failed':>14}  ({e})")
+            continue
+        last_module, last_rows = module, rows
+        print(f"{module:<28}{ms:>11.1f} ms")
+
+    if last_rows:
+        print(f"\nHeaviest packages imported by {last_module} (self time):")
+        for name, ms in heaviest_packages(last_rows, args.top):
+            print(f"  {name:<26}{ms:>11.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+"""
+ARIA Model Profiler
+Measures load time, TTFT, tokens/s and memory for each available model.
+
+Usage:
+    python scripts/profile_models.py
+    python scripts/profile_models.py --models llama3.2 qwen2.5:0.5b --concurrency 1,4,8
+    python scripts/profile_models.py --no-save
+"""
+import argparse
+import asyncio
+import sys
+from pathlib import Path
+
+# Add backend to path
+sys.path.insert(0, str(Path(__file__).parents[1]))
+
+from core.database import init_db
+from services.model_profiler import DEFAULT_CONCURRENCY, profile_models
+
+
+def format_bytes(value) -> str:
+    return f"{value / 1024 ** 3:.2f} GB" if value else "-"
+
+
+def format_number(value, suffix: str = "") -> str:
+    return f"{value:.1f}{suffix}" if value is not None else "-"
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Profile AI models on this hardware.")
+    parser.add_argument("--models", nargs="*", help="Models to profile (default: all available)")
+    parser.add_argument(
+        "--concurrency",
+        default=",".join(str(level) for level in DEFAULT_CONCURRENCY),
+        help="Comma-separated concurrency levels",
+    )
+    parser.add_argument("--no-save", action="store_true", help="Don't store results in the database")
+    args = parser.parse_args()
+
+    levels = tuple(int(level) for level in args.concurrency.split(","))
+    if not args.no_save:
+        await init_db()
+
+    results = await profile_models(args.models, levels, save=not args.no_save)
+
+    print("\n" + "=" * 96)
+    print(f"{'model':<28}{'conc':>5}{'load':>10}{'ttft p50':>10}{'ttft p95':>10}{'tok/s':>9}{'agg tok/s':>11}{'memory':>12}")
+    print("=" * 96)
+    for r in results:
+        print(
+            f"{r['model']:<28}{r['concurrency']:>5}{format_number(r['load_time_ms'], 'ms'):>10}"
+            f"{format_number(r['ttft_ms_p50'], 'ms'):>10}{format_number(r['ttft_ms_p95'], 'ms'):>10}"
+            f"{format_number(r['tokens_per_second']):>9}{format_number(r['aggregate_tokens_per_second']):>11}"
+            f"{format_bytes(r['memory_bytes']):>12}"
+        )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
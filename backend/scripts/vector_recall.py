@@ -0,0 +1,165 @@
+"""
+ARIA Vector Store Recall
+Compares the quantized vector store against exact search and ChromaDB.
+
+Loads the same vectors into Chroma (HNSW, cosine) and into the quantized
+store for each dtype, then reports recall@k against exact float32 search,
+overlap with Chroma's results, query latency and vector memory. Ends with a
+consistency check: duplicate ids in one batch are rejected and counts match
+after reopening the store.
+
+Usage:
+    python scripts/vector_recall.py
+    python scripts/vector_recall.py --count 50000 --dim 384 --queries 500 --k 10
+    python scripts/vector_recall.py --from-collection long_term --ivf
+"""
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+# Add backend to path
+sys.path.insert(0, str(Path(__file__).parents[1]))
+
+from core.quantized_store import DTYPES, QuantizedVectorClient
+
+BATCH = 5000
+
+
+def unit(vectors: np.ndarray) -> np.ndarray:
+    return vectors / np.maximum(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12)
+
+
+def synthetic_vectors(count: int, dim: int, seed: int) -> np.ndarray:
+    """Clustered vectors, closer to real embeddings than uniform noise."""
+    rng = np.random.default_rng(seed)
+    centers = rng.normal(size=(max(1, count // 100), dim))
+    vectors = centers[rng.integers(0, len(centers), count)] + 0.5 * rng.normal(size=(count, dim))
+    return unit(vectors.astype(np.float32))
+
+
+def collection_vectors(name: str) -> np.ndarray:
+    from core.quantized_store import _unit
+    from core.vector_db import get_chroma_client
+
+    collection = get_chroma_client().get_or_create_collection(name)
+    embeddings = collection.get(include=["embeddings"])["embeddings"]
+    if embeddings is None or not len(embeddings):
+        raise SystemExit(f"Collection '{name}' is empty.")
+    return _unit(embeddings)
+
+
+def recall(results: list[list[str]], truth: np.ndarray) -> float:
+    k = truth.shape[1]
+    return float(np.mean([len({int(i) for i in ids} & set(row.tolist())) / k for ids, row in zip(results, truth)]))
+
+
+def overlap(a: list[list[str]], b: list[list[str]]) -> float:
+    return float(np.mean([len(set(x) & set(y)) / max(1, len(y)) for x, y in zip(a, b)]))
+
+
+def timed_query(collection, queries: np.ndarray, k: int) -> tuple[list[list[str]], float]:
+    started = time.perf_counter()
+    ids = []
+    for start in range(0, len(queries), 100):
+        ids.extend(collection.query(query_embeddings=queries[start:start + 100].tolist(), n_results=k)["ids"])
+    return ids, (time.perf_counter() - started) * 1000 / len(queries)
+
+
+def run_chroma(vectors: np.ndarray, queries: np.ndarray, k: int, directory: Path) -> tuple[list[list[str]], float]:
+    import chromadb
+    from chromadb.config import Settings
+
+    client = chromadb.PersistentClient(path=str(directory), settings=Settings(anonymized_telemetry=False))
+    collection = client.create_collection("recall", metadata={"hnsw:space": "cosine"})
+    for start in range(0, len(vectors), BATCH):
+        chunk = vectors[start:start + BATCH]
+        collection.add(ids=[str(i) for i in range(start, start + len(chunk))], embeddings=chunk.tolist())
+    return timed_query(collection, queries, k)
+
+
+def check_consistency(directory: Path, dim: int):
+    """Regression check for batches with repeated ids, which used to leave orphan vectors live."""
+    rng = np.random.default_rng(0)
+    collection = QuantizedVectorClient(str(directory)).get_or_create_collection("consistency")
+    collection.add(ids=[f"v{i}" for i in range(100)], embeddings=unit(rng.normal(size=(100, dim))))
+    for write in (collection.add, collection.upsert):
+        try:
+            write(ids=["v0", "dup", "dup"], embeddings=unit(rng.normal(size=(3, dim))))
+        except ValueError:
+            pass
+        else:
+            raise SystemExit(f"{write.__name__} accepted duplicate ids in one batch")
+    collection.upsert(ids=["v1", "new"], embeddings=unit(rng.normal(size=(2, dim))))
+
+    reopened = QuantizedVectorClient(str(directory)).get_or_create_collection("consistency")
+    counts = (collection.count(), reopened.count(), len(reopened.get(include=[])["ids"]))
+    if counts != (101, 101, 101):
+        raise SystemExit(f"Counts disagree after reopening (in process, reopened, rows): {counts}")
+    print("Consistency check passed: duplicate ids rejected, counts match after reopening")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure recall of the quantized vector store.")
+    parser.add_argument("--count", type=int, default=20000, help="Number of synthetic vectors")
+    parser.add_argument("--dim", type=int, default=384, help="Synthetic vector dimension")
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--from-collection", help="Use the embeddings of this Chroma collection instead")
+    parser.add_argument("--ivf", action="store_true", help="Also measure the IVF index")
+    parser.add_argument("--nprobe", type=int, default=8)
+    parser.add_argument("--no-chroma", action="store_true", help="Skip the Chroma comparison")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    vectors = collection_vectors(args.from_collection) if args.from_collection else synthetic_vectors(
+        args.count, args.dim, args.seed
+    )
+    rng = np.random.default_rng(args.seed + 1)
+    # Perturbed copies of stored vectors, so queries have true near neighbours
+    queries = unit(vectors[rng.choice(len(vectors), args.queries)] + 0.05 * rng.normal(size=(args.queries, vectors.shape[1])))
+    queries = queries.astype(np.float32)
+    truth = np.argsort(-(queries @ vectors.T), axis=1)[:, :args.k]
+    float32_bytes = vectors.nbytes
+
+    rows = []
+    with tempfile.TemporaryDirectory() as tmp:
+        chroma_ids = None
+        if not args.no_chroma:
+            chroma_ids, latency = run_chroma(vectors, queries, args.k, Path(tmp) / "chroma")
+            rows.append(("chroma (hnsw)", recall(chroma_ids, truth), None, latency, float32_bytes))
+
+        for dtype in DTYPES:
+            client = QuantizedVectorClient(str(Path(tmp) / dtype), dtype=dtype, ivf_min_size=len(vectors) + 1, nprobe=args.nprobe)
+            collection = client.get_or_create_collection("recall")
+            for start in range(0, len(vectors), BATCH):
+                chunk = vectors[start:start + BATCH]
+                collection.add(ids=[str(i) for i in range(start, start + len(chunk))], embeddings=chunk)
+
+            ids, latency = timed_query(collection, queries, args.k)
+            agreement = overlap(ids, chroma_ids) if chroma_ids else None
+            rows.append((f"{dtype} exact", recall(ids, truth), agreement, latency, collection.memory_bytes()))
+            if args.ivf:
+                collection.build_index()
+                ids, latency = timed_query(collection, queries, args.k)
+                agreement = overlap(ids, chroma_ids) if chroma_ids else None
+                rows.append((f"{dtype} ivf/{args.nprobe}", recall(ids, truth), agreement, latency, collection.memory_bytes()))
+
+        check_consistency(Path(tmp) / "consistency", vectors.shape[1])
+
+    print(f"\n{len(vectors)} vectors x {vectors.shape[1]} dims, {args.queries} queries, recall@{args.k} vs exact float32")
+    print("=" * 80)
+    print(f"{'backend':<20}{'recall':>10}{'vs chroma':>12}{'ms/query':>12}{'vector MB':>12}{'vs f32':>10}")
+    print("=" * 80)
+    for name, value, agreement, latency, size in rows:
+        print(
+            f"{name:<20}{value:>10.3f}{(f'{agreement:.3f}' if agreement is not None else '-'):>12}"
+            f"{latency:>12.2f}{size / 1024 ** 2:>12.1f}{float32_bytes / size:>9.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,288 @@
+"""
+ARIA Admission Control
+Rate limits and load shedding in front of the model.
+
+Each request spends a token from its client's bucket (by IP) and, when it
+carries an API key, from that key's bucket. Admitted requests then wait for
+one of a fixed number of model slots; when the wait queue is full, or a
+request has waited too long, it is shed instead of piling up behind a
+saturated model. Requests with an automation API key use a priority lane
+that is served first and skips the per-IP limit.
+
+Buckets live in process with a single worker and in Redis (one Lua call per
+bucket) in shared mode. Model slots are per worker.
+"""
+import asyncio
+import hashlib
+import heapq
+import itertools
+import math
+import time
+from collections import Counter
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Optional
+
+from fastapi import HTTPException
+
+from config.settings import settings
+from core.coordination import shared_state_enabled
+from core.redis_client import get_redis
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+_admission_controller_instance = None
+
+KEY_PREFIX = "aria:admission"
+REJECTED_KEY = f"{KEY_PREFIX}:rejected"
+
+AUTOMATION = "automation"
+INTERACTIVE = "interactive"
+_LANE_PRIORITY = {AUTOMATION: 0, INTERACTIVE: 1}
+
+# Refill, then take one token if available. Uses the Redis clock so all
+# workers and nodes agree. Returns {allowed, milliseconds until a token}.
+_TOKEN_BUCKET_SCRIPT = """
+local rate = tonumber(ARGV[1])
+local burst = tonumber(ARGV[2])
+local clock = redis.call('TIME')
+local now = clock[1] * 1000 + math.floor(clock[2] / 1000)
+local bucket = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(bucket[1]) or burst
+local ts = tonumber(bucket[2]) or now
+tokens = math.min(burst, tokens + (now - ts) / 1000 * rate)
+local allowed, wait = 0, 0
+if tokens >= 1 then
+    tokens = tokens - 1
+    allowed = 1
+else
+    wait = math.ceil((1 - tokens) / rate * 1000)
+end
+redis.call('HSET', KEYS[1], 'tokens', tokens, 'ts', now)
+redis.call('PEXPIRE', KEYS[1], math.ceil(burst / rate * 1000) + 1000)
+return {allowed, wait}
+"""
+
+
+class AdmissionRejected(Exception):
+    """Raised when a request is rate limited (429) or shed (503)."""
+
+    def __init__(self, status_code: int, reason: str, retry_after: float):
+        super().__init__(reason)
+        self.status_code = status_code
+        self.reason = reason
+        self.retry_after = max(1, math.ceil(retry_after))
+
+    @property
+    def detail(self) -> str:
+        """What to tell the client; the reason is for logs and metrics."""
+        return "Too many requests." if self.status_code == 429 else "ARIA is busy, try again shortly."
+
+    def http_exception(self) -> HTTPException:
+        return HTTPException(
+            status_code=self.status_code, detail=self.detail, headers={"Retry-After": str(self.retry_after)}
+        )
+
+
+class TokenBuckets:
+    """Token buckets keyed by client or API key."""
+
+    def __init__(self, shared: bool, max_local_buckets: int = 10_000):
+        self.shared = shared
+        self.max_local_buckets = max_local_buckets
+        self._local: dict[str, tuple[float, float]] = {}
+
+    async def take(self, key: str, rate: float, burst: int) -> float:
+        """Takes a token. Returns 0 if allowed, else seconds until one is available."""
+        if self.shared:
+            allowed, wait_ms = await get_redis().eval(_TOKEN_BUCKET_SCRIPT, 1, f"{KEY_PREFIX}:{key}", rate, burst)
+            return 0.0 if allowed else wait_ms / 1000
+
+        now = time.monotonic()
+        tokens, updated = self._local.get(key, (burst, now))
+        tokens = min(burst, tokens + (now - updated) * rate)
+        if tokens >= 1:
+            self._local[key] = (tokens - 1, now)
+            self._prune(now, rate, burst)
+            return 0.0
+        self._local[key] = (tokens, now)
+        return (1 - tokens) / rate
+
+    def _prune(self, now: float, rate: float, burst: int):
+        # Buckets idle long enough to be full again carry no state worth keeping
+        if len(self._local) <= self.max_local_buckets:
+            return
+        refill_time = burst / rate
+        self._local = {
+            key: (tokens, updated) for key, (tokens, updated) in self._local.items() if now - updated < refill_time
+        }
+
+
+class ModelSlots:
+    """
+    A bounded number of concurrent model calls with a bounded, prioritized
+    wait queue. Waiters are served by lane priority, then arrival order.
+    """
+
+    def __init__(self, max_concurrency: int, max_queue: int):
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.active = 0
+        self._waiters: list[tuple[int, int, asyncio.Future]] = []
+        self._order = itertools.count()
+        self._waiting: Counter = Counter()
+        self._service_time = 5.0  # EWMA of seconds per call, seeds Retry-After
+
+    def waiting(self) -> dict[str, int]:
+        return {lane: self._waiting[lane] for lane in _LANE_PRIORITY}
+
+    def estimated_wait(self, lane: str) -> float:
+        """Seconds until a new request in `lane` would likely start."""
+        ahead = sum(count for other, count in self._waiting.items() if _LANE_PRIORITY[other] <= _LANE_PRIORITY[lane])
+        return self._service_time * (ahead + 1) / self.max_concurrency
+
+    async def acquire(self, lane: str, timeout: float):
+        if not any(self._waiting.values()):
+            self._waiters.clear()  # Only abandoned entries can be left
+            if self.active < self.max_concurrency:
+                self.active += 1
+                return
+        # Each lane has its own queue allowance so automation isn't shed by chat traffic
+        if self._waiting[lane] >= self.max_queue:
+            raise AdmissionRejected(503, "queue_full", self.estimated_wait(lane))
+
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (_LANE_PRIORITY[lane], next(self._order), future))
+        self._waiting[lane] += 1
+        try:
+            await asyncio.wait_for(asyncio.shield(future), timeout=timeout)
+        except asyncio.TimeoutError:
+            if future.done():
+                # Handed a slot just as the wait expired: pass it on
+                self.release()
+            future.cancel()
+            raise AdmissionRejected(503, "queue_timeout", self.estimated_wait(lane))
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                self.release()
+            future.cancel()
+            raise
+        finally:
+            self._waiting[lane] -= 1
+
+    def release(self, service_time: Optional[float] = None):
+        if service_time is not None:
+            self._service_time = 0.8 * self._service_time + 0.2 * service_time
+        while self._waiters:
+            _, _, future = heapq.heappop(self._waiters)
+            if not future.done():
+                future.set_result(None)  # The slot moves to the waiter
+                return
+        self.active -= 1
+
+
+class AdmissionController:
+    """Applies rate limits and model slots to chat requests and counts outcomes."""
+
+    def __init__(
+        self,
+        client_rate: float,
+        client_burst: int,
+        key_rate: float,
+        key_burst: int,
+        max_concurrency: int,
+        max_queue: int,
+        queue_timeout: float,
+        automation_keys: set[str],
+        shared: bool = False,
+    ):
+        self.client_rate = client_rate
+        self.client_burst = client_burst
+        self.key_rate = key_rate
+        self.key_burst = key_burst
+        self.queue_timeout = queue_timeout
+        self.automation_keys = automation_keys
+        self.shared = shared
+        self.buckets = TokenBuckets(shared)
+        self.slots = ModelSlots(max_concurrency, max_queue)
+        self.admitted: Counter = Counter()
+        self.rejected: Counter = Counter()
+
+    def lane(self, api_key: Optional[str]) -> str:
+        return AUTOMATION if api_key and api_key in self.automation_keys else INTERACTIVE
+
+    async def _check_rates(self, client: str, api_key: Optional[str], lane: str):
+        if lane != AUTOMATION:
+            wait = await self.buckets.take(f"client:{client}", self.client_rate, self.client_burst)
+            if wait:
+                raise AdmissionRejected(429, "client_rate", wait)
+        if api_key:
+            # Keys are hashed so they don't appear in Redis key names
+            key_id = hashlib.sha256(api_key.encode("utf-8")).hexdigest()[:16]
+            wait = await self.buckets.take(f"key:{key_id}", self.key_rate, self.key_burst)
+            if wait:
+                raise AdmissionRejected(429, "key_rate", wait)
+
+    async def _record_rejection(self, lane: str, reason: str):
+        self.rejected[f"{lane}:{reason}"] += 1
+        if self.shared:
+            try:
+                await get_redis().hincrby(REJECTED_KEY, f"{lane}:{reason}", 1)
+            except Exception as e:
+                logger.warning(f"Failed to record admission rejection: {e}")
+
+    @asynccontextmanager
+    async def admit(self, client: str, api_key: Optional[str] = None) -> AsyncIterator[str]:
+        """
+        Holds a model slot for the duration of the block and yields the lane.
+
+        Raises:
+            AdmissionRejected: If the request is rate limited or shed.
+        """
+        lane = self.lane(api_key)
+        try:
+            await self._check_rates(client, api_key, lane)
+            await self.slots.acquire(lane, self.queue_timeout)
+        except AdmissionRejected as e:
+            await self._record_rejection(lane, e.reason)
+            logger.warning(f"Rejected {lane} request from {client}: {e.reason} (retry after {e.retry_after}s)")
+            raise
+
+        self.admitted[lane] += 1
+        started = time.monotonic()
+        try:
+            yield lane
+        finally:
+            self.slots.release(time.monotonic() - started)
+
+    async def metrics(self) -> dict:
+        """Slot usage and admission outcomes for this worker (and all workers in shared mode)."""
+        metrics = {
+            "active": self.slots.active,
+            "max_concurrency": self.slots.max_concurrency,
+            "waiting": self.slots.waiting(),
+            "admitted": dict(self.admitted),
+            "rejected": dict(self.rejected),
+        }
+        if self.shared:
+            metrics["rejected_all_workers"] = {
+                field: int(count) for field, count in (await get_redis().hgetall(REJECTED_KEY)).items()
+            }
+        return metrics
+
+
+def get_admission_controller() -> AdmissionController:
+    """Returns a singleton AdmissionController."""
+    global _admission_controller_instance
+    if _admission_controller_instance is None:
+        _admission_controller_instance = AdmissionController(
+            client_rate=settings.chat_rate_per_client,
+            client_burst=settings.chat_burst_per_client,
+            key_rate=settings.chat_rate_per_key,
+            key_burst=settings.chat_burst_per_key,
+            max_concurrency=settings.chat_max_concurrency,
+            max_queue=settings.chat_max_queue,
+            queue_timeout=settings.chat_queue_timeout,
+            automation_keys={key.strip() for key in settings.automation_api_keys.split(",") if key.strip()},
+            shared=shared_state_enabled(),
+        )
+    return _admission_controller_instance
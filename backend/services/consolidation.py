@@ -0,0 +1,327 @@
+"""
+ARIA Memory Consolidation
+Periodic Celery job that keeps the memory collections compact.
+
+1. Near-duplicate entries are found with cosine similarity over their stored
+   embeddings, computed with NumPy one tile at a time so memory stays bounded.
+   Connected entries are split into clusters around a central member (the
+   medoid), each holding only entries similar to it and at most
+   `MAX_CLUSTER_SIZE` of them, so a chain of pairwise matches can't pull
+   unrelated memories together. Each cluster is merged into a single entry:
+   a model-written summary of all its members, or the central member if
+   summarizing fails.
+2. Short-term memories whose importance clears a threshold move to long-term
+   memory. Importance is the `importance` metadata (0-1) given when the
+   memory was stored, raised by how many times it was repeated.
+3. Long-term memory is consolidated last, so promoted items merge with
+   matching facts that are already there.
+
+The job runs in the Celery worker, so it needs a vector store the API sees
+changes to: a Chroma server (`CHROMA_HOST`) or the quantized store. With
+embedded Chroma it is skipped.
+"""
+import asyncio
+import json
+import time
+from dataclasses import dataclass
+from typing import Optional
+
+import numpy as np
+
+from config.settings import settings
+from core.celery_app import celery_app
+from core.vector_db import get_collection, vector_store_shared
+from utils.helpers import format_timestamp, utc_now
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+LAST_REPORT_KEY = "aria:consolidation:last"
+SUMMARY_SYSTEM = "You merge duplicate memory entries of a home assistant. Reply with the merged entry only."
+SUMMARY_PROMPT = (
+    "These entries all record the same fact:\n{entries}\n\n"
+    "Write it once as a single concise sentence, keeping any detail that appears in some entries."
+)
+# Every member of a cluster fits in one summary prompt; larger groups merge over several clusters
+MAX_CLUSTER_SIZE = 20
+
+
+@dataclass
+class _Entries:
+    ids: list[str]
+    documents: list[str]
+    metadatas: list[dict]
+    embeddings: np.ndarray
+
+
+def load_entries(collection, block_size: int) -> _Entries:
+    """Reads every entry of a collection, `block_size` at a time."""
+    ids, documents, metadatas, blocks = [], [], [], []
+    offset = 0
+    while True:
+        batch = collection.get(
+            include=["embeddings", "documents", "metadatas"], limit=block_size, offset=offset
+        )
+        if not batch["ids"]:
+            break
+        ids.extend(batch["ids"])
+        documents.extend(batch["documents"])
+        metadatas.extend(metadata or {} for metadata in batch["metadatas"])
+        blocks.append(np.asarray(batch["embeddings"], dtype=np.float32))
+        offset += len(batch["ids"])
+        if len(batch["ids"]) < block_size:
+            break
+    embeddings = np.vstack(blocks) if blocks else np.empty((0, 0), dtype=np.float32)
+    return _Entries(ids, documents, metadatas, embeddings)
+
+
+def _normalize(embeddings: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+    return embeddings / np.maximum(norms, 1e-12)
+
+
+def _root(parent: list[int], i: int) -> int:
+    while parent[i] != i:
+        parent[i] = parent[parent[i]]
+        i = parent[i]
+    return i
+
+
+def find_clusters(embeddings: np.ndarray, threshold: float, block_size: int) -> list[list[int]]:
+    """
+    Returns clusters of row indices to merge. Rows connected by cosine
+    similarity >= `threshold` are grouped first; only the upper triangle is
+    computed, one block_size x block_size tile at a time. Each group is then
+    split around medoids (see `_split_component`).
+    """
+    n = len(embeddings)
+    if n < 2:
+        return []
+    unit = _normalize(embeddings)
+    parent = list(range(n))
+
+    for row_start in range(0, n, block_size):
+        rows = unit[row_start:row_start + block_size]
+        for col_start in range(row_start, n, block_size):
+            sims = rows @ unit[col_start:col_start + block_size].T
+            pairs_i, pairs_j = np.nonzero(sims >= threshold)
+            pairs_i += row_start
+            pairs_j += col_start
+            upper = pairs_j > pairs_i
+            for i, j in zip(pairs_i[upper].tolist(), pairs_j[upper].tolist()):
+                root_i, root_j = _root(parent, i), _root(parent, j)
+                if root_i != root_j:
+                    parent[root_j] = root_i
+
+    components: dict[int, list[int]] = {}
+    for i in range(n):
+        components.setdefault(_root(parent, i), []).append(i)
+    clusters = []
+    for component in components.values():
+        if len(component) > 1:
+            clusters.extend(_split_component(unit, component, threshold))
+    return clusters
+
+
+def _split_component(unit: np.ndarray, component: list[int], threshold: float) -> list[list[int]]:
+    """
+    Splits a connected group into clusters of up to MAX_CLUSTER_SIZE members,
+    each within `threshold` of its medoid. Members left over are clustered
+    again around the medoid of the rest.
+    """
+    clusters = []
+    remaining = np.asarray(component)
+    while len(remaining) > 1:
+        center = _medoid(unit, remaining.tolist())
+        sims = unit[remaining] @ unit[center]
+        close = np.nonzero(sims >= threshold)[0]
+        if len(close) < 2:
+            # Nothing left matches the medoid itself; it stays a single entry
+            remaining = remaining[remaining != center]
+            continue
+        # The medoid has similarity 1 with itself, so it is always kept
+        close = close[np.argsort(-sims[close], kind="stable")][:MAX_CLUSTER_SIZE]
+        clusters.append(remaining[close].tolist())
+        remaining = np.delete(remaining, close)
+    return clusters
+
+
+def _medoid(unit: np.ndarray, group: list[int]) -> int:
+    """The member most similar to the rest of its cluster."""
+    members = unit[group]
+    # Row sums of members @ members.T, without building the square matrix
+    return group[int(np.argmax(members @ members.sum(axis=0)))]
+
+
+def importance_score(metadata: dict) -> float:
+    repeats = int(metadata.get("merged_count", 1)) - 1
+    return min(1.0, float(metadata.get("importance", 0.0)) + settings.consolidation_repeat_weight * repeats)
+
+
+def _merged_metadata(entries: _Entries, group: list[int], keeper: int) -> dict:
+    metadatas = [entries.metadatas[i] for i in group]
+    merged = dict(entries.metadatas[keeper])
+    merged["merged_count"] = sum(int(m.get("merged_count", 1)) for m in metadatas)
+    merged["importance"] = max(float(m.get("importance", 0.0)) for m in metadatas)
+    # ISO timestamps in UTC sort chronologically as strings
+    created = [m["created_at"] for m in metadatas if m.get("created_at")]
+    seen = created + [m["last_seen_at"] for m in metadatas if m.get("last_seen_at")]
+    if created:
+        merged["created_at"] = min(created)
+    if seen:
+        merged["last_seen_at"] = max(seen)
+    merged["consolidated_at"] = format_timestamp(utc_now())
+    return merged
+
+
+async def _summarize(groups: list[list[str]]) -> list[Optional[str]]:
+    from core.llm import AIClient
+
+    # A fresh client: each Celery run has its own event loop
+    client = AIClient()
+    semaphore = asyncio.Semaphore(2)
+
+    async def summarize(documents: list[str]) -> Optional[str]:
+        distinct = list(dict.fromkeys(documents))
+        if len(distinct) == 1:
+            return None  # Exact duplicates: keep the entry as it is
+        entries = "\n".join(f"- {document}" for document in distinct)
+        async with semaphore:
+            try:
+                summary = await client.generate(SUMMARY_PROMPT.format(entries=entries), system=SUMMARY_SYSTEM)
+            except Exception as e:
+                logger.warning(f"Summarizing a memory cluster failed, keeping its central entry: {e}")
+                return None
+        return summary.strip() or None
+
+    return await asyncio.gather(*(summarize(documents) for documents in groups))
+
+
+def _chunks(items: list, size: int):
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def consolidate_collection(name: str, summarize: bool) -> dict:
+    """Merges near-duplicates in one collection and returns what changed."""
+    block_size = settings.consolidation_block_size
+    collection = get_collection(name)
+    entries = load_entries(collection, block_size)
+    before = len(entries.ids)
+    clusters = find_clusters(entries.embeddings, settings.consolidation_similarity, block_size)
+    if not clusters:
+        return {"collection": name, "before": before, "after": before, "clusters": 0, "removed": 0}
+
+    unit = _normalize(entries.embeddings)
+    keepers = [_medoid(unit, group) for group in clusters]
+    summaries = [None] * len(clusters)
+    if summarize:
+        summaries = asyncio.run(_summarize([[entries.documents[i] for i in group] for group in clusters]))
+
+    resummarized = {"ids": [], "documents": [], "metadatas": []}
+    kept = {"ids": [], "metadatas": []}
+    removed_ids = []
+    for group, keeper, summary in zip(clusters, keepers, summaries):
+        metadata = _merged_metadata(entries, group, keeper)
+        if summary:
+            resummarized["ids"].append(entries.ids[keeper])
+            resummarized["documents"].append(summary)
+            resummarized["metadatas"].append(metadata)
+        else:
+            kept["ids"].append(entries.ids[keeper])
+            kept["metadatas"].append(metadata)
+        removed_ids.extend(entries.ids[i] for i in group if i != keeper)
+
+    # New documents are re-embedded by the collection; unchanged ones keep their vectors
+    if resummarized["ids"]:
+        collection.update(**resummarized)
+    if kept["ids"]:
+        collection.update(**kept)
+    for chunk in _chunks(removed_ids, block_size):
+        collection.delete(ids=chunk)
+
+    return {
+        "collection": name,
+        "before": before,
+        "after": before - len(removed_ids),
+        "clusters": len(clusters),
+        "removed": len(removed_ids),
+    }
+
+
+def promote_short_term() -> int:
+    """Moves important short-term memories to long-term. Returns how many moved."""
+    block_size = settings.consolidation_block_size
+    short_term = get_collection("short_term")
+    entries = load_entries(short_term, block_size)
+    chosen = [
+        i for i, metadata in enumerate(entries.metadatas)
+        if importance_score(metadata) >= settings.consolidation_promote_threshold
+    ]
+    promoted_at = format_timestamp(utc_now())
+    long_term = get_collection("long_term")
+    for chunk in _chunks(chosen, block_size):
+        long_term.upsert(
+            ids=[entries.ids[i] for i in chunk],
+            embeddings=entries.embeddings[chunk].tolist(),
+            documents=[entries.documents[i] for i in chunk],
+            metadatas=[{**entries.metadatas[i], "promoted_at": promoted_at} for i in chunk],
+        )
+        short_term.delete(ids=[entries.ids[i] for i in chunk])
+    return len(chosen)
+
+
+async def _publish_report(report: dict):
+    from core.redis_client import close_redis, get_redis
+    from services.stats_service import get_stats_service
+
+    try:
+        await get_redis().set(LAST_REPORT_KEY, json.dumps(report))
+        await get_stats_service().rebuild_memory_counts()
+    finally:
+        # The client is bound to this run's event loop
+        await close_redis()
+
+
+def run_consolidation(summarize: Optional[bool] = None) -> dict:
+    """Consolidates short-term memory, promotes from it, then consolidates long-term memory."""
+    summarize = settings.consolidation_summarize if summarize is None else summarize
+    started = time.monotonic()
+
+    collections = [consolidate_collection("short_term", summarize)]
+    promoted = promote_short_term()
+    collections.append(consolidate_collection("long_term", summarize))
+
+    # Promoted entries are counted by both collections
+    before = sum(c["before"] for c in collections) - promoted
+    removed = sum(c["removed"] for c in collections)
+    report = {
+        "finished_at": format_timestamp(utc_now()),
+        "duration_seconds": round(time.monotonic() - started, 2),
+        "collections": collections,
+        "promoted": promoted,
+        "before": before,
+        "after": before - removed,
+        "removed": removed,
+        "shrink_ratio": round(removed / before, 4) if before else 0.0,
+    }
+    logger.info(
+        f"Memory consolidation removed {removed} of {before} entries "
+        f"({report['shrink_ratio']:.1%}) and promoted {promoted} to long-term"
+    )
+
+    try:
+        asyncio.run(_publish_report(report))
+    except Exception as e:
+        logger.warning(f"Failed to publish consolidation report: {e}")
+    return report
+
+
+@celery_app.task(name="memory.consolidate")
+def consolidate_memory() -> dict:
+    """Celery entry point, scheduled by beat every `consolidation_interval_hours`."""
+    if not vector_store_shared():
+        # The API would keep serving its own copy, including the deleted entries
+        logger.error("Skipping memory consolidation: embedded ChromaDB can't be shared with the API process.")
+        return {"status": "skipped", "reason": "Set CHROMA_HOST or VECTOR_BACKEND=quantized."}
+    return run_consolidation()
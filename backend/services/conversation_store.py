@@ -0,0 +1,451 @@
+"""
+ARIA Conversation Store
+Persists chat sessions with batched background writes and a bounded cache.
+
+Appends go to an in-memory queue that a background task writes in bulk.
+The most recent messages of active sessions are kept in an LRU cache, so
+building the LLM context for an ongoing chat doesn't touch the database, and
+resuming any session costs one indexed query.
+
+In shared mode (several workers) the recent-message tail and the sequence
+counter of each session live in Redis instead, so any worker can continue
+any conversation; each worker still batches its own database writes.
+"""
+import asyncio
+import json
+from collections import Counter, OrderedDict, deque
+from dataclasses import dataclass
+from typing import Optional
+
+from sqlalchemy import bindparam, func, select, update
+from sqlalchemy.exc import DataError, IntegrityError, InterfaceError, OperationalError
+
+from config.settings import settings
+from core.coordination import shared_state_enabled
+from core.database import get_engine, get_session_factory
+from core.redis_client import get_redis
+from models import ChatMessage, ChatSession
+from utils.helpers import format_timestamp, truncate_string, utc_now
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+_conversation_store_instance = None
+
+# Errors that fail the same way however often a write is retried
+PERMANENT_ERRORS = (IntegrityError, DataError)
+UNAVAILABLE_ERRORS = (OperationalError, InterfaceError)
+MAX_FLUSH_BACKOFF = 30.0
+
+
+@dataclass
+class _SessionCache:
+    """Most recent messages of one session, oldest first."""
+    messages: deque
+    next_seq: int
+    complete: bool  # True when `messages` holds the whole history
+
+
+@dataclass
+class _PendingSession:
+    title: Optional[str] = None
+    new: bool = False
+    added: int = 0
+    updated_at: object = None
+    attempts: int = 0  # Failed flushes so far
+
+
+def _message_dict(seq: int, role: str, content: str, created_at) -> dict:
+    return {
+        "seq": seq,
+        "role": role,
+        "content": content,
+        "created_at": format_timestamp(created_at) if created_at else None,
+    }
+
+
+def _seq_key(session_id: str) -> str:
+    return f"aria:conversation:{session_id}:seq"
+
+
+def _recent_key(session_id: str) -> str:
+    return f"aria:conversation:{session_id}:recent"
+
+
+# Seeds a session's counter and tail unless another worker already has
+_SEED_SCRIPT = """
+if redis.call('EXISTS', KEYS[1]) == 1 then
+    return 0
+end
+redis.call('SET', KEYS[1], ARGV[1], 'EX', ARGV[2])
+redis.call('DEL', KEYS[2])
+for i = 3, #ARGV do
+    redis.call('RPUSH', KEYS[2], ARGV[i])
+end
+redis.call('EXPIRE', KEYS[2], ARGV[2])
+return 1
+"""
+
+
+def _insert_ignore(table):
+    """INSERT ... ON CONFLICT DO NOTHING for the configured dialect."""
+    if get_engine().dialect.name == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert
+    else:
+        from sqlalchemy.dialects.postgresql import insert
+    return insert(table).on_conflict_do_nothing()
+
+
+class ConversationStore:
+    """Batched, cached access to chat sessions and messages."""
+
+    def __init__(
+        self,
+        cache_sessions: int,
+        recent_messages: int,
+        batch_size: int,
+        flush_interval: float,
+        shared: bool = False,
+        cache_ttl: int = 3600,
+        max_flush_attempts: int = 10,
+    ):
+        self.cache_sessions = cache_sessions
+        self.recent_messages = recent_messages
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.shared = shared
+        self.cache_ttl = cache_ttl
+        self.max_flush_attempts = max_flush_attempts
+
+        self._cache: OrderedDict[str, _SessionCache] = OrderedDict()
+        self._load_locks: dict[str, asyncio.Lock] = {}
+        self._pending_rows: list[dict] = []
+        self._pending_sessions: dict[str, _PendingSession] = {}
+        self._pending_counts: Counter = Counter()
+        self._flush_lock = asyncio.Lock()
+        self._wakeup = asyncio.Event()
+        self._writer: Optional[asyncio.Task] = None
+        self._failed_flushes = 0  # Consecutive; backs off the writer
+
+    # --- Lifecycle ---
+    def start(self):
+        """Starts the background writer."""
+        if self._writer is None:
+            self._writer = asyncio.create_task(self._write_loop())
+
+    async def stop(self):
+        """Stops the writer and flushes everything still queued."""
+        if self._writer is not None:
+            self._writer.cancel()
+            try:
+                await self._writer
+            except asyncio.CancelledError:
+                pass
+            self._writer = None
+        await self.flush()
+
+    async def _write_loop(self):
+        while True:
+            interval = min(self.flush_interval * 2 ** self._failed_flushes, MAX_FLUSH_BACKOFF)
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            if self._pending_rows:
+                await self.flush()
+
+    # --- Cache ---
+    def _touch(self, session_id: str, entry: _SessionCache):
+        self._cache[session_id] = entry
+        self._cache.move_to_end(session_id)
+        while len(self._cache) > self.cache_sessions:
+            self._cache.popitem(last=False)
+
+    async def _load(self, session_id: str) -> _SessionCache:
+        """Returns the cached tail of a session, loading it with one query on a miss."""
+        entry = self._cache.get(session_id)
+        if entry is not None:
+            self._cache.move_to_end(session_id)
+            return entry
+
+        lock = self._load_locks.setdefault(session_id, asyncio.Lock())
+        async with lock:
+            entry = self._cache.get(session_id)
+            if entry is not None:
+                return entry
+
+            # Evicted with writes still queued: persist them so the query sees them
+            if self._pending_counts[session_id]:
+                await self.flush()
+
+            rows = await self._query_recent(session_id)
+            messages = deque((_message_dict(*row) for row in reversed(rows)), maxlen=self.recent_messages)
+            next_seq = rows[0].seq + 1 if rows else 1
+            entry = _SessionCache(messages=messages, next_seq=next_seq, complete=len(rows) < self.recent_messages)
+            self._touch(session_id, entry)
+        self._load_locks.pop(session_id, None)
+        return entry
+
+    async def _query_recent(self, session_id: str) -> list:
+        """Returns the newest `recent_messages` rows of a session, newest first."""
+        query = (
+            select(ChatMessage.seq, ChatMessage.role, ChatMessage.content, ChatMessage.created_at)
+            .where(ChatMessage.session_id == session_id)
+            .order_by(ChatMessage.seq.desc())
+            .limit(self.recent_messages)
+        )
+        async with get_session_factory()() as db:
+            return (await db.execute(query)).all()
+
+    # --- Shared Cache ---
+    async def _load_shared(self, session_id: str):
+        """Seeds the Redis tail of a session from the database if no worker has yet."""
+        if await get_redis().exists(_seq_key(session_id)):
+            return
+        if self._pending_counts[session_id]:
+            await self.flush()
+
+        rows = await self._query_recent(session_id)
+        messages = [json.dumps(_message_dict(*row)) for row in reversed(rows)]
+        last_seq = rows[0].seq if rows else 0
+        await get_redis().eval(
+            _SEED_SCRIPT, 2, _seq_key(session_id), _recent_key(session_id), last_seq, self.cache_ttl, *messages
+        )
+
+    async def _append_shared(self, session_id: str, role: str, content: str, now) -> dict:
+        await self._load_shared(session_id)
+        redis = get_redis()
+        seq = await redis.incr(_seq_key(session_id))
+        message = _message_dict(seq, role, content, now)
+
+        pipe = redis.pipeline()
+        pipe.rpush(_recent_key(session_id), json.dumps(message))
+        pipe.ltrim(_recent_key(session_id), -self.recent_messages, -1)
+        pipe.expire(_recent_key(session_id), self.cache_ttl)
+        pipe.expire(_seq_key(session_id), self.cache_ttl)
+        await pipe.execute()
+        return message
+
+    async def _recent_shared(self, session_id: str) -> list[dict]:
+        raw = await get_redis().lrange(_recent_key(session_id), 0, -1)
+        # Workers appending concurrently can push slightly out of order
+        return sorted((json.loads(item) for item in raw), key=lambda message: message["seq"])
+
+    async def _cached_tail(self, session_id: str) -> Optional[tuple[list[dict], bool]]:
+        """Returns (recent messages, holds whole history) if the session is cached."""
+        if self.shared:
+            if not await get_redis().exists(_seq_key(session_id)):
+                return None
+            messages = await self._recent_shared(session_id)
+            return messages, not messages or messages[0]["seq"] == 1
+        entry = self._cache.get(session_id)
+        if entry is None:
+            return None
+        return list(entry.messages), entry.complete
+
+    # --- Writes ---
+    async def append(self, session_id: str, role: str, content: str) -> dict:
+        """Queues a message for writing and returns it with its sequence number."""
+        now = utc_now()
+        if self.shared:
+            message = await self._append_shared(session_id, role, content, now)
+            seq = message["seq"]
+        else:
+            entry = await self._load(session_id)
+            seq = entry.next_seq
+            entry.next_seq += 1
+            message = _message_dict(seq, role, content, now)
+            entry.messages.append(message)
+
+        pending = self._pending_sessions.setdefault(session_id, _PendingSession())
+        if seq == 1:
+            pending.new = True
+            pending.title = truncate_string(content, 80) if role == "user" else None
+        pending.added += 1
+        pending.updated_at = now
+
+        self._pending_rows.append({
+            "session_id": session_id,
+            "seq": seq,
+            "role": role,
+            "content": content,
+            "created_at": now,
+        })
+        self._pending_counts[session_id] += 1
+        if len(self._pending_rows) >= self.batch_size:
+            self._wakeup.set()
+        return message
+
+    async def flush(self):
+        """
+        Writes all queued sessions and messages, in one transaction when
+        possible. If the batch fails, each session is written on its own so
+        one bad session can't hold up or lose the others: sessions failing
+        permanently are dropped, the rest retried up to `max_flush_attempts`.
+        """
+        async with self._flush_lock:
+            if not self._pending_rows and not self._pending_sessions:
+                return
+            rows, self._pending_rows = self._pending_rows, []
+            sessions, self._pending_sessions = self._pending_sessions, {}
+
+            try:
+                await self._write(rows, sessions)
+            except Exception as e:
+                batch_error = e
+            else:
+                self._failed_flushes = 0
+                self._settle(rows)
+                return
+
+            by_session: dict[str, list[dict]] = {sid: [] for sid in sessions}
+            for row in rows:
+                by_session.setdefault(row["session_id"], []).append(row)
+            # With the database unreachable, per-session writes would only fail again
+            if len(by_session) == 1 or isinstance(batch_error, UNAVAILABLE_ERRORS):
+                retrying = False
+                for sid, session_rows in by_session.items():
+                    session = sessions.get(sid) or _PendingSession()
+                    retrying = self._write_failed(sid, session_rows, session, batch_error) or retrying
+                self._failed_flushes = self._failed_flushes + 1 if retrying else 0
+                return
+
+            logger.warning(f"Conversation flush of {len(rows)} messages failed, writing per session: {batch_error}")
+            retrying = False
+            for sid, session_rows in by_session.items():
+                session = sessions.get(sid) or _PendingSession()
+                try:
+                    await self._write(session_rows, {sid: session})
+                except Exception as e:
+                    retrying = self._write_failed(sid, session_rows, session, e) or retrying
+                else:
+                    self._settle(session_rows)
+            self._failed_flushes = self._failed_flushes + 1 if retrying else 0
+
+    async def _write(self, rows: list[dict], sessions: dict[str, _PendingSession]):
+        """Writes messages and their session rows and counters in one transaction."""
+        # Another worker may be holding the first message of a session we
+        # append to, so in shared mode every session row is ensured here
+        new_sessions = [
+            {"id": sid, "title": s.title, "message_count": 0, "created_at": s.updated_at, "updated_at": s.updated_at}
+            for sid, s in sessions.items() if s.new or self.shared
+        ]
+        counters = [
+            {"sid": sid, "added": s.added, "ts": s.updated_at, "title": s.title}
+            for sid, s in sessions.items() if s.added
+        ]
+        async with get_session_factory()() as db:
+            if new_sessions:
+                await db.execute(_insert_ignore(ChatSession.__table__), new_sessions)
+            if rows:
+                await db.execute(ChatMessage.__table__.insert(), rows)
+            if counters:
+                await db.execute(
+                    update(ChatSession.__table__)
+                    .where(ChatSession.__table__.c.id == bindparam("sid"))
+                    .values(
+                        message_count=ChatSession.__table__.c.message_count + bindparam("added"),
+                        updated_at=bindparam("ts"),
+                        title=func.coalesce(
+                            ChatSession.__table__.c.title,
+                            bindparam("title", type_=ChatSession.__table__.c.title.type),
+                        ),
+                    ),
+                    counters,
+                )
+            await db.commit()
+
+    def _write_failed(self, session_id: str, rows: list[dict], session: _PendingSession, error: Exception) -> bool:
+        """Requeues a session's failed write, or drops it if retrying can't help. Returns True if requeued."""
+        session.attempts += 1
+        if isinstance(error, PERMANENT_ERRORS) or session.attempts >= self.max_flush_attempts:
+            reason = "they can't be stored" if isinstance(error, PERMANENT_ERRORS) else f"{session.attempts} attempts"
+            logger.error(f"Dropping {len(rows)} messages of session {session_id} after {reason}: {error}")
+            self._settle(rows)
+            return False
+
+        logger.error(f"Writing {len(rows)} messages of session {session_id} failed, will retry: {error}")
+        # Put the rows back in front of anything queued meanwhile
+        self._pending_rows = rows + self._pending_rows
+        current = self._pending_sessions.get(session_id)
+        if current is None:
+            self._pending_sessions[session_id] = session
+        else:
+            current.new = current.new or session.new
+            current.title = current.title or session.title
+            current.added += session.added
+            current.attempts = max(current.attempts, session.attempts)
+        return True
+
+    def _settle(self, rows: list[dict]):
+        """Marks rows as no longer pending, written or dropped."""
+        for row in rows:
+            self._pending_counts[row["session_id"]] -= 1
+            if self._pending_counts[row["session_id"]] <= 0:
+                del self._pending_counts[row["session_id"]]
+
+    # --- Reads ---
+    async def get_context(self, session_id: str, limit: Optional[int] = None) -> list[dict]:
+        """Returns the last messages of a session as LLM chat messages."""
+        if self.shared:
+            await self._load_shared(session_id)
+            messages = await self._recent_shared(session_id)
+        else:
+            messages = list((await self._load(session_id)).messages)
+        messages = messages[-(limit or self.recent_messages):]
+        return [{"role": m["role"], "content": m["content"]} for m in messages]
+
+    async def get_history(self, session_id: str, before_seq: Optional[int] = None, limit: int = 50) -> dict:
+        """
+        Returns a page of messages, oldest first, ending before `before_seq`
+        (or at the newest message). `next_cursor` is passed back as
+        `before_seq` to load the previous page.
+        """
+        cached = await self._cached_tail(session_id) if before_seq is None else None
+        if cached is not None:
+            messages, complete = cached
+            if len(messages) >= limit or complete:
+                page = messages[-limit:]
+                has_more = not (complete and len(page) == len(messages))
+                return {"messages": page, "next_cursor": page[0]["seq"] if page and has_more else None}
+
+        if self._pending_counts[session_id]:
+            await self.flush()
+
+        query = (
+            select(ChatMessage.seq, ChatMessage.role, ChatMessage.content, ChatMessage.created_at)
+            .where(ChatMessage.session_id == session_id)
+            .order_by(ChatMessage.seq.desc())
+            .limit(limit + 1)
+        )
+        if before_seq is not None:
+            query = query.where(ChatMessage.seq < before_seq)
+        async with get_session_factory()() as db:
+            rows = (await db.execute(query)).all()
+
+        has_more = len(rows) > limit
+        page = [_message_dict(*row) for row in reversed(rows[:limit])]
+        return {"messages": page, "next_cursor": page[0]["seq"] if page and has_more else None}
+
+    async def list_sessions(self, limit: int = 20) -> list[dict]:
+        """Returns the most recently active sessions."""
+        await self.flush()
+        query = select(ChatSession).order_by(ChatSession.updated_at.desc()).limit(limit)
+        async with get_session_factory()() as db:
+            return [row.to_dict() for row in (await db.scalars(query)).all()]
+
+
+def get_conversation_store() -> ConversationStore:
+    """Returns a singleton ConversationStore."""
+    global _conversation_store_instance
+    if _conversation_store_instance is None:
+        _conversation_store_instance = ConversationStore(
+            cache_sessions=settings.conversation_cache_sessions,
+            recent_messages=settings.conversation_recent_messages,
+            batch_size=settings.conversation_batch_size,
+            flush_interval=settings.conversation_flush_interval,
+            shared=shared_state_enabled(),
+            cache_ttl=settings.conversation_cache_ttl,
+            max_flush_attempts=settings.conversation_flush_attempts,
+        )
+    return _conversation_store_instance
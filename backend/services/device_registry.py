@@ -0,0 +1,110 @@
+"""
+ARIA Device Registry
+Smart home devices reported by integrations, stored in Redis.
+"""
+import json
+from typing import Any, Callable, Optional
+
+from redis.exceptions import WatchError
+
+from core.redis_client import get_redis
+from services.stats_service import get_stats_service
+from utils.helpers import format_timestamp, utc_now
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+_device_registry_instance = None
+
+DEVICES_KEY = "aria:devices"
+# Bumped on every change, so unchanged device lists can be answered with 304
+VERSION_KEY = "aria:devices:version"
+_UNCHANGED = object()
+
+
+class DeviceRegistry:
+    """
+    Keeps one JSON document per entity in a Redis hash and updates the
+    dashboard device counters on every change.
+    """
+
+    async def get_device(self, entity_id: str) -> Optional[dict]:
+        raw = await get_redis().hget(DEVICES_KEY, entity_id)
+        return json.loads(raw) if raw else None
+
+    async def list_devices(self) -> list[dict]:
+        devices = [json.loads(raw) for raw in (await get_redis().hgetall(DEVICES_KEY)).values()]
+        return sorted(devices, key=lambda device: device["entity_id"])
+
+    async def version(self) -> int:
+        return int(await get_redis().get(VERSION_KEY) or 0)
+
+    async def upsert_device(self, device: dict) -> dict:
+        """Adds or updates a device. `entity_id` is required (e.g. 'light.kitchen')."""
+        now = format_timestamp(utc_now())
+        _, new = await self._change(device["entity_id"], lambda old: {**(old or {}), **device, "last_updated": now})
+        return new
+
+    async def set_state(self, entity_id: str, state: str) -> Optional[dict]:
+        """Sets a device's state. Returns the device, or None if it is unknown."""
+        now = format_timestamp(utc_now())
+        result = await self._change(
+            entity_id, lambda old: _UNCHANGED if old is None else {**old, "state": state, "last_updated": now}
+        )
+        return result[1] if result else None
+
+    async def toggle(self, entity_id: str) -> Optional[dict]:
+        """Flips a device between on and off. Returns the device, or None if it is unknown."""
+        now = format_timestamp(utc_now())
+
+        def flip(old: Optional[dict]):
+            if old is None:
+                return _UNCHANGED
+            return {**old, "state": "off" if old.get("state") == "on" else "on", "last_updated": now}
+
+        result = await self._change(entity_id, flip)
+        return result[1] if result else None
+
+    async def remove_device(self, entity_id: str) -> bool:
+        return await self._change(entity_id, lambda old: _UNCHANGED if old is None else None) is not None
+
+    async def _change(self, entity_id: str, change: Callable[[Optional[dict]], Any]):
+        """
+        Applies `change(old) -> new` to one device together with the dashboard
+        counters, as one Redis transaction. `new` None removes the device and
+        `_UNCHANGED` leaves it as it is. The read is watched, so a concurrent
+        change to the registry makes this retry instead of counting against a
+        stale state. Returns (old, new), or None if nothing changed.
+        """
+        stats = get_stats_service()
+        async with get_redis().pipeline(transaction=True) as pipe:
+            while True:
+                try:
+                    await pipe.watch(DEVICES_KEY)
+                    raw = await pipe.hget(DEVICES_KEY, entity_id)
+                    old = json.loads(raw) if raw else None
+                    new = change(old)
+                    if new is _UNCHANGED:
+                        await pipe.unwatch()
+                        return None
+
+                    pipe.multi()
+                    if new is None:
+                        pipe.hdel(DEVICES_KEY, entity_id)
+                    else:
+                        pipe.hset(DEVICES_KEY, entity_id, json.dumps(new))
+                    pipe.incr(VERSION_KEY)
+                    counted = stats.queue_device_change(pipe, old, new)
+                    await pipe.execute()
+                except WatchError:
+                    continue
+                if counted:
+                    stats.mark_changed()
+                return old, new
+
+
+def get_device_registry() -> DeviceRegistry:
+    """Returns a singleton DeviceRegistry."""
+    global _device_registry_instance
+    if _device_registry_instance is None:
+        _device_registry_instance = DeviceRegistry()
+    return _device_registry_instance
@@ -0,0 +1,153 @@
+"""
+ARIA Event Bus
+Publish/subscribe for events streamed to the dashboard.
+
+With a single worker, history and fan-out stay in process. In shared mode
+events go through a Redis channel that every worker listens on, and the
+recent history is a capped Redis list, so clients see the same stream
+whichever worker they are connected to. Every published event is counted in
+the dashboard stats here, whichever route or service published it.
+"""
+import asyncio
+import json
+import uuid
+from collections import deque
+from contextlib import contextmanager
+from typing import Any, Iterator, Optional
+
+from config.settings import settings
+from core.coordination import shared_state_enabled
+from core.redis_client import get_redis
+from services.stats_service import get_stats_service
+from utils.helpers import format_timestamp, utc_now
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+_event_bus_instance = None
+
+EVENTS_CHANNEL = "aria:events"
+RECENT_KEY = "aria:events:recent"
+
+
+class EventBus:
+    """
+    Keeps a bounded history of recent events and fans new ones out to
+    subscribers (one queue per WebSocket client). Slow subscribers drop
+    messages instead of blocking publishers.
+    """
+
+    def __init__(self, history_size: int, queue_size: int, shared: bool = False):
+        self._recent: deque[dict] = deque(maxlen=history_size)
+        self._subscribers: set[asyncio.Queue] = set()
+        self._queue_size = queue_size
+        self._history_size = history_size
+        self.shared = shared
+        self._listener: Optional[asyncio.Task] = None
+
+    # --- Lifecycle ---
+    def start(self):
+        """Starts relaying messages from other workers (shared mode only)."""
+        if self.shared and self._listener is None:
+            self._listener = asyncio.create_task(self._listen())
+
+    async def stop(self):
+        if self._listener is not None:
+            self._listener.cancel()
+            try:
+                await self._listener
+            except asyncio.CancelledError:
+                pass
+            self._listener = None
+
+    async def _listen(self):
+        while True:
+            pubsub = get_redis().pubsub()
+            try:
+                await pubsub.subscribe(EVENTS_CHANNEL)
+                async for message in pubsub.listen():
+                    if message["type"] == "message":
+                        self.deliver(json.loads(message["data"]))
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Event relay disconnected, reconnecting: {e}")
+                await asyncio.sleep(1)
+            finally:
+                await pubsub.aclose()
+
+    # --- Publishing ---
+    async def publish(self, event_type: str, source: Optional[str] = None, data: Any = None) -> dict:
+        """Records an event and delivers it to all subscribers."""
+        event = {
+            "id": uuid.uuid4().hex,
+            "event_type": event_type,
+            "source": source,
+            "data": data,
+            "timestamp": format_timestamp(utc_now()),
+        }
+        message = {"type": "event", "payload": event}
+        stats = get_stats_service()
+        if self.shared:
+            pipe = get_redis().pipeline()
+            pipe.lpush(RECENT_KEY, json.dumps(event))
+            pipe.ltrim(RECENT_KEY, 0, self._history_size - 1)
+            pipe.publish(EVENTS_CHANNEL, json.dumps(message))
+            stats.queue_event(pipe, event_type)
+            await pipe.execute()
+            stats.mark_changed()
+        else:
+            self._recent.append(event)
+            self.deliver(message)
+            try:
+                await stats.record_event(event_type)
+            except Exception as e:
+                logger.warning(f"Failed to update event stats: {e}")
+        return event
+
+    def deliver(self, message: dict):
+        """Delivers a raw message to this worker's subscribers."""
+        for queue in self._subscribers:
+            try:
+                queue.put_nowait(message)
+            except asyncio.QueueFull:
+                logger.debug("Dropping event for slow subscriber")
+
+    # --- Reading ---
+    async def recent(self, limit: int = 20) -> list[dict]:
+        """Returns up to `limit` most recent events, newest first."""
+        if limit <= 0:
+            return []
+        if self.shared:
+            return [json.loads(raw) for raw in await get_redis().lrange(RECENT_KEY, 0, limit - 1)]
+        events = list(self._recent)[-limit:]
+        events.reverse()
+        return events
+
+    async def version(self) -> Optional[str]:
+        """Id of the newest event; changes whenever the recent history does."""
+        if self.shared:
+            raw = await get_redis().lindex(RECENT_KEY, 0)
+            return json.loads(raw)["id"] if raw else None
+        return self._recent[-1]["id"] if self._recent else None
+
+    @contextmanager
+    def subscribe(self) -> Iterator[asyncio.Queue]:
+        """Registers a subscriber queue for the duration of the block."""
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self._queue_size)
+        self._subscribers.add(queue)
+        try:
+            yield queue
+        finally:
+            self._subscribers.discard(queue)
+
+
+def get_event_bus() -> EventBus:
+    """Returns a singleton EventBus."""
+    global _event_bus_instance
+    if _event_bus_instance is None:
+        _event_bus_instance = EventBus(
+            history_size=settings.event_history_size,
+            queue_size=settings.event_queue_size,
+            shared=shared_state_enabled(),
+        )
+    return _event_bus_instance
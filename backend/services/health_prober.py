@@ -0,0 +1,76 @@
+"""
+ARIA Health Prober
+Periodically checks the model provider and database and shares the result.
+
+Runs as a leader-only job so a deployment with many workers probes once per
+interval; every worker reads the latest result from Redis.
+"""
+import asyncio
+import json
+from typing import Optional
+
+from config.settings import settings
+from core.coordination import WORKER_ID
+from core.redis_client import get_redis
+from utils.helpers import format_timestamp, utc_now
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+HEALTH_KEY = "aria:health"
+PROBE_TIMEOUT = 10.0
+
+
+async def _check_model() -> bool:
+    from core.llm import get_ai_client
+
+    # Metadata-only for every provider: Ollama lists models, Gemini fetches the model's info
+    return await get_ai_client().check_connection()
+
+
+async def _check_database() -> bool:
+    from sqlalchemy import text
+    from core.database import get_engine
+
+    async with get_engine().connect() as conn:
+        await conn.execute(text("SELECT 1"))
+    return True
+
+
+async def probe() -> dict:
+    """
+    Runs all checks concurrently. A check that errors or times out counts as
+    down. The model status is reported as `model_connected` and under the
+    provider's name, e.g. `gemini_connected`.
+    """
+    checks = {"model_connected": _check_model(), "database_connected": _check_database()}
+    results = await asyncio.gather(
+        *(asyncio.wait_for(check, timeout=PROBE_TIMEOUT) for check in checks.values()),
+        return_exceptions=True,
+    )
+    status = {name: result is True for name, result in zip(checks, results)}
+    return {**model_status(status["model_connected"]), "database_connected": status["database_connected"]}
+
+
+def model_status(connected: bool) -> dict:
+    provider = settings.ai_provider.lower()
+    return {"model_provider": provider, "model_connected": connected, f"{provider}_connected": connected}
+
+
+async def run_health_prober():
+    """Probes forever, storing each result with a TTL so stale results disappear."""
+    interval = settings.health_probe_interval
+    while True:
+        result = await probe()
+        result.update({"checked_at": format_timestamp(utc_now()), "checked_by": WORKER_ID})
+        try:
+            await get_redis().set(HEALTH_KEY, json.dumps(result), ex=max(1, int(interval * 3)))
+        except Exception as e:
+            logger.warning(f"Failed to store health probe result: {e}")
+        await asyncio.sleep(interval)
+
+
+async def latest_health() -> Optional[dict]:
+    """Returns the most recent probe result, if one is still fresh."""
+    raw = await get_redis().get(HEALTH_KEY)
+    return json.loads(raw) if raw else None
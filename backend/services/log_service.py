@@ -0,0 +1,304 @@
+"""
+ARIA Log Query Service
+Tails, filters and follows the application log without reading it into memory.
+"""
+import asyncio
+import os
+import re
+import threading
+from array import array
+from pathlib import Path
+from typing import AsyncIterator, Optional
+
+from config.settings import settings
+from utils.logger import LOG_FILE, get_logger
+
+logger = get_logger(__name__)
+_log_index_instance = None
+
+BLOCK_SIZE = 64 * 1024
+LEVELS = ("DEBUG", "INFO", "WARNING", "ERROR", "CRITICAL")
+
+# Matches the file formatter in utils/logger.py:
+# "%(asctime)s | %(levelname)-8s | %(name)s:%(lineno)d | %(message)s"
+_RECORD_RE = re.compile(rb"^\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2} \| (\w+)\s*\| (.+?):\d+ \| ")
+
+
+def parse_level(level: Optional[str]) -> int:
+    """
+    Converts a level name to its index in LEVELS.
+
+    Raises:
+        ValueError: If the level name is unknown.
+    """
+    if not level:
+        return 0
+    try:
+        return LEVELS.index(level.upper())
+    except ValueError:
+        raise ValueError(f"Unknown log level '{level}'. Expected one of {', '.join(LEVELS)}.")
+
+
+def _matches_logger(name: str, prefix: Optional[str]) -> bool:
+    """Hierarchical match: 'core' matches 'core' and 'core.llm'."""
+    return not prefix or name == prefix or name.startswith(prefix + ".")
+
+
+def _decode(line: bytes) -> str:
+    return line.rstrip(b"\r\n").decode("utf-8", errors="replace")
+
+
+def tail_lines(path: Path, n: int, block_size: int = BLOCK_SIZE) -> list[str]:
+    """
+    Returns the last `n` lines of a file by reading it backwards in blocks.
+    Only the blocks holding those lines are read, regardless of file size.
+    """
+    if n <= 0:
+        return []
+    try:
+        f = open(path, "rb")
+    except FileNotFoundError:
+        return []
+
+    with f:
+        f.seek(0, os.SEEK_END)
+        pos = f.tell()
+        blocks = []
+        newlines = 0
+        # Read one newline past `n` so a partial first line is always discarded
+        while pos > 0 and newlines <= n:
+            size = min(block_size, pos)
+            pos -= size
+            f.seek(pos)
+            block = f.read(size)
+            blocks.append(block)
+            newlines += block.count(b"\n")
+
+    data = b"".join(reversed(blocks))
+    return [_decode(line) for line in data.splitlines()[-n:]]
+
+
+class LogIndex:
+    """
+    Offset index over the log file, built incrementally as the file grows.
+
+    Every physical line gets an entry (offset, level, logger id). Lines that
+    do not start a record (tracebacks, multi-line messages) inherit the level
+    and logger of the record they belong to. The index only covers a bounded
+    trailing window of the file, so memory use does not grow with file size.
+    """
+
+    def __init__(self, path: Path, max_entries: int, initial_window: int):
+        self.path = Path(path)
+        self.max_entries = max_entries
+        self.initial_window = initial_window
+        self._lock = threading.Lock()
+        self._reset()
+
+    def _reset(self):
+        self._offsets = array("Q")
+        self._levels = array("B")
+        self._loggers = array("I")
+        self._logger_ids: dict[str, int] = {}
+        self._logger_names: list[str] = []
+        self._indexed_to = None
+        self._inode = None
+        self._current = (LEVELS.index("INFO"), self._logger_id("root"))
+
+    def _logger_id(self, name: str) -> int:
+        logger_id = self._logger_ids.get(name)
+        if logger_id is None:
+            logger_id = len(self._logger_names)
+            self._logger_ids[name] = logger_id
+            self._logger_names.append(name)
+        return logger_id
+
+    def _trim(self):
+        if len(self._offsets) <= self.max_entries:
+            return
+        # Drop the oldest half in one go so trimming stays amortized O(1)
+        drop = len(self._offsets) - self.max_entries // 2
+        del self._offsets[:drop]
+        del self._levels[:drop]
+        del self._loggers[:drop]
+
+    def _start_offset(self, f, size: int) -> int:
+        """Finds where to start indexing a file we have not seen before."""
+        if size <= self.initial_window:
+            return 0
+        f.seek(size - self.initial_window)
+        f.readline()  # Skip to the next line boundary
+        return f.tell()
+
+    def refresh(self):
+        """Indexes any complete lines appended since the last refresh."""
+        with self._lock:
+            try:
+                stat = os.stat(self.path)
+            except FileNotFoundError:
+                self._reset()
+                return
+
+            # Rotated or truncated: start over
+            if self._inode != stat.st_ino or (self._indexed_to or 0) > stat.st_size:
+                self._reset()
+                self._inode = stat.st_ino
+
+            with open(self.path, "rb") as f:
+                if self._indexed_to is None:
+                    self._indexed_to = self._start_offset(f, stat.st_size)
+                if self._indexed_to >= stat.st_size:
+                    return
+
+                f.seek(self._indexed_to)
+                offset = self._indexed_to
+                remaining = stat.st_size - offset
+                pending = b""
+                while remaining > 0:
+                    block = f.read(min(BLOCK_SIZE, remaining))
+                    if not block:
+                        break
+                    remaining -= len(block)
+                    data = pending + block
+                    lines = data.split(b"\n")
+                    pending = lines.pop()  # Incomplete trailing line (or b"")
+                    for line in lines:
+                        self._add_line(offset, line)
+                        offset += len(line) + 1
+                    self._trim()
+
+                # Leave a partially written last line for the next refresh
+                self._indexed_to = offset
+
+    def _add_line(self, offset: int, line: bytes):
+        match = _RECORD_RE.match(line)
+        if match:
+            level_name = match.group(1).decode("ascii", errors="replace")
+            level = LEVELS.index(level_name) if level_name in LEVELS else 0
+            name = match.group(2).decode("utf-8", errors="replace")
+            self._current = (level, self._logger_id(name))
+        self._offsets.append(offset)
+        self._levels.append(self._current[0])
+        self._loggers.append(self._current[1])
+
+    def query(self, n: int, min_level: int = 0, logger_prefix: Optional[str] = None) -> list[str]:
+        """
+        Returns the last `n` indexed lines at or above `min_level` whose
+        logger is `logger_prefix` or one of its children.
+        """
+        self.refresh()
+        with self._lock:
+            logger_ids = None
+            if logger_prefix:
+                logger_ids = {
+                    i for i, name in enumerate(self._logger_names)
+                    if _matches_logger(name, logger_prefix)
+                }
+                if not logger_ids:
+                    return []
+
+            offsets = []
+            levels, loggers = self._levels, self._loggers
+            for i in range(len(self._offsets) - 1, -1, -1):
+                if levels[i] < min_level:
+                    continue
+                if logger_ids is not None and loggers[i] not in logger_ids:
+                    continue
+                offsets.append(self._offsets[i])
+                if len(offsets) >= n:
+                    break
+
+        offsets.reverse()
+        lines = []
+        with open(self.path, "rb") as f:
+            for offset in offsets:
+                f.seek(offset)
+                lines.append(_decode(f.readline()))
+        return lines
+
+
+def get_log_index() -> LogIndex:
+    """Returns a singleton LogIndex for the application log file."""
+    global _log_index_instance
+    if _log_index_instance is None:
+        _log_index_instance = LogIndex(
+            LOG_FILE,
+            max_entries=settings.log_index_max_entries,
+            initial_window=settings.log_index_window_bytes,
+        )
+    return _log_index_instance
+
+
+def query_logs(lines: int, level: Optional[str] = None, logger_name: Optional[str] = None) -> list[str]:
+    """
+    Returns the last `lines` log lines, optionally filtered.
+
+    Unfiltered requests seek backwards from the end of the file; filtered
+    requests go through the offset index.
+    """
+    min_level = parse_level(level)
+    if min_level == 0 and not logger_name:
+        return tail_lines(LOG_FILE, lines)
+    return get_log_index().query(lines, min_level, logger_name)
+
+
+async def follow_logs(
+    level: Optional[str] = None,
+    logger_name: Optional[str] = None,
+    poll_interval: Optional[float] = None,
+) -> AsyncIterator[str]:
+    """
+    Yields log lines as they are appended to the log file.
+    Starts at the current end of file and survives truncation and rotation.
+    """
+    min_level = parse_level(level)
+    interval = poll_interval or settings.log_follow_interval
+    current = (LEVELS.index("INFO"), "root")
+
+    f = None
+    inode = None
+    pending = b""
+    from_start = False
+    try:
+        while True:
+            if f is None:
+                try:
+                    f = open(LOG_FILE, "rb")
+                except FileNotFoundError:
+                    await asyncio.sleep(interval)
+                    continue
+                inode = os.fstat(f.fileno()).st_ino
+                if not from_start:
+                    f.seek(0, os.SEEK_END)  # First open: only new lines
+                pending = b""
+
+            chunk = f.read(BLOCK_SIZE)
+            if not chunk:
+                try:
+                    stat = os.stat(LOG_FILE)
+                    rotated = stat.st_ino != inode or stat.st_size < f.tell()
+                except FileNotFoundError:
+                    rotated = True
+                if rotated:
+                    f.close()
+                    f = None
+                    from_start = True  # The new file is read from its beginning
+                    continue
+                await asyncio.sleep(interval)
+                continue
+
+            lines = (pending + chunk).split(b"\n")
+            pending = lines.pop()
+            for line in lines:
+                match = _RECORD_RE.match(line)
+                if match:
+                    level_name = match.group(1).decode("ascii", errors="replace")
+                    current = (
+                        LEVELS.index(level_name) if level_name in LEVELS else 0,
+                        match.group(2).decode("utf-8", errors="replace"),
+                    )
+                if current[0] >= min_level and _matches_logger(current[1], logger_name):
+                    yield _decode(line)
+    finally:
+        if f is not None:
+            f.close()
@@ -0,0 +1,71 @@
+"""
+ARIA Memory Service
+Stores and searches semantic memories in the vector database.
+"""
+import asyncio
+import uuid
+from typing import Optional
+
+from core.vector_db import MEMORY_COLLECTIONS, get_collection
+from services.stats_service import get_stats_service
+from utils.helpers import format_timestamp, utc_now
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+def _check_collection(collection: str):
+    if collection not in MEMORY_COLLECTIONS:
+        raise ValueError(
+            f"Unknown memory collection '{collection}'. Expected one of {', '.join(MEMORY_COLLECTIONS)}."
+        )
+
+
+async def add_memory(text: str, collection: str = "conversations", metadata: Optional[dict] = None) -> str:
+    """
+    Stores a memory and returns its id.
+
+    Raises:
+        ValueError: If the collection is not a memory collection.
+    """
+    _check_collection(collection)
+    memory_id = uuid.uuid4().hex
+    metadata = {"created_at": format_timestamp(utc_now()), **(metadata or {})}
+
+    def add():
+        get_collection(collection).add(ids=[memory_id], documents=[text], metadatas=[metadata])
+
+    await asyncio.to_thread(add)
+    try:
+        await get_stats_service().record_memory_change(collection, 1)
+    except Exception as e:
+        logger.warning(f"Failed to update memory stats: {e}")
+    return memory_id
+
+
+async def search_memory(query: str, collection: str = "conversations", n_results: int = 5) -> list[dict]:
+    """
+    Returns the memories closest to `query`, nearest first.
+
+    Raises:
+        ValueError: If the collection is not a memory collection.
+    """
+    _check_collection(collection)
+
+    def query_collection():
+        return get_collection(collection).query(query_texts=[query], n_results=n_results)
+
+    result = await asyncio.to_thread(query_collection)
+    ids = result.get("ids", [[]])[0]
+    documents = (result.get("documents") or [[]])[0]
+    metadatas = (result.get("metadatas") or [[]])[0]
+    distances = (result.get("distances") or [[]])[0]
+    return [
+        {
+            "id": ids[i],
+            "document": documents[i] if i < len(documents) else None,
+            "metadata": metadatas[i] if i < len(metadatas) else None,
+            "distance": distances[i] if i < len(distances) else None,
+        }
+        for i in range(len(ids))
+    ]
@@ -0,0 +1,279 @@
+"""
+ARIA Model Profiler
+Measures how each available model performs on this hardware.
+
+For every model: load time (cold, after an explicit unload), time to first
+token, decode speed and resident memory, at several concurrency levels.
+Results are stored in the `model_profiles` table.
+
+Runs started through the API are tracked in Redis, so any worker can report
+their progress, and only one runs at a time across the deployment (two runs
+would unload each other's models). The run holds a lock renewed while it is
+alive; its status expires an hour after it finishes.
+"""
+import asyncio
+import json
+import time
+import uuid
+from typing import Awaitable, Callable, Optional
+
+from sqlalchemy import select
+
+from core.coordination import DistributedLock
+from core.database import get_session_factory
+from core.llm import AIClient, get_ai_client
+from core.redis_client import get_redis
+from models import ModelProfile
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+STANDARD_PROMPTS = [
+    "Turn on the living room lights and set them to 40% brightness.",
+    "Summarize in two sentences what a smart thermostat does.",
+    "The front door has been open for ten minutes. What should I do?",
+    "List three ways to reduce energy use at home at night.",
+    "Write a short, friendly good-morning announcement for the household.",
+]
+DEFAULT_CONCURRENCY = (1, 2, 4)
+
+RUN_KEY = "aria:models:profile:{run_id}"
+RUN_LOCK = "model-profile"
+# A run that stops renewing (its worker died) frees the lock after this long
+RUN_LEASE_SECONDS = 60
+FINISHED_RUN_TTL = 3600
+
+# Keeps background runs referenced until they finish
+_tasks: set[asyncio.Task] = set()
+
+
+def _percentile(values: list[float], p: float) -> Optional[float]:
+    if not values:
+        return None
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round((len(ordered) - 1) * p / 100)))
+    return round(ordered[index], 2)
+
+
+async def _timed_request(client: AIClient, model: str, prompt: str) -> dict:
+    """Streams one completion and returns TTFT, duration and token count."""
+    stats: dict = {}
+    started = time.perf_counter()
+    first_token_at = None
+    chunks = 0
+    async for _ in client.stream_generate(prompt, model=model, stats=stats):
+        if first_token_at is None:
+            first_token_at = time.perf_counter()
+        chunks += 1
+    finished = time.perf_counter()
+
+    first_token_at = first_token_at or finished
+    tokens = stats.get("eval_count") or chunks
+    if stats.get("eval_duration"):
+        # Ollama reports decode time exactly, excluding queueing and prompt eval
+        tokens_per_second = tokens / (stats["eval_duration"] / 1e9)
+    else:
+        decode_time = finished - first_token_at
+        tokens_per_second = tokens / decode_time if decode_time > 0 else None
+    return {
+        "ttft_ms": (first_token_at - started) * 1000,
+        "tokens": tokens,
+        "tokens_per_second": tokens_per_second,
+    }
+
+
+async def _measure_load(client: AIClient, model: str) -> Optional[float]:
+    """Unloads then reloads the model; returns the cold load time in ms."""
+    try:
+        await client.unload(model)
+        started = time.perf_counter()
+        await client.warm_up(model)
+        return round((time.perf_counter() - started) * 1000, 2)
+    except Exception as e:
+        logger.warning(f"Load time measurement failed for {model}: {e}")
+        return None
+
+
+async def _measure_memory(client: AIClient, model: str) -> tuple[Optional[int], Optional[int]]:
+    for entry in await client.loaded_models():
+        if entry["model"] == model:
+            return entry.get("size"), entry.get("size_vram")
+    return None, None
+
+
+async def _run_level(client: AIClient, model: str, concurrency: int, prompts: list[str]) -> dict:
+    """Runs the prompt set (at least `concurrency` requests) with `concurrency` in flight."""
+    total = max(len(prompts), concurrency)
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one(i: int):
+        async with semaphore:
+            return await _timed_request(client, model, prompts[i % len(prompts)])
+
+    started = time.perf_counter()
+    outcomes = await asyncio.gather(*(one(i) for i in range(total)), return_exceptions=True)
+    wall = time.perf_counter() - started
+
+    results = [o for o in outcomes if not isinstance(o, BaseException)]
+    errors = len(outcomes) - len(results)
+    if errors:
+        logger.warning(f"{model} @ {concurrency}: {errors}/{total} requests failed")
+
+    speeds = [r["tokens_per_second"] for r in results if r["tokens_per_second"]]
+    return {
+        "requests": total,
+        "errors": errors,
+        "ttft_ms_p50": _percentile([r["ttft_ms"] for r in results], 50),
+        "ttft_ms_p95": _percentile([r["ttft_ms"] for r in results], 95),
+        "tokens_per_second": round(sum(speeds) / len(speeds), 2) if speeds else None,
+        "aggregate_tokens_per_second": round(sum(r["tokens"] for r in results) / wall, 2) if results else None,
+    }
+
+
+async def profile_model(
+    client: AIClient,
+    model: str,
+    concurrency_levels: tuple[int, ...] = DEFAULT_CONCURRENCY,
+    prompts: Optional[list[str]] = None,
+) -> list[dict]:
+    """Profiles a single model at each concurrency level."""
+    prompts = prompts or STANDARD_PROMPTS
+    logger.info(f"Profiling {model} at concurrency {list(concurrency_levels)}")
+
+    load_time_ms = await _measure_load(client, model)
+    results = []
+    for level in concurrency_levels:
+        result = await _run_level(client, model, level, prompts)
+        # Sample memory right after the run, while the model is resident with its KV cache
+        memory_bytes, vram_bytes = await _measure_memory(client, model)
+        results.append({
+            "provider": client.provider,
+            "model": model,
+            "concurrency": level,
+            "load_time_ms": load_time_ms,
+            "memory_bytes": memory_bytes,
+            "vram_bytes": vram_bytes,
+            **result,
+        })
+    return results
+
+
+async def save_profiles(run_id: str, results: list[dict]):
+    """Stores profiling results in the database."""
+    async with get_session_factory()() as session:
+        session.add_all([ModelProfile(run_id=run_id, **result) for result in results])
+        await session.commit()
+
+
+async def profile_models(
+    models: Optional[list[str]] = None,
+    concurrency_levels: tuple[int, ...] = DEFAULT_CONCURRENCY,
+    run_id: Optional[str] = None,
+    save: bool = True,
+    on_progress: Optional[Callable[[list[dict]], Awaitable[None]]] = None,
+) -> list[dict]:
+    """
+    Profiles the given models (default: every available model) and
+    optionally stores the results. Models are profiled one at a time so
+    they don't compete for memory; `on_progress` gets the results so far
+    after each one.
+    """
+    client = get_ai_client()
+    run_id = run_id or uuid.uuid4().hex
+    models = models or await client.get_available_models()
+
+    results = []
+    for model in models:
+        try:
+            model_results = await profile_model(client, model, concurrency_levels)
+        except Exception as e:
+            logger.error(f"Profiling {model} failed: {e}")
+            continue
+        results.extend(model_results)
+        if on_progress:
+            await on_progress(results)
+
+    if save and results:
+        await save_profiles(run_id, results)
+    logger.info(f"Profiling run {run_id} finished: {len(results)} results")
+    return results
+
+
+async def start_profile_run(models: Optional[list[str]], concurrency_levels: tuple[int, ...]) -> str:
+    """
+    Starts a profiling run in the background and returns its id.
+
+    Raises:
+        RuntimeError: If another run is still in progress on any worker.
+    """
+    lock = DistributedLock(RUN_LOCK, ttl=RUN_LEASE_SECONDS, timeout=0)
+    if not await lock.acquire():
+        raise RuntimeError("A profiling run is already in progress.")
+
+    run = {"run_id": uuid.uuid4().hex, "status": "running", "results": [], "error": None}
+    try:
+        await _save_run(run, RUN_LEASE_SECONDS)
+    except Exception:
+        await lock.release()
+        raise
+    task = asyncio.create_task(_execute_run(run, lock, models, concurrency_levels))
+    _tasks.add(task)
+    task.add_done_callback(_tasks.discard)
+    return run["run_id"]
+
+
+async def _execute_run(
+    run: dict, lock: DistributedLock, models: Optional[list[str]], concurrency_levels: tuple[int, ...]
+):
+    async def keep_alive():
+        while True:
+            await asyncio.sleep(RUN_LEASE_SECONDS / 3)
+            if not await lock.renew():
+                logger.warning(f"Profiling run {run['run_id']} lost its lock")
+            await get_redis().expire(RUN_KEY.format(run_id=run["run_id"]), RUN_LEASE_SECONDS)
+
+    async def progress(results: list[dict]):
+        run["results"] = results
+        await _save_run(run, RUN_LEASE_SECONDS)
+
+    heartbeat = asyncio.create_task(keep_alive())
+    try:
+        await profile_models(models, concurrency_levels, run_id=run["run_id"], on_progress=progress)
+        run["status"] = "completed"
+    except asyncio.CancelledError:
+        run["status"] = "cancelled"
+        raise
+    except Exception as e:
+        logger.error(f"Profiling run {run['run_id']} failed: {e}")
+        run.update(status="failed", error=str(e))
+    finally:
+        heartbeat.cancel()
+        try:
+            await _save_run(run, FINISHED_RUN_TTL)
+        except Exception as e:
+            logger.warning(f"Failed to record the end of profiling run {run['run_id']}: {e}")
+        try:
+            await lock.release()
+        except Exception as e:
+            # The lease expires on its own
+            logger.warning(f"Failed to release the profiling lock: {e}")
+
+
+async def _save_run(run: dict, ttl: int):
+    await get_redis().set(RUN_KEY.format(run_id=run["run_id"]), json.dumps(run), ex=ttl)
+
+
+async def get_profile_run(run_id: str) -> Optional[dict]:
+    """Returns the status of a run started on any worker, or None once it has expired."""
+    raw = await get_redis().get(RUN_KEY.format(run_id=run_id))
+    return json.loads(raw) if raw else None
+
+
+async def list_profiles(model: Optional[str] = None, limit: int = 50) -> list[dict]:
+    """Returns stored profiling results, newest first."""
+    query = select(ModelProfile).order_by(ModelProfile.created_at.desc()).limit(limit)
+    if model:
+        query = query.where(ModelProfile.model == model)
+    async with get_session_factory()() as session:
+        rows = (await session.scalars(query)).all()
+    return [row.to_dict() for row in rows]
@@ -0,0 +1,234 @@
+"""
+ARIA Dashboard Statistics
+Aggregates maintained incrementally in Redis as writes happen.
+
+Memory tier counts, event counts and rates, and device counts are updated by
+the code paths that change them, so serving the dashboard is a handful of
+hash reads regardless of how much data has accumulated. Changes are pushed
+to dashboard clients over the event WebSocket, coalesced per interval.
+"""
+import asyncio
+import time
+from typing import Optional
+
+from config.settings import settings
+from core.coordination import shared_lock, shared_state_enabled
+from core.redis_client import get_redis
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+_stats_service_instance = None
+
+KEY_PREFIX = "aria:stats"
+MEMORY_KEY = f"{KEY_PREFIX}:memory"
+EVENTS_TOTAL_KEY = f"{KEY_PREFIX}:events:total"
+DEVICES_KEY = f"{KEY_PREFIX}:devices"
+VERSION_KEY = f"{KEY_PREFIX}:version"
+
+STARTED_AT = time.time()
+
+
+def _minute_key(minute: int) -> str:
+    return f"{KEY_PREFIX}:events:m:{minute}"
+
+
+def _ints(values: dict) -> dict[str, int]:
+    return {key: int(value) for key, value in values.items()}
+
+
+def _device_fields(device: dict) -> tuple[str, ...]:
+    """Counter fields a device contributes to."""
+    domain = device.get("entity_id", "").split(".")[0] or "unknown"
+    return ("total", f"domain:{domain}", f"state:{device.get('state', 'unknown')}")
+
+
+class StatsService:
+    """Reads and updates the dashboard aggregates."""
+
+    def __init__(self, rate_window_minutes: int, push_interval: float):
+        self.rate_window_minutes = rate_window_minutes
+        self.push_interval = push_interval
+        self._dirty = asyncio.Event()
+        self._pusher: Optional[asyncio.Task] = None
+
+    # --- Lifecycle ---
+    def start(self):
+        """Starts pushing coalesced stats updates to WebSocket clients."""
+        if self._pusher is None:
+            self._pusher = asyncio.create_task(self._push_loop())
+
+    async def stop(self):
+        if self._pusher is not None:
+            self._pusher.cancel()
+            try:
+                await self._pusher
+            except asyncio.CancelledError:
+                pass
+            self._pusher = None
+
+    async def _push_loop(self):
+        from services.event_bus import get_event_bus
+
+        # Other workers' writes don't set our flag, so in shared mode each
+        # worker polls the version counter and pushes to its own clients
+        shared = shared_state_enabled()
+        pushed_version = None
+        while True:
+            if shared:
+                await asyncio.sleep(self.push_interval)
+            else:
+                await self._dirty.wait()
+                self._dirty.clear()
+            try:
+                version = await self.version()
+                if version != pushed_version:
+                    get_event_bus().deliver({"type": "stats", "payload": await self.dashboard()})
+                    pushed_version = version
+            except Exception as e:
+                logger.warning(f"Stats push failed: {e}")
+            if not shared:
+                await asyncio.sleep(self.push_interval)
+
+    async def _changed(self, pipe):
+        pipe.incr(VERSION_KEY)
+        await pipe.execute()
+        self._dirty.set()
+
+    # --- Writes ---
+    async def record_memory_change(self, collection: str, delta: int = 1):
+        pipe = get_redis().pipeline()
+        pipe.hincrby(MEMORY_KEY, collection, delta)
+        await self._changed(pipe)
+
+    async def record_event(self, event_type: str):
+        pipe = get_redis().pipeline()
+        self.queue_event(pipe, event_type)
+        await pipe.execute()
+        self.mark_changed()
+
+    def queue_event(self, pipe, event_type: str):
+        """Queues the counter updates for a published event on `pipe`; call `mark_changed()` after it executes."""
+        key = _minute_key(int(time.time() // 60))
+        pipe.hincrby(EVENTS_TOTAL_KEY, event_type, 1)
+        pipe.hincrby(key, event_type, 1)
+        pipe.expire(key, (self.rate_window_minutes + 1) * 60)
+        pipe.incr(VERSION_KEY)
+
+    def queue_device_change(self, pipe, old: Optional[dict], new: Optional[dict]) -> bool:
+        """
+        Queues the counter updates for an added, updated or removed device on
+        `pipe`, to be applied in the same transaction as the change itself. Returns
+        False if no counter changes; otherwise call `mark_changed()` once
+        the pipeline has executed.
+        """
+        deltas: dict[str, int] = {}
+        for device, sign in ((old, -1), (new, 1)):
+            for field in _device_fields(device) if device else ():
+                deltas[field] = deltas.get(field, 0) + sign
+        deltas = {field: delta for field, delta in deltas.items() if delta}
+        if not deltas:
+            return False
+        for field, delta in deltas.items():
+            pipe.hincrby(DEVICES_KEY, field, delta)
+        pipe.incr(VERSION_KEY)
+        return True
+
+    def mark_changed(self):
+        self._dirty.set()
+
+    # --- Rebuild ---
+    async def rebuild_memory_counts(self):
+        """Recounts memory collections. Used to seed the counters or repair drift."""
+        from core.vector_db import MEMORY_COLLECTIONS, get_collection
+
+        def count_all() -> dict[str, int]:
+            return {name: get_collection(name).count() for name in MEMORY_COLLECTIONS}
+
+        counts = await asyncio.to_thread(count_all)
+        pipe = get_redis().pipeline()
+        pipe.delete(MEMORY_KEY)
+        pipe.hset(MEMORY_KEY, mapping=counts)
+        await self._changed(pipe)
+
+    async def rebuild_device_counts(self, devices: list[dict]):
+        """Recounts devices from the registry."""
+        counts: dict[str, int] = {"total": 0}
+        for device in devices:
+            for field in _device_fields(device):
+                counts[field] = counts.get(field, 0) + 1
+        pipe = get_redis().pipeline()
+        pipe.delete(DEVICES_KEY)
+        pipe.hset(DEVICES_KEY, mapping=counts)
+        await self._changed(pipe)
+
+    async def ensure_seeded(self):
+        """Seeds counters that have never been computed (e.g. on a fresh Redis)."""
+        from services.device_registry import get_device_registry
+
+        redis = get_redis()
+        # Workers start together; only one should recount
+        async with shared_lock("stats-seed"):
+            if not await redis.exists(MEMORY_KEY):
+                await self.rebuild_memory_counts()
+            if not await redis.exists(DEVICES_KEY):
+                await self.rebuild_device_counts(await get_device_registry().list_devices())
+
+    # --- Reads ---
+    async def version(self) -> int:
+        return int(await get_redis().get(VERSION_KEY) or 0)
+
+    async def memory_stats(self) -> dict:
+        tiers = _ints(await get_redis().hgetall(MEMORY_KEY))
+        return {
+            "tiers": tiers,
+            "total": sum(tiers.values()),
+            "semantic": {
+                "conversations_count": tiers.get("conversations", 0),
+                "long_term_count": tiers.get("long_term", 0),
+            },
+            "short_term": {"item_count": tiers.get("short_term", 0)},
+        }
+
+    async def event_stats(self) -> dict:
+        """Event totals and per-minute rates over the configured window."""
+        current = int(time.time() // 60)
+        pipe = get_redis().pipeline()
+        pipe.hgetall(EVENTS_TOTAL_KEY)
+        for minute in range(current - self.rate_window_minutes + 1, current + 1):
+            pipe.hgetall(_minute_key(minute))
+        totals, *buckets = await pipe.execute()
+
+        window: dict[str, int] = {}
+        for bucket in buckets:
+            for event_type, count in bucket.items():
+                window[event_type] = window.get(event_type, 0) + int(count)
+        return {
+            "totals": _ints(totals),
+            "window_minutes": self.rate_window_minutes,
+            "per_minute": {
+                event_type: round(count / self.rate_window_minutes, 2) for event_type, count in window.items()
+            },
+        }
+
+    async def device_stats(self) -> dict:
+        counts = _ints(await get_redis().hgetall(DEVICES_KEY))
+        return {
+            "total": counts.get("total", 0),
+            "by_domain": {k.split(":", 1)[1]: v for k, v in counts.items() if k.startswith("domain:") and v},
+            "by_state": {k.split(":", 1)[1]: v for k, v in counts.items() if k.startswith("state:") and v},
+        }
+
+    async def dashboard(self) -> dict:
+        memory, events, devices = await asyncio.gather(self.memory_stats(), self.event_stats(), self.device_stats())
+        return {"memory": memory, "events": events, "devices": devices}
+
+
+def get_stats_service() -> StatsService:
+    """Returns a singleton StatsService."""
+    global _stats_service_instance
+    if _stats_service_instance is None:
+        _stats_service_instance = StatsService(
+            rate_window_minutes=settings.stats_rate_window_minutes,
+            push_interval=settings.stats_push_interval,
+        )
+    return _stats_service_instance
@@ -0,0 +1,130 @@
+"""
+ARIA Structured Output
+JSON replies that match a schema, checked while they stream.
+
+The schema is passed to the provider (Ollama's `format`, Gemini's response
+schema) so generation is constrained to it, and the streamed text is parsed
+incrementally. Each value is validated against its part of the schema as
+soon as it is complete and handed to `on_field`, so callers can act on the
+first fields while the rest are still being generated. Output that is not
+valid JSON, or breaks the schema, stops the stream at once; the model is
+then asked to repair it with the validation errors in the prompt, rather
+than rerunning the original request blind.
+"""
+import inspect
+import json
+from contextlib import aclosing
+from typing import Any, Awaitable, Callable, Optional, Union
+
+from config.settings import settings
+from core.llm import AIClient, get_ai_client
+from utils.json_schema import subschema, validate
+from utils.json_stream import IncrementalJSONError, IncrementalJSONParser
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+FieldCallback = Callable[[tuple, Any], Union[None, Awaitable[None]]]
+
+SCHEMA_INSTRUCTION = "Reply with a single JSON document, and nothing else, that matches this JSON schema:\n{schema}"
+REPAIR_PROMPT = (
+    "{prompt}\n\n"
+    "Your previous reply was:\n{output}\n\n"
+    "It has these problems:\n{errors}\n\n"
+    "Reply again with the complete, corrected JSON document."
+)
+MAX_REPORTED_ERRORS = 10
+_UNSET = object()
+
+
+class StructuredOutputError(Exception):
+    """Raised when the output still breaks the schema after every repair attempt."""
+
+    def __init__(self, errors: list[str], output: str):
+        super().__init__(f"Structured output is invalid: {'; '.join(errors[:3])}")
+        self.errors = errors
+        self.output = output
+
+
+async def generate_structured(
+    prompt: str,
+    schema: dict,
+    system: Optional[str] = None,
+    model: Optional[str] = None,
+    on_field: Optional[FieldCallback] = None,
+    max_repairs: Optional[int] = None,
+    client: Optional[AIClient] = None,
+) -> Any:
+    """
+    Generates a JSON document matching `schema` and returns it parsed.
+
+    `on_field(path, value)` is called, and awaited if it is a coroutine, for
+    every valid value as it completes, innermost first: ("actions", 0,
+    "entity_id") before ("actions", 0) before ("actions",). Values already
+    reported are not reported again if a repair reproduces them at the same
+    path. A repair may move them (e.g. reorder an array), so callbacks with
+    side effects should deduplicate by value, and should hold actions that
+    aren't safe to repeat or undo until the document has validated.
+
+    Raises:
+        StructuredOutputError: If no attempt produced a valid document.
+    """
+    client = client or get_ai_client()
+    max_repairs = settings.structured_max_repairs if max_repairs is None else max_repairs
+    instruction = SCHEMA_INSTRUCTION.format(schema=json.dumps(schema))
+    system = f"{system}\n\n{instruction}" if system else instruction
+    reported: dict[tuple, Any] = {}
+
+    attempt_prompt = prompt
+    for attempt in range(max_repairs + 1):
+        value, output, errors = await _attempt(client, attempt_prompt, system, model, schema, on_field, reported)
+        if not errors:
+            if attempt:
+                logger.info(f"Structured output repaired after {attempt} attempt(s)")
+            return value
+        logger.warning(f"Structured output attempt {attempt + 1} was invalid: {errors[0]}")
+        attempt_prompt = REPAIR_PROMPT.format(
+            prompt=prompt,
+            output=output,
+            errors="\n".join(f"- {error}" for error in errors[:MAX_REPORTED_ERRORS]),
+        )
+    raise StructuredOutputError(errors, output)
+
+
+async def _attempt(
+    client: AIClient,
+    prompt: str,
+    system: str,
+    model: Optional[str],
+    schema: dict,
+    on_field: Optional[FieldCallback],
+    reported: dict[tuple, Any],
+) -> tuple[Any, str, list[str]]:
+    """One generation. Returns (document, raw output, errors)."""
+    parser = IncrementalJSONParser()
+    # Leaving the block early closes the stream, which stops generation
+    async with aclosing(client.stream_generate(prompt, system, model, schema=schema)) as stream:
+        async for chunk in stream:
+            try:
+                completed = parser.feed(chunk)
+            except IncrementalJSONError as e:
+                return None, parser.text, [f"The reply is not valid JSON: {e}"]
+
+            for path, value in completed:
+                if not path:
+                    continue  # The whole document is validated below
+                field_schema = subschema(schema, path)
+                errors = validate(value, field_schema, path) if field_schema else []
+                if errors:
+                    return None, parser.text, errors
+                if on_field and reported.get(path, _UNSET) != value:
+                    reported[path] = value
+                    result = on_field(path, value)
+                    if inspect.isawaitable(result):
+                        await result
+
+    try:
+        value = parser.close()
+    except IncrementalJSONError as e:
+        return None, parser.text, [f"The reply is not valid JSON: {e}"]
+    return value, parser.text, validate(value, schema)
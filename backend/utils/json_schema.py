@@ -0,0 +1,108 @@
+"""
+ARIA JSON Schema Validation
+A small validator for the JSON Schema subset used for structured model output.
+
+Supported keywords: type, enum, const, properties, required,
+additionalProperties (boolean), items, anyOf, minimum, maximum, minLength,
+maxLength, minItems, maxItems and pattern. Others are ignored. Errors are
+plain sentences with a path such as "$.actions[0].entity_id", written to be
+shown back to the model when asking it to repair its output.
+"""
+import re
+from typing import Any, Optional
+
+_TYPES = {
+    "object": lambda v: isinstance(v, dict),
+    "array": lambda v: isinstance(v, list),
+    "string": lambda v: isinstance(v, str),
+    "integer": lambda v: isinstance(v, int) and not isinstance(v, bool)
+    or isinstance(v, float) and v.is_integer(),
+    "number": lambda v: isinstance(v, (int, float)) and not isinstance(v, bool),
+    "boolean": lambda v: isinstance(v, bool),
+    "null": lambda v: v is None,
+}
+
+
+def format_path(path: tuple) -> str:
+    return "$" + "".join(f"[{part}]" if isinstance(part, int) else f".{part}" for part in path)
+
+
+def subschema(schema: dict, path: tuple) -> Optional[dict]:
+    """The schema that applies at `path`, or None if the schema doesn't describe it."""
+    for part in path:
+        if isinstance(part, int):
+            schema = schema.get("items")
+        else:
+            schema = schema.get("properties", {}).get(part)
+        if not isinstance(schema, dict):
+            return None
+    return schema
+
+
+def validate(value: Any, schema: dict, path: tuple = ()) -> list[str]:
+    """Returns every way `value` violates `schema`; empty when it is valid."""
+    where = format_path(path)
+
+    if "anyOf" in schema:
+        options = [validate(value, option, path) for option in schema["anyOf"]]
+        if all(options):
+            return [f"{where} matches none of the allowed forms: " + "; ".join(min(options, key=len))]
+
+    expected = schema.get("type")
+    if expected is not None:
+        names = expected if isinstance(expected, list) else [expected]
+        if not any(_TYPES[name](value) for name in names if name in _TYPES):
+            return [f"{where} should be {' or '.join(names)}, got {_type_name(value)}"]
+
+    errors = []
+    if "enum" in schema and value not in schema["enum"]:
+        errors.append(f"{where} should be one of {', '.join(map(repr, schema['enum']))}, got {value!r}")
+    if "const" in schema and value != schema["const"]:
+        errors.append(f"{where} should be {schema['const']!r}, got {value!r}")
+
+    if isinstance(value, dict):
+        properties = schema.get("properties", {})
+        for name in schema.get("required", []):
+            if name not in value:
+                errors.append(f"{where} is missing required field '{name}'")
+        for name, item in value.items():
+            if name in properties:
+                errors.extend(validate(item, properties[name], path + (name,)))
+            elif schema.get("additionalProperties") is False:
+                errors.append(f"{where} has unexpected field '{name}'")
+    elif isinstance(value, list):
+        _check_bounds(errors, where, len(value), schema, "minItems", "maxItems", "items")
+        if isinstance(schema.get("items"), dict):
+            for index, item in enumerate(value):
+                errors.extend(validate(item, schema["items"], path + (index,)))
+    elif isinstance(value, str):
+        _check_bounds(errors, where, len(value), schema, "minLength", "maxLength", "characters")
+        if "pattern" in schema and not re.search(schema["pattern"], value):
+            errors.append(f"{where} should match the pattern {schema['pattern']!r}")
+    elif _TYPES["number"](value):
+        if "minimum" in schema and value < schema["minimum"]:
+            errors.append(f"{where} should be at least {schema['minimum']}, got {value}")
+        if "maximum" in schema and value > schema["maximum"]:
+            errors.append(f"{where} should be at most {schema['maximum']}, got {value}")
+    return errors
+
+
+def _check_bounds(errors: list, where: str, size: int, schema: dict, low: str, high: str, unit: str):
+    if low in schema and size < schema[low]:
+        errors.append(f"{where} should have at least {schema[low]} {unit}, got {size}")
+    if high in schema and size > schema[high]:
+        errors.append(f"{where} should have at most {schema[high]} {unit}, got {size}")
+
+
+def _type_name(value: Any) -> str:
+    if value is None:
+        return "null"
+    if isinstance(value, bool):
+        return "boolean"
+    if isinstance(value, dict):
+        return "object"
+    if isinstance(value, list):
+        return "array"
+    if isinstance(value, str):
+        return "string"
+    return "number"
@@ -0,0 +1,165 @@
+"""
+ARIA Incremental JSON Parsing
+Parses JSON as it streams from a model and reports each value once complete.
+
+Values are reported with their path from the root, e.g. ("actions", 0,
+"entity_id"), innermost first: every field of an object is reported before
+the object itself, and the whole document last with the path (). Numbers and
+literals are only complete once the character after them arrives, so a
+streamed "4" is never mistaken for the start of "40".
+"""
+import json
+from typing import Any, Optional
+
+_WHITESPACE = " \t\r\n"
+_SCALAR_END = ",}]" + _WHITESPACE
+
+
+class IncrementalJSONError(ValueError):
+    """The streamed text is not valid JSON. `position` is the offending offset."""
+
+    def __init__(self, message: str, position: int):
+        super().__init__(f"{message} at position {position}")
+        self.position = position
+
+
+class _Frame:
+    __slots__ = ("kind", "start", "key")
+
+    def __init__(self, kind: str, start: int):
+        self.kind = kind  # "object" or "array"
+        self.start = start
+        self.key: Any = 0 if kind == "array" else None
+
+
+class IncrementalJSONParser:
+    """
+    Feed chunks with `feed()`, which returns the (path, value) pairs they
+    completed; call `close()` at the end of the stream.
+    """
+
+    def __init__(self):
+        self.text = ""
+        self.done = False
+        self.value: Any = None
+        self._pos = 0
+        self._stack: list[_Frame] = []
+        self._expect = "value"
+        self._token_start: Optional[int] = None
+        self._string_is_key = False
+        self._in_string = False
+        self._escaped = False
+
+    def feed(self, chunk: str) -> list[tuple[tuple, Any]]:
+        self.text += chunk
+        completed: list[tuple[tuple, Any]] = []
+        while self._pos < len(self.text):
+            self._step(self.text[self._pos], completed)
+        return completed
+
+    def close(self) -> Any:
+        """Finishes the stream and returns the parsed document."""
+        completed: list[tuple[tuple, Any]] = []
+        if self._expect == "scalar" and not self._stack:
+            self._end_scalar(len(self.text), completed)
+        if not self.done:
+            raise IncrementalJSONError("Unexpected end of JSON", len(self.text))
+        return self.value
+
+    # --- Scanner ---
+    def _path(self) -> tuple:
+        return tuple(frame.key for frame in self._stack)
+
+    def _complete(self, start: int, end: int, completed: list):
+        try:
+            value = json.loads(self.text[start:end])
+        except json.JSONDecodeError as e:
+            raise IncrementalJSONError(f"Invalid value: {e.msg}", start + e.pos)
+        completed.append((self._path(), value))
+        if self._stack:
+            self._expect = "comma_or_end"
+        else:
+            self.done = True
+            self.value = value
+            self._expect = "end"
+
+    def _end_scalar(self, end: int, completed: list):
+        self._complete(self._token_start, end, completed)
+        self._token_start = None
+
+    def _step(self, char: str, completed: list):
+        pos = self._pos
+        if self._in_string:
+            if self._escaped:
+                self._escaped = False
+            elif char == "\\":
+                self._escaped = True
+            elif char == '"':
+                self._in_string = False
+                if self._string_is_key:
+                    self._stack[-1].key = json.loads(self.text[self._token_start:pos + 1])
+                    self._expect = "colon"
+                else:
+                    self._complete(self._token_start, pos + 1, completed)
+                self._token_start = None
+            self._pos += 1
+            return
+
+        expect = self._expect
+        if expect == "scalar":
+            if char in _SCALAR_END:
+                self._end_scalar(pos, completed)
+                return  # Re-read the delimiter in the new state
+            self._pos += 1
+            return
+
+        self._pos += 1
+        if char in _WHITESPACE:
+            return
+        if expect in ("value", "value_or_end"):
+            if expect == "value_or_end" and char == "]":
+                self._close(pos, completed)
+            elif char in "{[":
+                self._stack.append(_Frame("object" if char == "{" else "array", pos))
+                self._expect = "key_or_end" if char == "{" else "value_or_end"
+            elif char == '"':
+                self._start_string(pos, is_key=False)
+            elif char in "-0123456789tfn":
+                self._token_start = pos
+                self._expect = "scalar"
+            else:
+                raise IncrementalJSONError(f"Unexpected {char!r}, expected a value", pos)
+        elif expect in ("key", "key_or_end"):
+            if expect == "key_or_end" and char == "}":
+                self._close(pos, completed)
+            elif char == '"':
+                self._start_string(pos, is_key=True)
+            else:
+                raise IncrementalJSONError(f"Unexpected {char!r}, expected a key", pos)
+        elif expect == "colon":
+            if char != ":":
+                raise IncrementalJSONError(f"Unexpected {char!r}, expected ':'", pos)
+            self._expect = "value"
+        elif expect == "comma_or_end":
+            frame = self._stack[-1]
+            if char == ",":
+                if frame.kind == "array":
+                    frame.key += 1
+                    self._expect = "value"
+                else:
+                    self._expect = "key"
+            elif char == ("}" if frame.kind == "object" else "]"):
+                self._close(pos, completed)
+            else:
+                raise IncrementalJSONError(f"Unexpected {char!r} after a value", pos)
+        else:
+            raise IncrementalJSONError(f"Unexpected {char!r} after the end of the document", pos)
+
+    def _start_string(self, pos: int, is_key: bool):
+        self._in_string = True
+        self._string_is_key = is_key
+        self._token_start = pos
+
+    def _close(self, pos: int, completed: list):
+        frame = self._stack.pop()
+        self._complete(frame.start, pos + 1, completed)
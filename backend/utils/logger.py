@@ -3,16 +3,11 @@ ARIA Logging Setup
 Provides a rich, colorful logging experience for development and production.
 """
 import logging
-import sys
 from pathlib import Path
-from rich.logging import RichHandler
-from rich.console import Console
 
 from config.settings import settings
 
-# Ensure log directory exists
 LOG_DIR = Path("./data/logs")
-LOG_DIR.mkdir(parents=True, exist_ok=True)
 LOG_FILE = LOG_DIR / "aria.log"
 
 
@@ -26,6 +21,11 @@ def setup_logging(level: int = logging.INFO) -> logging.Logger:
     Returns:
         The configured root logger.
     """
+    # Imported here so modules that only need get_logger() don't pay for Rich
+    from rich.console import Console
+    from rich.logging import RichHandler
+
+    LOG_DIR.mkdir(parents=True, exist_ok=True)
     console = Console()
 
     # Rich console handler for beautiful terminal output
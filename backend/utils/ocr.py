@@ -2,25 +2,37 @@
 ARIA OCR Utility
 Wrapper around Tesseract OCR.
 """
-import pytesseract
-from PIL import Image
+from functools import lru_cache
 from config.settings import settings
 from utils.logger import get_logger
 import os
 
 logger = get_logger(__name__)
 
-# Set Tesseract path
-if os.path.exists(settings.tesseract_path):
-    pytesseract.pytesseract.tesseract_cmd = settings.tesseract_path
-else:
-    logger.warning(f"Tesseract executable not found at {settings.tesseract_path}")
+
+@lru_cache()
+def get_tesseract():
+    """
+    Imports pytesseract and points it at the configured executable.
+    Deferred to first use so OCR costs nothing until it is needed.
+    """
+    import pytesseract
+
+    if os.path.exists(settings.tesseract_path):
+        pytesseract.pytesseract.tesseract_cmd = settings.tesseract_path
+    else:
+        logger.warning(f"Tesseract executable not found at {settings.tesseract_path}")
+    return pytesseract
+
 
 def extract_text_from_image(image_path: str) -> str:
     """
     Extracts text from an image file using Tesseract.
     """
     try:
+        from PIL import Image
+
+        pytesseract = get_tesseract()
         image = Image.open(image_path)
         text = pytesseract.image_to_string(image)
         return text
@@ -39,7 +39,7 @@ export default function Dashboard() {
                     </div>
                     <div className="flex-1">
                         <div className="text-2xl font-bold text-(--color-text-primary)">
-                            {status?.ollama_connected ? 'Active' : 'Offline'}
+                            {status?.model_connected ? 'Active' : 'Offline'}
                         </div>
                         <div className="text-sm text-(--color-text-secondary)">AI Engine</div>
                     </div>
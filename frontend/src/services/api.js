@@ -15,15 +15,10 @@ const api = axios.create({
 });
 
 // --- Chat ---
-export const sendMessage = async (
-  message,
-  sessionId = null,
-  stream = false,
-) => {
+export const sendMessage = async (message, sessionId = null) => {
   const response = await api.post("/chat", {
     message,
     session_id: sessionId,
-    stream,
   });
   return response.data;
 };